@@ -0,0 +1,87 @@
+"""Deterministic chat model standing in for Ollama in the offline benchmarks"""
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+CHARS_PER_TOKEN = 4
+
+
+class StubChatModel(BaseChatModel):
+    """Answers from a script with a fixed latency plus a per prompt token cost
+
+    ``script`` is consumed in order, the last entry repeats once it is used up. With
+    ``agent_actions`` set, each entry is an action list wrapped into the AgentOutput
+    json browser-use expects with tool_calling_method='raw'.
+    """
+
+    model_name: str = 'stub'
+    script: list[Any] = ['{}']
+    agent_actions: bool = False
+    latency: float = 0.0
+    seconds_per_1k_prompt_tokens: float = 0.0
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return 'stub'
+
+    def _next_answer(self) -> str:
+        entry = self.script[min(self.calls, len(self.script) - 1)]
+        if self.agent_actions:
+            return json.dumps({
+                'current_state': {
+                    'evaluation_previous_goal': 'Success',
+                    'memory': f'step {self.calls + 1} of the scripted run',
+                    'next_goal': 'follow the script',
+                },
+                'action': entry,
+            })
+        return entry if isinstance(entry, str) else json.dumps(entry)
+
+    def _answer(self, messages: list[BaseMessage]) -> tuple[ChatResult, float]:
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // CHARS_PER_TOKEN
+        content = self._next_answer()
+        completion_tokens = len(content) // CHARS_PER_TOKEN
+        self.calls += 1
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        message = AIMessage(content=content, usage_metadata={
+            'input_tokens': prompt_tokens,
+            'output_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        })
+        delay = self.latency + self.seconds_per_1k_prompt_tokens * prompt_tokens / 1000
+        return ChatResult(generations=[ChatGeneration(message=message)]), delay
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result, delay = self._answer(messages)
+        time.sleep(delay)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        result, delay = self._answer(messages)
+        await asyncio.sleep(delay)
+        return result
+
+    def usage(self) -> dict:
+        return {'calls': self.calls, 'prompt_tokens': self.prompt_tokens, 'completion_tokens': self.completion_tokens}
@@ -0,0 +1,322 @@
+"""End to end agent benchmark on the saved pages, no network and no GPU needed
+
+    uv run python benchmarks/bench_agent.py [--repeat 3] [--llm-latency 0.05] [--compare old.json]
+
+benchmarks/fixtures is served from a local http server and the Ollama models are
+replaced by StubChatModel, which plays the actions listed per scenario in
+benchmarks/scenarios.json ({base_url} is the fixture server). Every scenario runs
+through BUEasyAgent.run_search, then the extraction actions are timed on their own:
+extract_content and fetch_page_content on every fixture page, and
+extract_search_page_result on the saved result pages in benchmarks/fixtures/serp,
+which the browser loads under their engine url so the result parser is used. Latency percentiles, steps, LLM calls, prompt tokens and the peak
+RSS of the process tree (Chromium included) are written to
+benchmarks/results/<date>-<commit>.json, --compare prints the change against an
+earlier result file.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+sys.path.append(os.path.join(base_path, 'langchain_mcp_agent'))
+
+# every run has to do the same work, and nothing may leave the machine
+os.environ['MCP_BROWSER_USE_EXTRACTION_CACHE_ENABLED'] = 'false'
+os.environ['SKIP_LLM_API_KEY_VERIFICATION'] = 'true'
+os.environ['ANONYMIZED_TELEMETRY'] = 'false'
+os.environ.setdefault('MCP_BROWSER_USE_GOOGLE_PREFETCH_DEPTH', '0')
+# the fixture server is on 127.0.0.1, fetch_page_content would otherwise always use the browser
+os.environ['MCP_BROWSER_USE_HTTP_FETCH_ALLOW_PRIVATE'] = 'true'
+
+from _stub_llm import StubChatModel
+from langchain_mcp_agent.mcp_server.browser_use.bu_easy_agent import BUEasyAgent
+
+BENCH_DIR = Path(__file__).parent
+FIXTURES = BENCH_DIR / 'fixtures'
+SCENARIOS = BENCH_DIR / 'scenarios.json'
+RESULTS = BENCH_DIR / 'results'
+EXTRACT_ANSWER = 'A short summary of the requested information.'
+PLANNER_ANSWER = 'Follow the current plan, the task is nearly done.'
+
+
+def serve_fixtures() -> ThreadingHTTPServer:
+    class Handler(SimpleHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(Handler, directory=str(FIXTURES)))
+    threading.Thread(target=server.serve_forever, name='fixtures', daemon=True).start()
+    return server
+
+
+class RssSampler:
+    """Peak resident memory of this process and its children (the browser), sampled in a thread"""
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss', daemon=True)
+
+    def _sample(self) -> int:
+        try:
+            import psutil
+        except ImportError:
+            import resource
+            # ru_maxrss is in kB on Linux, children only count once they exited
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+            return usage * 1024
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass  # exited between listing and reading
+        return total
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._sample())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> 'RssSampler':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._sample())
+
+
+class BenchAgent(BUEasyAgent):
+    """BUEasyAgent on stub models that keeps the history of its last run"""
+
+    def __init__(self, steps: list, llm_latency: float, **kwargs):
+        self.steps = steps
+        self.llm_latency = llm_latency
+        self.history = None
+        super().__init__(**kwargs)
+
+    def setModels(self):
+        stub = functools.partial(StubChatModel, latency=self.llm_latency, seconds_per_1k_prompt_tokens=self.llm_latency)
+        self.main_model = stub(model_name='stub-main', script=self.steps, agent_actions=True)
+        self.planner_model = stub(model_name='stub-planner', script=[PLANNER_ANSWER])
+        self.extract_model = stub(model_name='stub-extract', script=[EXTRACT_ANSWER])
+        self.embedder_model = self.main_model
+
+    def models(self) -> list[StubChatModel]:
+        return [self.main_model, self.planner_model, self.extract_model]
+
+    async def runAgent(self, agent):
+        self.history = await super().runAgent(agent)
+        return self.history
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest rank percentile, q in 0..100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(runs: list[dict], key: str = 'seconds') -> dict:
+    timings = [r[key] for r in runs]
+    summary = {
+        'p50_ms': round(percentile(timings, 50) * 1000, 1),
+        'p95_ms': round(percentile(timings, 95) * 1000, 1),
+    }
+    for field in ('steps', 'llm_calls', 'prompt_tokens'):
+        if runs and field in runs[0]:
+            summary[field] = round(sum(r[field] for r in runs) / len(runs), 1)
+    return summary
+
+
+def substitute(value, base_url: str):
+    if isinstance(value, str):
+        return value.replace('{base_url}', base_url)
+    if isinstance(value, list):
+        return [substitute(v, base_url) for v in value]
+    if isinstance(value, dict):
+        return {k: substitute(v, base_url) for k, v in value.items()}
+    return value
+
+
+async def bench_scenario(scenario: dict, base_url: str, repeat: int, llm_latency: float) -> dict:
+    steps = substitute(scenario['steps'], base_url)
+    runs = []
+    for _ in range(repeat):
+        agent = BenchAgent(
+            steps, llm_latency,
+            enable_memory=False, tool_calling_method='raw', planner_interval=3, max_steps=len(steps) + 2,
+        )
+        start = time.perf_counter()
+        answer = await agent.run_search(scenario['task'])
+        seconds = time.perf_counter() - start
+        usage = [m.usage() for m in agent.models()]
+        runs.append({
+            'seconds': seconds,
+            'done': bool(agent.history and agent.history.is_done()),
+            'answer': answer,
+            'steps': agent.history.number_of_steps() if agent.history else 0,
+            'llm_calls': sum(u['calls'] for u in usage),
+            'prompt_tokens': sum(u['prompt_tokens'] for u in usage),
+        })
+    return {**summarize(runs), 'done': sum(r['done'] for r in runs), 'runs': len(runs)}
+
+
+async def time_action(name: str, params: dict, browser_session, repeat: int, llm_latency: float) -> dict:
+    """``repeat`` runs of one action straight through the controller registry"""
+    runs = []
+    for _ in range(repeat):
+        llm = StubChatModel(model_name='stub-extract', script=[EXTRACT_ANSWER], latency=llm_latency)
+        start = time.perf_counter()
+        result = await BUEasyAgent.controller.registry.execute_action(
+            name, params, browser_session=browser_session, page_extraction_llm=llm,
+        )
+        if result.error:
+            raise RuntimeError(f'{name} failed: {result.error}')
+        runs.append({'seconds': time.perf_counter() - start, 'llm_calls': llm.calls, 'prompt_tokens': llm.prompt_tokens})
+    return summarize(runs)
+
+
+async def bench_actions(base_url: str, repeat: int, llm_latency: float) -> dict:
+    """extract_content, fetch_page_content and extract_search_page_result on the saved pages"""
+    registry = BUEasyAgent.controller.registry
+    goal = 'summarize the page'
+    results = {}
+    async with BUEasyAgent.getBrowserPool().lease() as browser_session:
+        pages = sorted(FIXTURES.glob('*.html')) + sorted((FIXTURES / 'fetch').glob('*.html'))
+        for fixture in pages:
+            url = f'{base_url}/{fixture.relative_to(FIXTURES).as_posix()}'
+            if fixture.parent == FIXTURES:
+                await registry.execute_action('go_to_url', {'url': url}, browser_session=browser_session)
+                results[f'extract_content:{fixture.stem}'] = await time_action(
+                    'extract_content', {'goal': goal, 'include_links': True}, browser_session, repeat, llm_latency,
+                )
+            results[f'fetch_page_content:{fixture.stem}'] = await time_action(
+                'fetch_page_content', {'url': url, 'goal': goal, 'include_links': True}, browser_session, repeat, llm_latency,
+            )
+
+        # result pages are only parsed under their engine's url, the browser gets the saved page for it
+        page = await browser_session.get_current_page()
+        for fixture in sorted((FIXTURES / 'serp').glob('*.html')):
+            meta = json.loads(fixture.with_suffix('.json').read_text(encoding='utf-8'))
+            html = fixture.read_text(encoding='utf-8')
+
+            def engine_url(url, serp_url=meta['url']):
+                return url == serp_url
+
+            async def saved_page(route, html=html):
+                await route.fulfill(body=html, content_type='text/html; charset=utf-8')
+
+            await page.route(engine_url, saved_page)
+            try:
+                await page.goto(meta['url'])
+                results[f'extract_search_page_result:{fixture.stem}'] = await time_action(
+                    'extract_search_page_result', {'goal': 'python asyncio tutorial'}, browser_session, repeat, llm_latency,
+                )
+            finally:
+                await page.unroute(engine_url, saved_page)
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=base_path, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current: dict, previous: dict) -> None:
+    print(f'\nCompared with {previous["meta"]["commit"]} ({previous["meta"]["date"]}):')
+    for section in ('scenarios', 'actions'):
+        for name, row in current[section].items():
+            old = previous.get(section, {}).get(name)
+            if old is None:
+                continue
+            changes = []
+            for field in ('p50_ms', 'p95_ms', 'prompt_tokens', 'llm_calls'):
+                if field in row and old.get(field):
+                    changes.append(f'{field} {(row[field] - old[field]) / old[field] * 100:+.1f}%')
+            print(f'  {name:36} {"  ".join(changes)}')
+    old_rss = previous.get('peak_rss_mb')
+    if old_rss:
+        print(f'  {"peak_rss_mb":36} {(current["peak_rss_mb"] - old_rss) / old_rss * 100:+.1f}%')
+
+
+async def main(args) -> dict:
+    scenarios = json.loads(SCENARIOS.read_text(encoding='utf-8'))
+    if args.scenario:
+        scenarios = [s for s in scenarios if s['name'] in args.scenario]
+    server = serve_fixtures()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'llm_latency': args.llm_latency,
+        },
+        'scenarios': {},
+        'actions': {},
+    }
+    try:
+        with RssSampler() as rss:
+            for scenario in scenarios:
+                report['scenarios'][scenario['name']] = await bench_scenario(scenario, base_url, args.repeat, args.llm_latency)
+            report['actions'] = await bench_actions(base_url, args.repeat, args.llm_latency)
+    finally:
+        await BUEasyAgent.getBrowserPool().close()
+        server.shutdown()
+    report['peak_rss_mb'] = round(rss.peak / 2**20, 1)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per scenario and per action')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='stub model seconds per call and per 1k prompt tokens')
+    parser.add_argument('--scenario', action='append', help='only run the named scenario, can be repeated')
+    parser.add_argument('--output', help='result file, defaults to benchmarks/results/<date>-<commit>.json')
+    parser.add_argument('--compare', help='earlier result file to print the change against')
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+
+    print(f'{"name":36} {"p50 ms":>9} {"p95 ms":>9} {"steps":>6} {"calls":>6} {"tokens":>8}')
+    for section in ('scenarios', 'actions'):
+        for name, row in report[section].items():
+            print(
+                f'{name:36} {row["p50_ms"]:9.1f} {row["p95_ms"]:9.1f} {row.get("steps", "-"):>6} '
+                f'{row["llm_calls"]:>6} {row["prompt_tokens"]:>8}'
+            )
+    print(f'peak RSS {report["peak_rss_mb"]}MB')
+
+    output = Path(args.output) if args.output else RESULTS / f'{datetime.now():%Y%m%d-%H%M%S}-{report["meta"]["commit"]}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'Results saved to {output}')
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+    failed = [name for name, row in report['scenarios'].items() if row['done'] < row['runs']]
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,141 @@
+"""Time page retrieval over plain HTTP against the browser on a local http server
+
+    uv run python benchmarks/bench_fetch.py [--runs 5] [--latency 0.02] [--no-browser] [--json out.json]
+
+benchmarks/fixtures is served with --latency seconds added to every response.
+Per page: HttpFetcher cold (new client, no validators), warm (pooled connection,
+revalidated with If-Modified-Since, the server answers 304) and a Chromium
+navigation of a pooled browser, each followed by the markdown conversion.
+benchmarks/fixtures/fetch/expected.json lists which pages must be sent to the
+browser and why, the script exits with 1 if the heuristic disagrees.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._http_fetcher import HttpFetcher
+from langchain_mcp_agent.mcp_server.browser_use.controller._markdown_converter import CONVERTERS
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+EXPECTED = FIXTURES / 'fetch' / 'expected.json'
+
+
+def serve_fixtures(latency: float) -> ThreadingHTTPServer:
+    class Handler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            super().do_GET()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(Handler, directory=str(FIXTURES)))
+    threading.Thread(target=server.serve_forever, name='fixtures', daemon=True).start()
+    return server
+
+
+def convert(html: str) -> str:
+    return CONVERTERS['pruned'](html, ['a', 'img'])
+
+
+async def time_http(url: str, runs: int) -> tuple[list[float], list[float], str | None]:
+    cold, warm, fallback = [], [], None
+    for _ in range(runs):
+        fetcher = HttpFetcher(allow_private=True)  # the fixtures are served on 127.0.0.1
+        start = time.perf_counter()
+        result = await fetcher.fetch(url)
+        if result.fallback is None:
+            convert(result.html)
+        cold.append((time.perf_counter() - start) * 1000)
+        fallback = result.fallback
+
+        start = time.perf_counter()
+        result = await fetcher.fetch(url)
+        if result.fallback is None:
+            convert(result.html)
+        warm.append((time.perf_counter() - start) * 1000)
+        if fallback is None and not result.revalidated:
+            print(f'    {url} was not revalidated on the second fetch')
+        await fetcher.aclose()
+    return cold, warm, fallback
+
+
+async def time_browser(urls: list[str], runs: int) -> dict[str, list[float]]:
+    from langchain_mcp_agent.mcp_server.browser_use.bu_easy_agent import BUEasyAgent
+    timings = {}
+    pool = BUEasyAgent.getBrowserPool()
+    try:
+        async with pool.lease() as browser_session:
+            page = await browser_session.get_current_page()
+            for url in urls:
+                timings[url] = []
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    await page.goto(url)
+                    await page.wait_for_load_state()
+                    convert(await page.content())
+                    timings[url].append((time.perf_counter() - start) * 1000)
+    finally:
+        await pool.close()
+    return timings
+
+
+async def main(args) -> dict:
+    expected = json.loads(EXPECTED.read_text(encoding='utf-8'))
+    server = serve_fixtures(args.latency)
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    results = {}
+    try:
+        for name, reason in expected.items():
+            cold, warm, fallback = await time_http(f'{base_url}/{name}', args.runs)
+            results[name] = {
+                'ok': fallback == reason,
+                'fallback': fallback,
+                'expected_fallback': reason,
+                'http_cold_ms': round(statistics.median(cold), 2),
+                'http_warm_ms': round(statistics.median(warm), 2),
+            }
+        if not args.no_browser:
+            browser = await time_browser([f'{base_url}/{name}' for name in expected], args.runs)
+            for name in expected:
+                results[name]['browser_ms'] = round(statistics.median(browser[f'{base_url}/{name}']), 2)
+    finally:
+        server.shutdown()
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.02, help='seconds the server waits before every response')
+    parser.add_argument('--no-browser', action='store_true', help='skip the Chromium timings')
+    parser.add_argument('--json', dest='json_path', default=None)
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+
+    header = f'{"page":<26}{"ok":>4}{"http cold ms":>14}{"http 304 ms":>13}{"browser ms":>12}  fallback'
+    print(header)
+    print('-' * len(header))
+    for name, r in results.items():
+        print(
+            f'{name:<26}{"yes" if r["ok"] else "NO":>4}{r["http_cold_ms"]:>14}{r["http_warm_ms"]:>13}'
+            f'{r.get("browser_ms", "-"):>12}  {r["fallback"] or "-"}'
+        )
+        if not r['ok']:
+            print(f'    expected fallback {r["expected_fallback"]!r}')
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+    sys.exit(0 if all(r['ok'] for r in results.values()) else 1)
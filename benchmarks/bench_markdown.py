@@ -0,0 +1,73 @@
+"""Compare html -> markdown converters on the saved fixtures in benchmarks/fixtures
+
+    uv run python benchmarks/bench_markdown.py [--runs 5] [--strip a img] [--json out.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._markdown_converter import CONVERTERS
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def bench(name: str, html: str, strip: list[str], runs: int) -> dict:
+    convert = CONVERTERS[name]
+    timings = []
+    output = ''
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = convert(html, strip)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'output_chars': len(output),
+        'output_tokens_est': len(output) // 4,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--strip', nargs='*', default=['a', 'img'])
+    parser.add_argument('--json', dest='json_path', default=None)
+    args = parser.parse_args()
+
+    results = {}
+    for fixture in sorted(FIXTURES.glob('*.html')):
+        html = fixture.read_text(encoding='utf-8')
+        results[fixture.name] = {'input_chars': len(html)}
+        for name in CONVERTERS:
+            try:
+                results[fixture.name][name] = bench(name, html, args.strip, args.runs)
+            except ImportError as e:
+                results[fixture.name][name] = {'skipped': str(e)}
+
+    header = f'{"fixture":<16}{"converter":<14}{"median ms":>11}{"min ms":>10}{"out chars":>11}{"~tokens":>9}'
+    print(header)
+    print('-' * len(header))
+    for fixture, row in results.items():
+        for name in CONVERTERS:
+            r = row[name]
+            if 'skipped' in r:
+                print(f'{fixture:<16}{name:<14}  skipped: {r["skipped"]}')
+                continue
+            print(
+                f'{fixture:<16}{name:<14}{r["median_ms"]:>11}{r["min_ms"]:>10}'
+                f'{r["output_chars"]:>11}{r["output_tokens_est"]:>9}'
+            )
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
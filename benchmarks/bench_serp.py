@@ -0,0 +1,67 @@
+"""Time the search results parser on the saved pages in benchmarks/fixtures/serp
+
+    uv run python benchmarks/bench_serp.py [--runs 5] [--json out.json]
+
+Every fixture has a <name>.json next to it with the page url. Output size is
+compared with the markdown the LLM would otherwise read. What the parser must
+return for the fixtures is checked by tests/test_serp_parser.py.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._markdown_converter import CONVERTERS
+from langchain_mcp_agent.mcp_server.browser_use.controller._serp_parser import parse_serp
+
+FIXTURES = Path(__file__).parent / 'fixtures' / 'serp'
+
+
+def bench(fixture: Path, runs: int) -> dict:
+    meta = json.loads(fixture.with_suffix('.json').read_text(encoding='utf-8'))
+    html = fixture.read_text(encoding='utf-8')
+    timings = []
+    results = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        results = parse_serp(html, meta['url'])
+        timings.append((time.perf_counter() - start) * 1000)
+    parsed_json = json.dumps([r.to_dict() for r in results])
+    markdown = CONVERTERS['pruned'](html, ['img'])
+    return {
+        'results': len(results),
+        'median_ms': round(statistics.median(timings), 2),
+        'output_tokens_est': len(parsed_json) // 4,
+        'markdown_tokens_est': len(markdown) // 4,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', dest='json_path', default=None)
+    args = parser.parse_args()
+
+    results = {fixture.name: bench(fixture, args.runs) for fixture in sorted(FIXTURES.glob('*.html'))}
+
+    header = f'{"fixture":<22}{"results":>9}{"median ms":>11}{"~tokens":>9}{"~md tokens":>12}'
+    print(header)
+    print('-' * len(header))
+    for fixture, r in results.items():
+        print(
+            f'{fixture:<22}{r["results"]:>9}{r["median_ms"]:>11}'
+            f'{r["output_tokens_est"]:>9}{r["markdown_tokens_est"]:>12}'
+        )
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
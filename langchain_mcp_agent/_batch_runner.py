@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+
+def read_queries(lines: Iterable[str]) -> list[dict]:
+    """Parse a JSONL queries file, each line is {"id": ..., "query": ...} or a bare JSON string
+
+    Lines without an id get their 1-based line number as id.
+    """
+    queries = []
+    seen = set()
+    for lineno, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'line {lineno}: invalid JSON ({e.msg} at column {e.colno})') from None
+        if isinstance(item, str):
+            item = {'query': item}
+        if not isinstance(item, dict) or not item.get('query'):
+            raise ValueError(f'line {lineno}: missing "query"')
+        item['id'] = str(item.get('id', lineno))
+        if item['id'] in seen:
+            raise ValueError(f'line {lineno}: duplicate id {item["id"]!r}')
+        seen.add(item['id'])
+        queries.append(item)
+    return queries
+
+
+def previous_results(output_path: Path) -> dict[str, bool]:
+    """Whether each id in an earlier (possibly crashed) run's output finished without an error
+
+    A record that succeeded counts over failed ones of the same id, a retried query
+    has its failed record followed by the new one.
+    """
+    if not output_path.exists():
+        return {}
+    results = {}
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                item_id = str(record['id'])
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue  # the line a crash cut in half
+            results[item_id] = results.get(item_id, False) or record.get('error') is None
+    return results
+
+
+def ends_with_newline(path: Path) -> bool:
+    with open(path, 'rb') as f:
+        if f.seek(0, 2) == 0:
+            return True
+        f.seek(-1, 2)
+        return f.read(1) == b'\n'
+
+
+def usage_of(messages: list) -> dict:
+    """Token and tool call counts over the messages of one agent run"""
+    input_tokens = output_tokens = llm_calls = 0
+    tools = Counter()
+    for message in messages:
+        if not isinstance(message, AIMessage):
+            continue
+        llm_calls += 1
+        usage = message.usage_metadata or {}
+        input_tokens += usage.get('input_tokens', 0)
+        output_tokens += usage.get('output_tokens', 0)
+        tools.update(call['name'] for call in message.tool_calls)
+    return {
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'llm_calls': llm_calls,
+        'tool_calls': sum(tools.values()),
+        'tools': dict(tools),
+    }
+
+
+class BatchRunner:
+    """Runs queries through one agent concurrently and streams a JSONL record per query"""
+
+    def __init__(self, agent_executor, system_prompt: str, concurrency: int = 4):
+        self.agent_executor = agent_executor
+        self.system_prompt = system_prompt
+        self.concurrency = concurrency
+
+    async def run_one(self, item: dict) -> dict:
+        started = time.monotonic()
+        record = {'id': item['id'], 'query': item['query']}
+        try:
+            result = await self.agent_executor.ainvoke({'messages': [
+                SystemMessage(content=self.system_prompt),
+                HumanMessage(content=item['query'])
+            ]})
+            messages = result['messages']
+            record['answer'] = messages[-1].content
+            record['error'] = None
+        except Exception as e:
+            logger.warning(f'Query {item["id"]} failed: {type(e).__name__}: {e}')
+            messages = []
+            record['answer'] = None
+            record['error'] = f'{type(e).__name__}: {e}'
+        record['latency_s'] = round(time.monotonic() - started, 3)
+        record.update(usage_of(messages))
+        return record
+
+    async def run(self, queries: list[dict], out) -> dict:
+        """Run all queries, writing each record to ``out`` as soon as it finishes"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        summary = {'queries': len(queries), 'failed': 0, 'input_tokens': 0, 'output_tokens': 0, 'tool_calls': 0}
+        started = time.monotonic()
+
+        async def bounded(item: dict):
+            async with semaphore:
+                record = await self.run_one(item)
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            summary['failed'] += record['error'] is not None
+            for key in ('input_tokens', 'output_tokens', 'tool_calls'):
+                summary[key] += record[key]
+            logger.info(f'✅ {item["id"]} done in {record["latency_s"]}s ({record["tool_calls"]} tool calls)')
+
+        await asyncio.gather(*(bounded(item) for item in queries))
+        summary['wall_s'] = round(time.monotonic() - started, 3)
+        return summary
+
+
+async def run_batch(agent_executor, system_prompt: str, batch: str, output: str | None, concurrency: int) -> dict:
+    """Read queries from ``batch`` (path or '-' for stdin) and write results to ``output``
+
+    With an output file, IDs that already have a record without an error are skipped
+    and new records are appended, so a crashed run can simply be started again and
+    queries that failed are retried.
+    """
+    if batch == '-':
+        queries = read_queries(sys.stdin)
+    else:
+        with open(batch, encoding='utf-8') as f:
+            queries = read_queries(f)
+
+    runner = BatchRunner(agent_executor, system_prompt, concurrency=concurrency)
+    if not output or output == '-':
+        return await runner.run(queries, sys.stdout)
+
+    output_path = Path(output)
+    previous = previous_results(output_path)
+    todo = [item for item in queries if not previous.get(item['id'])]
+    retried = sum(1 for item in todo if item['id'] in previous)
+    if previous:
+        logger.info(
+            f'⏭️  Resuming: {len(queries) - len(todo)} of {len(queries)} queries already in {output_path}, '
+            f'{retried} failed ones run again'
+        )
+    with open(output_path, 'a', encoding='utf-8') as out:
+        if not ends_with_newline(output_path):
+            out.write('\n')  # do not glue the first new record onto a half written line
+        summary = await runner.run(todo, out)
+    summary['skipped'] = len(queries) - len(todo)
+    summary['retried'] = retried
+    return summary
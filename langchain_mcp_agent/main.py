@@ -8,7 +8,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # main_with_mcp.py
+import argparse
 import asyncio
+import json
+import logging
 
 from langchain_core.prompts import PromptTemplate
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -16,10 +19,26 @@ from langgraph.prebuilt import create_react_agent as create_langgraph_agent
 # Import our MCP client
 from langchain_mcp_agent.mcp_clients.client import myMCPClient
 from langchain_mcp_agent.tools._model_servant import ModelServant
+from langchain_mcp_agent._batch_runner import run_batch
 
 #langchain.debug = True
 
+SYSTEM_PROMPT = "You are an AI assistant with access to multiple MCP servers."
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="LangChain agent with MCP tools")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="JSONL file with {\"id\": ..., \"query\": ...} per line, '-' for stdin")
+    parser.add_argument("--output", metavar="FILE",
+                        help="JSONL results file, finished ids are skipped and failed ones retried when it exists (default: stdout)")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("AGENT_BATCH_CONCURRENCY", 4)),
+                        help="queries run at the same time in batch mode")
+    return parser.parse_args()
+
+
 async def main():
+    args = parse_args()
     # Initialize Ollama
     llm = ModelServant().getModel('qwen3:30b-nothink')
     
@@ -49,6 +68,14 @@ Thought: {agent_scratchpad}
         tools=all_tools
     )
     
+    if args.batch:
+        try:
+            summary = await run_batch(agent_executor, SYSTEM_PROMPT, args.batch, args.output, args.concurrency)
+            print(json.dumps(summary), file=sys.stderr)
+        finally:
+            await mcpClient.close()
+        return
+
     # Example queries
     print("\n" + "="*50)
     print("Agent ready! Testing with example queries...")
@@ -63,10 +90,10 @@ Thought: {agent_scratchpad}
         print("-"*30)
         try:
             result =  await agent_executor.ainvoke({"messages": [
-                SystemMessage(content="You are an AI assistant with access to multiple MCP servers."),
+                SystemMessage(content=SYSTEM_PROMPT),
                 HumanMessage(content=query)
             ]})
-            print(f"Result: {result['output']}")
+            print(f"Result: {result['messages'][-1].content}")
         except Exception as e:
             print(f"Error: {e}")
     
@@ -76,7 +103,8 @@ Thought: {agent_scratchpad}
     print("="*50)
     # Cleanup
     print("\nShutting down MCP servers...")
-    #mcp_manager.stop_all()
+    await mcpClient.close()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
     asyncio.run(main())
\ No newline at end of file
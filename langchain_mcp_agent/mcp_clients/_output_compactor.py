@@ -0,0 +1,213 @@
+import hashlib
+import json
+import logging
+import os
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from langchain_mcp_agent.tools._tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+FETCH_TOOL_NAME = "fetch_tool_output"
+MAX_MATCHES = 50
+
+
+def _units(record: dict) -> tuple[list[str], str]:
+    """Pieces a stored output is paged and searched by, and what they are
+
+    Several content parts are their own pieces, a JSON array is split into its
+    items, a JSON object into the lines of its indented form, anything else into lines.
+    """
+    parts = record["parts"]
+    if len(parts) > 1:
+        return parts, "parts"
+    text = parts[0] if parts else ""
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = None
+    if isinstance(value, list):
+        return [json.dumps(item, ensure_ascii=False) for item in value], "items"
+    if isinstance(value, dict):
+        return json.dumps(value, indent=1, ensure_ascii=False).splitlines(keepends=True), "lines"
+    return text.splitlines(keepends=True), "lines"
+
+
+def _paginate(units: list[str], page_chars: int) -> list[list[tuple[int, str]]]:
+    """Numbered units grouped into pages of at most ``page_chars``, longer units are cut"""
+    pages, page, size = [], [], 0
+    for index, unit in enumerate(units):
+        for start in range(0, max(len(unit), 1), page_chars):
+            piece = unit[start:start + page_chars]
+            if page and size + len(piece) > page_chars:
+                pages.append(page)
+                page, size = [], 0
+            page.append((index, piece))
+            size += len(piece)
+    if page:
+        pages.append(page)
+    return pages or [[]]
+
+
+def _render(page: list[tuple[int, str]], kind: str) -> str:
+    if kind == "lines":
+        return "".join(piece for _, piece in page)
+    return "\n".join(f"[{index}] {piece.rstrip()}" for index, piece in page)
+
+
+def _describe(record: dict, units: list[str], kind: str) -> str:
+    if kind == "parts":
+        return f"{len(units)} content parts"
+    if kind == "items":
+        keys = {}
+        for unit in units[:20]:
+            try:
+                item = json.loads(unit)
+            except ValueError:
+                continue
+            if isinstance(item, dict):
+                keys.update(dict.fromkeys(item))
+        with_keys = f" with keys {', '.join(list(keys)[:15])}" if keys else ""
+        return f"JSON array of {len(units)} items{with_keys}"
+    text = record["parts"][0] if record["parts"] else ""
+    if text.lstrip().startswith("{"):
+        try:
+            return f"JSON object with keys {', '.join(list(json.loads(text))[:15])}"
+        except ValueError:
+            pass
+    return f"{len(units)} lines of text"
+
+
+class OutputCompactor:
+    """Keeps large MCP tool outputs out of the message history
+
+    Outputs up to ``max_chars`` pass through. A longer one is stored whole under a
+    handle (a hash of the tool and the output) and the model gets a short description
+    of it, the start of it and how to read the rest: ``fetch_tool_output`` returns a
+    page of ``page_chars`` by number or the pieces that contain a search string. JSON
+    arrays, e.g. mongodb find results, are paged and searched by item, other text by
+    line. The store is a TieredCache, in memory and, with ``db_path``, in SQLite so a
+    handle stays readable for ``ttl`` seconds after the process that made it is gone.
+    """
+
+    def __init__(
+        self,
+        store: TieredCache | None = None,
+        max_chars: int = 4000,
+        page_chars: int = 4000,
+    ):
+        self.store = store or TieredCache(max_items=64, table="tool_outputs")
+        self.max_chars = max_chars
+        self.page_chars = page_chars
+        self.outputs = 0
+        self.compacted = 0
+        self.chars_in = 0
+        self.chars_out = 0
+        self.fetches = 0
+
+    @classmethod
+    def from_env(cls) -> "OutputCompactor":
+        ttl = float(os.getenv("MCP_CLIENT_OUTPUT_TTL", 24 * 3600))
+        return cls(
+            TieredCache(
+                max_items=64,
+                db_path=os.getenv("MCP_CLIENT_OUTPUT_STORE", "~/.cache/langchain_mcp_agent/tool_outputs.sqlite") or None,
+                ttl=ttl if ttl > 0 else None,
+                max_rows=int(os.getenv("MCP_CLIENT_OUTPUT_STORE_MAX_ROWS", 500)),
+                table="tool_outputs",
+            ),
+            max_chars=int(os.getenv("MCP_CLIENT_OUTPUT_MAX_CHARS", 4000)),
+            page_chars=int(os.getenv("MCP_CLIENT_OUTPUT_PAGE_CHARS", 4000)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_chars > 0
+
+    def _preview(self, pages: list[list[tuple[int, str]]], kind: str, budget: int) -> str:
+        shown, size = [], 0
+        for index, piece in pages[0]:
+            cut = piece[:max(budget // 4, 200)]
+            if shown and size + len(cut) > budget:
+                break
+            shown.append((index, cut if cut == piece else cut.rstrip() + "…\n"))
+            size += len(cut)
+        return _render(shown, kind).rstrip()
+
+    async def compact(self, tool_name: str, content: str | list[str]) -> str | list[str]:
+        """``content`` of a ``tool_name`` call, replaced by a handle and a preview if too long"""
+        parts = [content] if isinstance(content, str) else list(content)
+        chars = sum(len(part) for part in parts)
+        self.outputs += 1
+        if not self.enabled or chars <= self.max_chars:
+            return content
+
+        record = {"tool": tool_name, "parts": parts}
+        raw = json.dumps(record, ensure_ascii=False)
+        handle = "out_" + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+        await self.store.aput(handle, raw)
+
+        units, kind = _units(record)
+        pages = _paginate(units, self.page_chars)
+        head = f"[{tool_name} returned {chars:,} chars, {_describe(record, units, kind)}. It is stored as handle {handle}, the start:]"
+        more = (
+            f'[{len(pages)} pages in all. Read more with {FETCH_TOOL_NAME}(handle="{handle}", page=2), '
+            f'or search it with {FETCH_TOOL_NAME}(handle="{handle}", query="...").]'
+        )
+        preview = self._preview(pages, kind, max(self.max_chars - len(head) - len(more) - 4, 200))
+        compacted = f"{head}\n{preview}\n{more}"
+        self.compacted += 1
+        self.chars_in += chars
+        self.chars_out += len(compacted)
+        logger.info(f"🗜️  {tool_name} output of {chars:,} chars stored as {handle}, {len(compacted):,} chars kept")
+        return compacted
+
+    async def fetch(self, handle: str, page: int = 1, query: str = "") -> str:
+        """Page ``page`` of a stored output, or with ``query`` the pieces that contain it"""
+        self.fetches += 1
+        raw = await self.store.aget(handle.strip())
+        if raw is None:
+            return f"No stored output with handle {handle}, it expired or was never stored. Call the original tool again."
+        record = json.loads(raw)
+        units, kind = _units(record)
+        if query:
+            needle = query.casefold()
+            found = [(index, unit) for index, unit in enumerate(units) if needle in unit.casefold()]
+            pages = _paginate([unit for _, unit in found[:MAX_MATCHES]], self.page_chars)
+            # number the matches by their place in the whole output
+            shown = [(found[position][0], piece) for position, piece in pages[0]]
+            cut = " (first page of them)" if len(pages) > 1 or len(found) > MAX_MATCHES else ""
+            head = f'[{len(found)} of {len(units)} {kind} of {handle} contain "{query}"{cut}]'
+            return f"{head}\n{_render(shown, 'items' if kind == 'lines' else kind)}"
+        pages = _paginate(units, self.page_chars)
+        if not 1 <= page <= len(pages):
+            return f"{handle} has pages 1 to {len(pages)}, there is no page {page}."
+        shown = pages[page - 1]
+        span = f", {kind} {shown[0][0]} to {shown[-1][0]} of {len(units)}" if shown else ""
+        return f"[{handle} ({record['tool']}) page {page} of {len(pages)}{span}]\n{_render(shown, kind)}"
+
+    def fetch_tool(self) -> BaseTool:
+        async def fetch_tool_output(handle: str, page: int = 1, query: str = "") -> str:
+            return await self.fetch(handle, page=page, query=query)
+
+        return StructuredTool.from_function(
+            coroutine=fetch_tool_output,
+            name=FETCH_TOOL_NAME,
+            description=(
+                "Read a large tool output that was replaced by a handle (out_...). "
+                "page: page number to read, 1 is the start already shown. "
+                "query: instead of a page, return only the items or lines that contain this text."
+            ),
+        )
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "outputs": self.outputs,
+            "compacted": self.compacted,
+            "chars_in": self.chars_in,
+            "chars_out": self.chars_out,
+            "fetches": self.fetches,
+            "store": self.store.stats(),
+        }
@@ -7,13 +7,79 @@ sys.path.append(base_path)
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_mcp_adapters.client import MultiServerMCPClient
-import asyncio
 from langchain_core.tools import BaseTool
 
-class myMCPClient:    
-    def __init__(self):
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+
+from langchain_core.tools import StructuredTool, ToolException
+from langchain_mcp_adapters.sessions import create_session
+from mcp import ClientSession
+from mcp.types import CallToolResult, TextContent
+from mcp.types import Tool as MCPTool
+from langchain_mcp_agent.mcp_clients._output_compactor import OutputCompactor
+from langchain_mcp_agent.tools._tracing import span
+
+logger = logging.getLogger(__name__)
+
+MAX_TOOL_PAGES = 1000
+
+
+async def list_all_tools(session: ClientSession) -> list[MCPTool]:
+    """Every tool of the server, following list_tools pagination"""
+    tools: list[MCPTool] = []
+    cursor = None
+    for _ in range(MAX_TOOL_PAGES):
+        page = await session.list_tools(cursor=cursor)
+        tools.extend(page.tools or [])
+        if page.nextCursor is None:
+            return tools
+        cursor = page.nextCursor
+    raise RuntimeError(f"MCP server returned more than {MAX_TOOL_PAGES} pages of tools")
+
+
+def convert_call_tool_result(result: CallToolResult) -> tuple[str | list[str], list | None]:
+    """Content and artifact of a tool call for a content_and_artifact tool
+
+    Text parts are the content, one part as a plain string, other parts (images,
+    resources) are the artifact. An error result raises ToolException.
+    """
+    texts = [part.text for part in result.content if isinstance(part, TextContent)]
+    others = [part for part in result.content if not isinstance(part, TextContent)]
+    content: str | list[str] = texts[0] if len(texts) == 1 else texts or ""
+    if result.isError:
+        raise ToolException(content)
+    return content, others or None
+
+
+class myMCPClient:
+    """MCP client that keeps one session per server open for its whole lifetime
+
+    Servers are started in parallel on first use (or, with lazy=True, only when one
+    of their tools is first invoked). Tool schemas are cached in memory and in a
+    JSON file keyed by a hash of the server config; the cached entry is replaced
+    when the server reports a different version or the entry is older than the TTL.
+    Tool outputs longer than MCP_CLIENT_OUTPUT_MAX_CHARS are stored by an
+    OutputCompactor and replaced by a handle, read back with the fetch_tool_output tool.
+    Use as ``async with myMCPClient() as client`` or call ``close()`` when done; a
+    closed client starts its servers again on next use.
+    """
+    _schema_cache: dict = {}
+
+    def __init__(self, lazy: bool | None = None):
+        self.lazy = lazy if lazy is not None else os.getenv("MCP_CLIENT_LAZY_START", "false").lower() == "true"
+        self.cache_file = Path(os.getenv("MCP_CLIENT_TOOL_CACHE", "~/.cache/langchain_mcp_agent/mcp_tools.json")).expanduser()
+        self.cache_ttl = float(os.getenv("MCP_CLIENT_TOOL_CACHE_TTL", 24 * 3600))
+        self._sessions: dict[str, ClientSession] = {}
+        self._versions: dict[str, str] = {}
+        self._server_tasks: dict[str, asyncio.Task] = {}
+        self._start_locks: dict[str, asyncio.Lock] = {}
+        self._stop = asyncio.Event()
+        self._tools: list[BaseTool] | None = None
+        self.compactor = OutputCompactor.from_env()
         self.connection_string = os.getenv("MCP_MONGODB_CONNECTION_STRING")
         self.client_config = {
             "mongodb": {
@@ -45,10 +111,130 @@ class myMCPClient:
             }
         }
     
+    def _config_hash(self, server: str) -> str:
+        raw = json.dumps(self.client_config[server], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _load_disk_cache(self) -> dict:
+        try:
+            return json.loads(self.cache_file.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _cached_schemas(self, server: str) -> list[MCPTool] | None:
+        config_hash = self._config_hash(server)
+        entry = self._schema_cache.get(config_hash) or self._load_disk_cache().get(config_hash)
+        if not entry or time.time() - entry["cached_at"] > self.cache_ttl:
+            return None
+        self._schema_cache[config_hash] = entry
+        return [MCPTool.model_validate(tool) for tool in entry["tools"]]
+
+    def _store_schemas(self, server: str, version: str, tools: list[MCPTool]) -> None:
+        config_hash = self._config_hash(server)
+        entry = {
+            "server": server,
+            "version": version,
+            "cached_at": time.time(),
+            "tools": [tool.model_dump(mode="json") for tool in tools],
+        }
+        self._schema_cache[config_hash] = entry
+        disk = self._load_disk_cache()
+        disk[config_hash] = entry
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self.cache_file.write_text(json.dumps(disk))
+        except OSError as e:
+            logger.warning(f"Could not write MCP tool cache {self.cache_file}: {e}")
+
+    async def _run_server(self, server: str, ready: asyncio.Future) -> None:
+        # the stdio transport must be entered and exited in the same task, so every
+        # server lives in its own task until close() sets the stop event
+        try:
+            async with create_session(self.client_config[server]) as session:
+                result = await session.initialize()
+                ready.set_result((session, result))
+                await self._stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not isinstance(e, asyncio.CancelledError):
+                logger.error(f"MCP server {server} session ended: {type(e).__name__}: {e}")
+            self._sessions.pop(server, None)
+
+    async def _session(self, server: str) -> ClientSession:
+        if server in self._sessions:
+            return self._sessions[server]
+        lock = self._start_locks.setdefault(server, asyncio.Lock())
+        async with lock:
+            if server in self._sessions:
+                return self._sessions[server]
+            started = time.monotonic()
+            ready = asyncio.get_running_loop().create_future()
+            self._server_tasks[server] = asyncio.create_task(self._run_server(server, ready))
+            session, result = await ready
+            self._sessions[server] = session
+            logger.info(f"🔌 MCP server {server} ({result.serverInfo.name} {result.serverInfo.version}) started in {time.monotonic() - started:.1f}s")
+
+            self._versions[server] = result.serverInfo.version
+
+            cached = self._schema_cache.get(self._config_hash(server))
+            if cached is not None and cached["version"] != result.serverInfo.version:
+                # lazily started server changed under a cached schema, refresh it for the next run
+                logger.info(f"MCP server {server} version changed from {cached['version']}, refreshing tool cache")
+                self._store_schemas(server, result.serverInfo.version, await list_all_tools(session))
+            return session
+
+    def _make_tool(self, server: str, tool: MCPTool) -> BaseTool:
+        async def call_tool(**arguments):
+            with span("mcp.call_tool", server=server, tool=tool.name) as call_span:
+                session = await self._session(server)
+                call_tool_result = await session.call_tool(tool.name, arguments)
+                call_span.set(is_error=bool(call_tool_result.isError))
+                content, artifact = convert_call_tool_result(call_tool_result)
+                compacted = await self.compactor.compact(tool.name, content)
+                call_span.set(compacted=compacted is not content)
+                return compacted, artifact
+
+        return StructuredTool(
+            name=tool.name,
+            description=tool.description or "",
+            args_schema=tool.inputSchema,
+            coroutine=call_tool,
+            response_format="content_and_artifact",
+            metadata=tool.annotations.model_dump() if tool.annotations else None,
+        )
+
+    async def _server_tools(self, server: str) -> list[BaseTool]:
+        schemas = self._cached_schemas(server) if self.lazy else None
+        if schemas is None:
+            session = await self._session(server)
+            schemas = await list_all_tools(session)
+            self._store_schemas(server, self._versions[server], schemas)
+        return [self._make_tool(server, tool) for tool in schemas]
+
     async def get_tools(self) -> list[BaseTool]:
-        # Initialize LangChain MCP integration
-        client = MultiServerMCPClient(self.client_config)
-        tools: list[BaseTool] = await client.get_tools()
-        return tools
-        
-    
\ No newline at end of file
+        if self._tools is None:
+            # start all servers (or read their cached schemas) in parallel
+            started = time.monotonic()
+            per_server = await asyncio.gather(*(self._server_tools(server) for server in self.client_config))
+            self._tools = [tool for tools in per_server for tool in tools]
+            if self.compactor.enabled:
+                self._tools.append(self.compactor.fetch_tool())
+            logger.info(f"🧰 Loaded {len(self._tools)} MCP tools in {time.monotonic() - started:.1f}s")
+        return self._tools
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._server_tasks:
+            await asyncio.gather(*self._server_tasks.values(), return_exceptions=True)
+        self._server_tasks.clear()
+        self._sessions.clear()
+        # tools look their session up by server name on every call and start it again
+        self._stop = asyncio.Event()
+        self._tools = None
+
+    async def __aenter__(self) -> "myMCPClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
@@ -1,8 +1,10 @@
 import asyncio
+import json
+import logging
 import os
 import sys
 # Optional: Set the OLLAMA host to a remote server
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.append(base_path)
 from dotenv import load_dotenv
 load_dotenv()
@@ -12,11 +14,24 @@ from browser_use.agent.views import AgentHistoryList
 from browser_use.agent.memory import MemoryConfig
 from browser_use.browser import BrowserProfile, BrowserSession
 from tools._model_servant import ModelServant
+from langchain_core.embeddings import Embeddings
 from langchain_core.language_models.chat_models import BaseChatModel, LangSmithParams
+from langchain_core.messages import HumanMessage
 from browser_use.controller.service import Controller
+from langchain_mcp_agent.mcp_server.browser_use._browser_pool import BrowserSessionPool
+from langchain_mcp_agent.mcp_server.browser_use._checkpoint import CheckpointStore
+from langchain_mcp_agent.mcp_server.browser_use._resource_filter import ResourceFilter
+from langchain_mcp_agent.mcp_server.browser_use._run_governor import RunGovernor
+from langchain_mcp_agent.tools._context_budget import get_context_budget
+from langchain_mcp_agent.tools._tracing import span
+from langchain_mcp_agent.tools._vector_memory import VectorMemory
+
+logger = logging.getLogger(__name__)
 
 class AgentMaster:
 	def __init__(self, **kwargs):
+		# per instance, so one agent's settings do not leak into the class default
+		self.agentConfig = dict(self.agentConfig)
 		for key in kwargs:
 			if key in self.agentConfig:
 				self.agentConfig[key] = kwargs[key] 
@@ -27,6 +42,8 @@ class AgentMaster:
 					self.planner_model_model_name = kwargs['planner_model']
 		if 'extract_model' in kwargs:
 					self.extract_model_model_name = kwargs['extract_model']
+		if 'embedder_model' in kwargs:
+			self.embedder_model_name = kwargs['embedder_model']
      
 		if 'task' in kwargs:
 			self.task = kwargs['task']
@@ -38,8 +55,14 @@ class AgentMaster:
 			self._max_steps = kwargs['max_steps']
 		if 'initial_actions' in kwargs:
 			self._initial_actions = kwargs['initial_actions']
+		if 'resource_preset' in kwargs:
+			self.resource_preset = kwargs['resource_preset']
+		if 'task_id' in kwargs:
+			self.task_id = kwargs['task_id']
    
 		self.setModels()
+		if 'max_input_tokens' not in kwargs:
+			self.setContextBudget()
 		self.setMemory()
 
 	task = """
@@ -67,17 +90,25 @@ class AgentMaster:
 	}
 	main_model_name: str = None
 	main_model: BaseChatModel = None
-	embedder_model_name: str = None
-	embedder_model: BaseChatModel = None
+	# an embeddings entry of models.json (e.g. HuggingFaceEmbeddings) moves memory to a vector index
+	embedder_model_name: str = os.getenv('MCP_BROWSER_USE_EMBEDDER_MODEL') or None
+	embedder_model: BaseChatModel | Embeddings = None
 	planner_model_model_name: str = None
 	planner_model: BaseChatModel = None
 	extract_model_model_name: str = None
 	extract_model: BaseChatModel = None
 	memory: MemoryConfig = None
+	vector_memory: VectorMemory = None
 	controller: Controller = None
 
 	_max_steps = 999
 	_initial_actions = None
+	# 'text-only', 'vision' or 'full', None picks by use_vision unless MCP_BROWSER_USE_RESOURCE_PRESET is set
+	resource_preset: str = None
+	# runs with a task id are checkpointed after every step and resumed by the next run with that id
+	task_id: str = None
+	# why the last runAgent ended: done, cycle, stalled, wall_clock, tokens, steps, max_steps, max_failures, ...
+	stop_reason: str = None
 	
 	_browser_profile = BrowserProfile(
 		window_size={'width': 900, 'height': 1280},  # Small size for demonstration
@@ -88,28 +119,144 @@ class AgentMaster:
 		headless=True,  # Use non-headless mode to see the window
 	)
  	#TODO: Make browser setting configurable
-	_browser_session = BrowserSession(
-		browser_profile=_browser_profile,
-		user_data_dir='~/.config/browseruse/profiles/stealth',
-		#stealth=True,
-		headless=True,
-		disable_security=False,
-		#deterministic_rendering=False,
-	)
+	# sessions are leased from a process wide pool, see getBrowserPool()
+	_browser_session: BrowserSession = None
+	_browser_pool: BrowserSessionPool = None
+	_checkpoints: CheckpointStore = None
+
+	@classmethod
+	def getBrowserPool(cls) -> BrowserSessionPool:
+		if AgentMaster._browser_pool is None:
+			AgentMaster._browser_pool = BrowserSessionPool.from_env(cls._browser_profile)
+		return AgentMaster._browser_pool
+
+	@classmethod
+	async def loadEmbedder(cls) -> None:
+		"""Build the embedding model in a thread before the first agent is created
+
+		setModels() gets models synchronously, a HuggingFace embedder loading its weights
+		there would block the event loop; once built it is a registry lookup.
+		"""
+		if cls.embedder_model_name:
+			await asyncio.to_thread(ModelServant().getModel, cls.embedder_model_name)
+
+	@classmethod
+	def getCheckpointStore(cls) -> CheckpointStore:
+		if AgentMaster._checkpoints is None:
+			AgentMaster._checkpoints = CheckpointStore.from_env()
+		return AgentMaster._checkpoints
+
+	def getResourceFilter(self) -> ResourceFilter:
+		preset = self.resource_preset
+		if preset is None and not os.getenv('MCP_BROWSER_USE_RESOURCE_PRESET'):
+			preset = 'vision' if self.agentConfig['use_vision'] else 'text-only'
+		return ResourceFilter.from_env(preset)
 
 	async def run_search(self) -> AgentHistoryList:
-		agent = self.getAgent()
 		result: str = None
 		if self.task.strip():
-			result = await agent.run(max_steps=self._max_steps)
+			async with self.getBrowserPool().lease() as browser_session, self.getResourceFilter().applied(browser_session):
+				agent = self.getAgent(_browser_session=browser_session)
+				result = await self.runAgent(agent)
 		return result
 
+	async def runAgent(self, agent: Agent) -> AgentHistoryList:
+		"""Run the agent with a span for the whole run and one per step, checkpointed when it has a task_id
+
+		A RunGovernor watches every step and ends looping or stalled runs early, self.stop_reason says why the run ended.
+		"""
+		step_span = None
+		governor = RunGovernor.from_env()
+		checkpoint = self.getCheckpointStore().open(self.task_id, agent.task) if self.task_id else None
+		resumed = checkpoint is not None and await checkpoint.restore(agent)
+		if resumed and agent.state.history.is_done():
+			logger.info(f'⏯️  Task {self.task_id!r} already finished, returning its checkpointed answer')
+			self.stop_reason = 'done'
+			return agent.state.history
+
+		async def on_step_start(agent: Agent):
+			nonlocal step_span
+			step_span = span('agent.step', step=agent.state.n_steps).activate()
+			governor.before_step(agent)
+
+		async def on_step_end(agent: Agent):
+			nonlocal step_span
+			intervention = await governor.after_step(agent)
+			if step_span is not None:
+				step_span.set(actions=len(agent.state.last_result or []), intervention=intervention)
+				step_span.end()
+				step_span = None
+			if checkpoint is not None:
+				try:
+					await checkpoint.save(agent)
+				except Exception as e:
+					logger.warning(f'Checkpoint of task {self.task_id!r} failed: {type(e).__name__}: {e}')
+
+		if not resumed:
+			await self.recallMemory(agent)  # a resumed run has the recalled notes in its restored messages
+		# steps done before the resume count against max_steps
+		max_steps = max(1, self._max_steps - (agent.state.n_steps - 1))
+		with span('agent.run', max_steps=max_steps, resumed=resumed) as run_span:
+			try:
+				history = await agent.run(max_steps=max_steps, on_step_start=on_step_start, on_step_end=on_step_end)
+			except BaseException as e:
+				self.stop_reason = governor.abort(e)
+				raise
+			finally:
+				if step_span is not None:
+					step_span.end()  # the step raised or was cancelled
+			self.stop_reason = governor.finish(agent, history)
+			run_span.set(
+				steps=agent.state.n_steps,
+				input_tokens=history.total_input_tokens(),
+				done=history.is_done(),
+				stop_reason=self.stop_reason,
+			)
+		await self.recordMemory(agent, history)
+		return history
+
+	async def recallMemory(self, agent: Agent):
+		"""Put what earlier runs noted about similar tasks into the agent's context"""
+		if self.vector_memory is None:
+			return
+		try:
+			hits = await self.vector_memory.search(agent.task)
+		except Exception as e:
+			logger.warning(f'Memory recall failed: {type(e).__name__}: {e}')
+			return
+		if hits:
+			notes = '\n'.join(f'- {item["text"]}' for _, item in hits)
+			message = HumanMessage(content=f'Notes from earlier research runs, check them before relying on them:\n{notes}')
+			agent._message_manager._add_message_with_tokens(message, message_type='init')
+			logger.info(f'🧠 Recalled {len(hits)} notes from earlier runs (best match {hits[0][0]:.2f})')
+
+	async def recordMemory(self, agent: Agent, history: AgentHistoryList):
+		"""Store each step's goal, actions and outcome and the final answer, embedded in one batch"""
+		if self.vector_memory is None:
+			return
+		task = ' '.join(agent.task.split())[:300]
+		texts, metas = [], []
+		for step, item in enumerate(history.history, start=1):
+			if item.model_output is None:
+				continue
+			actions = json.dumps([a.model_dump(exclude_none=True, exclude_unset=True) for a in item.model_output.action], ensure_ascii=False)
+			outcome = '; '.join((r.error or r.extracted_content or '').strip() for r in item.result)
+			texts.append(f'Task: {task}\nGoal: {item.model_output.current_state.next_goal}\nActions: {actions[:300]}\nOutcome: {outcome[:300]}')
+			metas.append({'task': task, 'step': step, 'kind': 'step'})
+		if history.is_done():
+			texts.append(f'Task: {task}\nAnswer: {(history.final_result() or "")[:500]}\nSucceeded: {history.is_successful()}')
+			metas.append({'task': task, 'kind': 'result'})
+		try:
+			added = await self.vector_memory.add(texts, metas)
+			logger.debug(f'Stored {added} of {len(texts)} memory items')
+		except Exception as e:
+			logger.warning(f'Memory recording failed: {type(e).__name__}: {e}')
+
 	def setModels(self):
 		
 		Servant = ModelServant()
 		if self.main_model_name:
 			self.main_model=Servant.getModel(self.main_model_name)
-			#self.agentConfig['max_input_tokens'] = self.main_model['kwargs']['num_ctx']
    
 		if self.embedder_model_name:
 			self.embedder_model=Servant.getModel(self.embedder_model_name)
@@ -124,6 +271,13 @@ class AgentMaster:
 		if self.extract_model_model_name:
 			self.extract_model=Servant.getModel(self.extract_model_model_name)
   
+	def setContextBudget(self):
+		"""Size the agent's message history to the num_ctx of the main and planner model"""
+		history_tokens = get_context_budget().history_tokens(self.main_model, self.planner_model)
+		if history_tokens is not None:
+			self.agentConfig['max_input_tokens'] = history_tokens
+			logger.debug(f'Agent history limited to {history_tokens} browser-use tokens by the models num_ctx')
+
 	def getAgent(self, **kwargs) -> Agent: 
 		agent =  Agent(
 			task					= kwargs['task'] if 'task' in kwargs else self.task,
@@ -139,7 +293,7 @@ class AgentMaster:
 			max_actions_per_step	= kwargs['max_actions_per_step'] if 'max_actions_per_step' in kwargs else self.agentConfig['max_actions_per_step'],
 			use_vision				= kwargs['use_vision'] if 'use_vision' in kwargs else self.agentConfig['use_vision'],
 			#save_conversation_path="logs/conversation",
-			enable_memory			= kwargs['enable_memory'] if 'enable_memory' in kwargs else self.agentConfig['enable_memory'],
+			enable_memory			= kwargs['enable_memory'] if 'enable_memory' in kwargs else self.agentConfig['enable_memory'] and self.vector_memory is None,
 			validate_output			= kwargs['validate_output'] if 'validate_output' in kwargs else self.agentConfig['validate_output'],
 			tool_calling_method		= kwargs['tool_calling_method'] if 'tool_calling_method' in kwargs else self.agentConfig['tool_calling_method'], #'function_calling', 'json_mode', 'raw', 'auto', 'tools'
 			planner_interval		= kwargs['planner_interval'] if 'planner_interval' in kwargs else self.agentConfig['planner_interval'],
@@ -150,7 +304,11 @@ class AgentMaster:
 		return agent
 
 	def setMemory(self):
-		if self.agentConfig['enable_memory']:
+		if self.agentConfig['enable_memory'] and isinstance(self.embedder_model, Embeddings):
+			# recall and record through the embedding model, browser-use's mem0 consolidation
+			# would run a chat model every memory_interval steps
+			self.vector_memory = VectorMemory.shared(self.embedder_model_name, self.embedder_model)
+		elif self.agentConfig['enable_memory']:
 			self.memory = MemoryConfig( # Ensure llm_instance is passed if not using default LLM config
 				llm_instance=self.embedder_model,      # Important: Pass the agent's LLM instance here
 				agent_id="my_custom_agent",
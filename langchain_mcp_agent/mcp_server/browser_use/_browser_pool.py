@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from browser_use.browser import BrowserProfile, BrowserSession
+from langchain_mcp_agent.tools._tracing import span
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolTimeout(TimeoutError):
+    pass
+
+
+class BrowserSessionPool:
+    """Pool of pre-warmed incognito browser sessions handed out one lease at a time
+
+    isolation='context' gives every lease a fresh browser context on the already
+    running browser, isolation='clean' keeps the context but closes extra tabs and
+    clears cookies and permissions. Sessions are recycled (browser restarted) after
+    ``max_tasks`` leases, when a lease ends with an exception, or when a health check
+    fails. ``close`` kills idle and leased sessions alike.
+    """
+
+    def __init__(
+        self,
+        browser_profile: BrowserProfile,
+        size: int = 2,
+        max_tasks: int = 20,
+        acquire_timeout: float = 120,
+        isolation: str = 'context',
+    ):
+        if isolation not in ('context', 'clean'):
+            raise ValueError(f'Unknown isolation {isolation!r}, expected "context" or "clean"')
+        self.browser_profile = browser_profile
+        self.size = size
+        self.max_tasks = max_tasks
+        self.acquire_timeout = acquire_timeout
+        self.isolation = isolation
+        self._idle: asyncio.Queue[BrowserSession] = asyncio.Queue()
+        self._tasks_done: dict[str, int] = {}
+        self._leased: dict[str, BrowserSession] = {}
+        self._created = 0
+        self._create_lock = asyncio.Lock()
+        self._closed = False
+
+    @classmethod
+    def from_env(cls, browser_profile: BrowserProfile) -> 'BrowserSessionPool':
+        return cls(
+            browser_profile,
+            size=int(os.getenv('MCP_BROWSER_USE_BROWSER_POOL_SIZE', 2)),
+            max_tasks=int(os.getenv('MCP_BROWSER_USE_BROWSER_POOL_MAX_TASKS', 20)),
+            acquire_timeout=float(os.getenv('MCP_BROWSER_USE_BROWSER_POOL_ACQUIRE_TIMEOUT', 120)),
+            isolation=os.getenv('MCP_BROWSER_USE_BROWSER_POOL_ISOLATION', 'context'),
+        )
+
+    @property
+    def in_use(self) -> int:
+        return self._created - self._idle.qsize()
+
+    async def _launch(self) -> BrowserSession:
+        session = BrowserSession(
+            browser_profile=self.browser_profile,
+            user_data_dir=None,  # incognito, several browsers can not share one profile dir
+            keep_alive=True,  # Agent.close() must not kill a pooled browser
+        )
+        await session.start()
+        self._tasks_done[session.id] = 0
+        return session
+
+    async def _prewarm_one(self) -> None:
+        session = None
+        try:
+            session = await self._launch()
+        finally:
+            # also when prewarm is cancelled part-way, the slot is free again
+            if session is None:
+                self._created -= 1
+        self._idle.put_nowait(session)
+
+    async def prewarm(self) -> None:
+        """Launch browsers until the pool is full"""
+        async with self._create_lock:
+            missing = self.size - self._created
+            self._created += missing
+        results = await asyncio.gather(*(self._prewarm_one() for _ in range(missing)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f'Failed to pre-warm browser session: {type(result).__name__}: {result}')
+        logger.info(f'🌐 Browser pool warmed: {self._idle.qsize()}/{self.size} sessions idle')
+
+    async def _healthy(self, session: BrowserSession) -> bool:
+        if not session.is_connected():
+            return False
+        try:
+            page = await session.get_current_page()
+            await asyncio.wait_for(page.evaluate('1'), timeout=5)
+            return True
+        except Exception as e:
+            logger.debug(f'Browser session {session.id[-4:]} failed health check: {type(e).__name__}: {e}')
+            return False
+
+    async def _kill(self, session: BrowserSession) -> None:
+        try:
+            await session.kill()
+        except Exception as e:
+            logger.debug(f'Error killing browser session {session.id[-4:]}: {type(e).__name__}: {e}')
+
+    async def _recycle(self, session: BrowserSession) -> BrowserSession:
+        self._tasks_done.pop(session.id, None)
+        await self._kill(session)
+        return await self._launch()
+
+    async def _reset(self, session: BrowserSession) -> None:
+        # relies on BrowserSession attributes of browser_use 0.2.x, release() relaunches the
+        # browser if they change and the reset fails
+        if self.isolation == 'context':
+            old_context = session.browser_context
+            session.initialized = False
+            session.browser_context = None
+            session.agent_current_page = None
+            session.human_current_page = None
+            await old_context.close()
+            await session.start()  # opens a new context on the same browser
+        else:
+            pages = session.browser_context.pages
+            for page in pages[1:]:
+                await page.close()
+            if pages:
+                await pages[0].goto('about:blank')
+                session.agent_current_page = pages[0]
+                session.human_current_page = pages[0]
+            await session.browser_context.clear_cookies()
+            await session.browser_context.clear_permissions()
+
+    async def acquire(self, timeout: float | None = None) -> BrowserSession:
+        if self._closed:
+            raise RuntimeError('Browser pool is closed')
+        timeout = self.acquire_timeout if timeout is None else timeout
+
+        session = None
+        async with self._create_lock:
+            if self._idle.empty() and self._created < self.size:
+                self._created += 1
+                launch = True
+            else:
+                launch = False
+        if launch:
+            try:
+                session = await self._launch()
+            except BaseException:
+                self._created -= 1
+                raise
+        else:
+            try:
+                session = await asyncio.wait_for(self._idle.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                raise BrowserPoolTimeout(
+                    f'No browser session free after {timeout}s ({self.in_use}/{self.size} in use)'
+                ) from None
+
+        if not await self._healthy(session):
+            logger.info(f'♻️  Browser session {session.id[-4:]} unhealthy, recycling')
+            try:
+                session = await self._recycle(session)
+            except BaseException:
+                self._created -= 1
+                raise
+        self._leased[session.id] = session
+        return session
+
+    async def release(self, session: BrowserSession, crashed: bool = False) -> None:
+        if self._closed:
+            return  # close() already killed it
+        self._leased.pop(session.id, None)
+        self._tasks_done[session.id] = self._tasks_done.get(session.id, 0) + 1
+        try:
+            if crashed or self._tasks_done[session.id] >= self.max_tasks or not session.is_connected():
+                reason = 'crashed' if crashed else f'after {self._tasks_done[session.id]} tasks'
+                logger.info(f'♻️  Recycling browser session {session.id[-4:]} {reason}')
+                session = await self._recycle(session)
+            else:
+                await self._reset(session)
+        except Exception as e:
+            logger.warning(f'Failed to reset browser session, relaunching: {type(e).__name__}: {e}')
+            try:
+                session = await self._recycle(session)
+            except Exception as e:
+                self._created -= 1
+                logger.error(f'Failed to relaunch browser session: {type(e).__name__}: {e}')
+                return
+        if self._closed:
+            await self._kill(session)  # closed while it was being reset
+            return
+        self._idle.put_nowait(session)
+
+    @asynccontextmanager
+    async def lease(self, timeout: float | None = None):
+        with span('browser.acquire', idle=self._idle.qsize(), in_use=self.in_use):
+            session = await self.acquire(timeout)
+        crashed = False
+        try:
+            yield session
+        except BaseException:
+            crashed = True
+            raise
+        finally:
+            # shielded so a cancelled task still returns its browser to the pool
+            await asyncio.shield(self.release(session, crashed=crashed))
+
+    async def close(self) -> None:
+        self._closed = True
+        sessions = list(self._leased.values())
+        self._leased.clear()
+        while not self._idle.empty():
+            sessions.append(self._idle.get_nowait())
+        for session in sessions:
+            await self._kill(session)
+        self._created = 0
+
+    def stats(self) -> dict:
+        return {'size': self.size, 'created': self._created, 'idle': self._idle.qsize(), 'in_use': self.in_use}
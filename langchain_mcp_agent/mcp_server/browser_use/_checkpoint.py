@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Optional
+
+from pydantic import Field, create_model
+
+from browser_use import Agent
+from browser_use.agent.message_manager.views import MessageManagerState
+from browser_use.agent.views import ActionResult, AgentHistoryList, AgentOutput
+from browser_use.controller.registry.views import ActionModel
+
+logger = logging.getLogger(__name__)
+
+
+def _history_output_model(agent: Agent) -> type[AgentOutput]:
+    """AgentOutput over every registered action, domain restricted ones included
+
+    The agent's own AgentOutput only knows the actions allowed on the page it is on,
+    a checkpointed step may have used one that is not, e.g. extract_search_page_result.
+    """
+    actions = agent.controller.registry.registry.actions
+    model = create_model(
+        'ActionModel',
+        __base__=ActionModel,
+        **{name: (Optional[action.param_model], Field(default=None)) for name, action in actions.items()},
+    )
+    return AgentOutput.type_with_custom_actions(model)
+
+
+class RunCheckpoint:
+    """Checkpoint of one task id, written after every step that finished without an error
+
+    ``history.jsonl`` gets one line per new history item, so a step appends instead of
+    rewriting the whole history. ``state.json`` is replaced atomically and holds the
+    rest of the agent state: step counter, last results and plan, the message history
+    (with any memory consolidated into it), the page the agent was on, visited urls and
+    extracted content. It counts the history lines that belong to it, lines written by
+    a step that never got its state.json are ignored on restore.
+    """
+
+    def __init__(self, path: Path, task_id: str, task: str):
+        self.path = path
+        self.task_id = task_id
+        self.task = task
+        self.saved_items = 0
+        self.saves = 0
+
+    @property
+    def history_path(self) -> Path:
+        return self.path / 'history.jsonl'
+
+    @property
+    def state_path(self) -> Path:
+        return self.path / 'state.json'
+
+    def _read(self) -> tuple[dict, list[dict]] | None:
+        if not self.state_path.exists():
+            return None
+        state = json.loads(self.state_path.read_text(encoding='utf-8'))
+        items = []
+        with open(self.history_path, 'r+b') as f:
+            while len(items) < state['history_items']:
+                line = f.readline()
+                if not line.endswith(b'\n'):
+                    raise ValueError(f'history.jsonl has {len(items)} of {state["history_items"]} items')
+                items.append(json.loads(line))
+            f.truncate()  # lines of a step that did not get to write its state.json
+        return state, items
+
+    def clear(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.saved_items = 0
+
+    async def restore(self, agent: Agent) -> bool:
+        """Load the checkpoint into ``agent`` and reopen its last page, False if there is none"""
+        try:
+            loaded = await asyncio.to_thread(self._read)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f'Checkpoint of task {self.task_id!r} is unreadable, starting over: {type(e).__name__}: {e}')
+            await asyncio.to_thread(self.clear)
+            return False
+        if loaded is None:
+            return False
+        state, items = loaded
+        if state['task'] != self.task:
+            logger.warning(f'Checkpoint of task id {self.task_id!r} belongs to another task, starting over')
+            await asyncio.to_thread(self.clear)
+            return False
+
+        output_model = _history_output_model(agent)
+        for item in items:
+            if item['model_output']:
+                item['model_output'] = output_model.model_validate(item['model_output'])
+            item['state'].setdefault('interacted_element', None)
+        agent.state.history = AgentHistoryList.model_validate({'history': items})
+        agent.state.n_steps = state['n_steps']
+        agent.state.consecutive_failures = state['consecutive_failures']
+        agent.state.last_plan = state['last_plan']
+        agent.state.last_result = [ActionResult.model_validate(r) for r in state['last_result']] or None
+        messages = MessageManagerState.model_validate(state['messages'])
+        agent.state.message_manager_state = messages
+        agent._message_manager.state = messages
+        agent.initial_actions = None  # they ran in the checkpointed run already
+        self.saved_items = len(items)
+
+        if state['url'] and not state['done']:
+            try:
+                await agent.browser_session.navigate_to(state['url'])
+            except Exception as e:
+                logger.warning(f'Could not reopen {state["url"]} for the resumed run: {type(e).__name__}: {e}')
+        logger.info(f'⏯️  Resuming task {self.task_id!r} after step {state["n_steps"] - 1} on {state["url"]}')
+        return True
+
+    def _write(self, new_items: list[dict], state: dict) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        mode = 'a' if self.saved_items else 'w'
+        with open(self.history_path, mode, encoding='utf-8') as f:
+            for item in new_items:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        tmp = self.state_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(state, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.state_path)
+
+    async def save(self, agent: Agent) -> bool:
+        """Checkpoint the step that just ended, unless it failed"""
+        history = agent.state.history
+        if not history.history:
+            return False
+        last = history.history[-1]
+        if last.model_output is None or any(r.error for r in last.result):
+            return False  # a resumed run retries from the last good step
+        # serialized on the loop, the agent state changes as soon as the next step starts
+        new_items = [item.model_dump() for item in history.history[self.saved_items:]]
+        state = {
+            'task_id': self.task_id,
+            'task': self.task,
+            'saved': time.time(),
+            'history_items': len(history.history),
+            'n_steps': agent.state.n_steps,
+            'consecutive_failures': agent.state.consecutive_failures,
+            'last_plan': agent.state.last_plan,
+            'last_result': [r.model_dump() for r in agent.state.last_result or []],
+            'messages': agent.state.message_manager_state.model_dump(mode='json'),
+            'url': last.state.url,
+            'visited_urls': list(dict.fromkeys(url for url in history.urls() if url)),
+            'extracted': history.extracted_content(),
+            'done': history.is_done(),
+        }
+        await asyncio.to_thread(self._write, new_items, state)
+        self.saved_items = len(history.history)
+        self.saves += 1
+        return True
+
+
+class CheckpointStore:
+    """Directory of RunCheckpoints, one sub directory per task id
+
+    Checkpoints older than ``ttl`` seconds are removed when the next one is opened.
+    Finished runs keep theirs until then, so repeating a task id returns the answer
+    without running again.
+    """
+
+    def __init__(self, directory: str | Path | None, ttl: float = 7 * 24 * 3600):
+        self.directory = Path(directory).expanduser() if directory else None
+        self.ttl = ttl
+
+    @classmethod
+    def from_env(cls) -> 'CheckpointStore':
+        return cls(
+            os.getenv('MCP_BROWSER_USE_CHECKPOINT_DIR', '~/.cache/langchain_mcp_agent/checkpoints'),
+            ttl=float(os.getenv('MCP_BROWSER_USE_CHECKPOINT_TTL', 7 * 24 * 3600)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def prune(self) -> int:
+        if not self.enabled or self.ttl <= 0 or not self.directory.exists():
+            return 0
+        expired = 0
+        cutoff = time.time() - self.ttl
+        for path in self.directory.iterdir():
+            if path.is_dir() and path.stat().st_mtime < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                expired += 1
+        return expired
+
+    def open(self, task_id: str, task: str) -> RunCheckpoint | None:
+        if not self.enabled:
+            return None
+        try:
+            self.prune()
+        except OSError as e:
+            logger.debug(f'Checkpoint pruning failed: {type(e).__name__}: {e}')
+        name = re.sub(r'[^\w.-]+', '_', task_id).strip('.') or '_'
+        return RunCheckpoint(self.directory / name, task_id, task)
@@ -0,0 +1,179 @@
+import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from browser_use.browser import BrowserSession
+
+logger = logging.getLogger(__name__)
+
+# resource types a preset blocks, and whether it blocks trackers and third-party scripts
+PRESETS = {
+    'text-only': {'types': {'image', 'media', 'font', 'texttrack'}, 'trackers': True, 'third_party_scripts': False},
+    'vision': {'types': {'media', 'texttrack'}, 'trackers': True, 'third_party_scripts': False},
+    'full': {'types': set(), 'trackers': False, 'third_party_scripts': False},
+}
+
+# ad, analytics and tracking hosts, subdomains included
+TRACKER_DOMAINS = frozenset({
+    '2mdn.net', 'adform.net', 'adnxs.com', 'adsrvr.org', 'adservice.google.com', 'amazon-adsystem.com',
+    'bat.bing.com', 'casalemedia.com', 'chartbeat.com', 'chartbeat.net', 'clarity.ms', 'connect.facebook.net',
+    'criteo.com', 'criteo.net', 'demdex.net', 'doubleclick.net', 'everesttech.net', 'google-analytics.com',
+    'googleadservices.com', 'googlesyndication.com', 'googletagmanager.com', 'googletagservices.com',
+    'hotjar.com', 'hs-analytics.net', 'krxd.net', 'mc.yandex.ru', 'mixpanel.com', 'moatads.com',
+    'nr-data.net', 'omtrdc.net', 'openx.net', 'optimizely.com', 'outbrain.com', 'pubmatic.com',
+    'quantserve.com', 'rubiconproject.com', 'scorecardresearch.com', 'segment.io', 'smartadserver.com',
+    'taboola.com', 'tiqcdn.com', 'adsafeprotected.com', 'analytics.tiktok.com', 'ads-twitter.com',
+    'static.ads-twitter.com', 'snap.licdn.com', 'px.ads.linkedin.com',
+})
+
+# rough transfer size per blocked request, used to estimate the bytes saved
+_TYPICAL_BYTES = {
+    'image': 40_000, 'media': 500_000, 'font': 35_000, 'script': 30_000,
+    'stylesheet': 15_000, 'xhr': 5_000, 'fetch': 5_000, 'document': 30_000, 'texttrack': 5_000,
+}
+_OTHER_BYTES = 5_000
+
+
+def _site(host: str) -> str:
+    """Registrable part of a host, good enough to tell first from third party"""
+    labels = host.lower().rstrip('.').split('.')
+    if len(labels) >= 3 and len(labels[-1]) == 2 and len(labels[-2]) <= 3:
+        return '.'.join(labels[-3:])  # example.co.uk
+    return '.'.join(labels[-2:])
+
+
+def _on_domains(host: str, domains) -> bool:
+    host = host.lower()
+    parts = host.split('.')
+    return any('.'.join(parts[i:]) in domains for i in range(len(parts) - 1))
+
+
+class ResourceFilter:
+    """Blocks requests the agent never looks at, per browser context
+
+    Requests are blocked by resource type, by domain (the built-in TRACKER_DOMAINS
+    plus ``block_domains``) and, if enabled, when they are scripts from another site
+    than the page. The top level document is never blocked. Blocked requests and an
+    estimate of the bytes they would have transferred are counted per page. Note that
+    routing requests disables Playwright's http cache for the context.
+    """
+
+    _totals = {'requests': 0, 'bytes_est': 0, 'by_reason': {}}
+
+    def __init__(
+        self,
+        preset: str = 'text-only',
+        block_domains: set[str] | None = None,
+        third_party_scripts: bool | None = None,
+        max_pages: int = 100,
+    ):
+        if preset not in PRESETS:
+            raise ValueError(f'Unknown resource preset {preset!r}, expected one of {list(PRESETS)}')
+        config = PRESETS[preset]
+        self.preset = preset
+        self.block_types = set(config['types'])
+        self.block_domains = set(TRACKER_DOMAINS if config['trackers'] else ()) | set(block_domains or ())
+        self.block_third_party_scripts = config['third_party_scripts'] if third_party_scripts is None else third_party_scripts
+        self.max_pages = max_pages
+        self.pages: OrderedDict[str, dict] = OrderedDict()
+
+    @classmethod
+    def from_env(cls, preset: str | None = None) -> 'ResourceFilter':
+        """``preset`` wins over MCP_BROWSER_USE_RESOURCE_PRESET, which wins over text-only"""
+        preset = preset or os.getenv('MCP_BROWSER_USE_RESOURCE_PRESET') or 'text-only'
+        domains = os.getenv('MCP_BROWSER_USE_RESOURCE_BLOCK_DOMAINS', '')
+        third_party = os.getenv('MCP_BROWSER_USE_RESOURCE_BLOCK_THIRD_PARTY_SCRIPTS', '').lower()
+        return cls(
+            preset=preset,
+            block_domains={d.strip().lower() for d in domains.split(',') if d.strip()},
+            # only text-only tasks can afford to lose third party scripts
+            third_party_scripts=third_party == 'true' and preset == 'text-only',
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.block_types or self.block_domains or self.block_third_party_scripts)
+
+    def _block_reason(self, request, page_url: str) -> str | None:
+        resource_type = request.resource_type
+        if resource_type == 'document' and request.is_navigation_request() and request.frame.parent_frame is None:
+            return None
+        if resource_type in self.block_types:
+            return f'type:{resource_type}'
+        host = urlsplit(request.url).hostname or ''
+        if self.block_domains and _on_domains(host, self.block_domains):
+            return 'domain'
+        if self.block_third_party_scripts and resource_type == 'script':
+            page_host = urlsplit(page_url).hostname or ''
+            if page_host and _site(host) != _site(page_host):
+                return 'third-party-script'
+        return None
+
+    def _count(self, page_url: str, resource_type: str, reason: str) -> None:
+        size = _TYPICAL_BYTES.get(resource_type, _OTHER_BYTES)
+        stats = self.pages.get(page_url)
+        if stats is None:
+            stats = self.pages[page_url] = {'requests': 0, 'bytes_est': 0}
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        stats['requests'] += 1
+        stats['bytes_est'] += size
+        totals = ResourceFilter._totals
+        totals['requests'] += 1
+        totals['bytes_est'] += size
+        totals['by_reason'][reason] = totals['by_reason'].get(reason, 0) + 1
+
+    async def _handle(self, route) -> None:
+        request = route.request
+        try:
+            page_url = request.frame.page.url
+        except Exception:
+            page_url = ''  # service worker requests have no frame
+        reason = self._block_reason(request, page_url)
+        if reason is None:
+            await route.fallback()
+            return
+        self._count(page_url or request.url, request.resource_type, reason)
+        await route.abort('blockedbyclient')
+
+    @asynccontextmanager
+    async def applied(self, browser_session: BrowserSession):
+        """Filter the session's browser context for the duration of the block"""
+        if not self.active:
+            yield self
+            return
+        if browser_session.browser_context is None:
+            await browser_session.start()
+        context = browser_session.browser_context
+        await context.route('**/*', self._handle)
+        try:
+            yield self
+        finally:
+            try:
+                await context.unroute('**/*', self._handle)
+            except Exception as e:
+                logger.debug(f'Could not remove resource filter: {type(e).__name__}: {e}')
+            stats = self.stats()
+            if stats['requests']:
+                logger.info(
+                    f'🧹 Resource filter ({self.preset}) blocked {stats["requests"]} requests, '
+                    f'~{stats["bytes_est"] / 2**20:.1f}MB on {len(self.pages)} pages'
+                )
+
+    def stats(self) -> dict:
+        return {
+            'preset': self.preset,
+            'requests': sum(p['requests'] for p in self.pages.values()),
+            'bytes_est': sum(p['bytes_est'] for p in self.pages.values()),
+            'pages': dict(self.pages),
+        }
+
+    @classmethod
+    def total_stats(cls) -> dict:
+        return {
+            'requests': cls._totals['requests'],
+            'mb_est': round(cls._totals['bytes_est'] / 2**20, 2),
+            'by_reason': dict(cls._totals['by_reason']),
+        }
@@ -0,0 +1,134 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from langchain_mcp_agent.tools._tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+_SPACES = re.compile(r'\s+')
+_EDGE_PUNCTUATION = '\'"`.,;:!?¿¡ '
+
+
+def normalize_task(task: str) -> str:
+    """The task as it is compared for caching: case, spacing, quotes and end punctuation ignored"""
+    task = unicodedata.normalize('NFKC', task).casefold()
+    task = _SPACES.sub(' ', task)
+    return task.strip(_EDGE_PUNCTUATION)
+
+
+@dataclass
+class _Flight:
+    task: asyncio.Task
+    waiters: int = 0
+
+
+class ResearchCache:
+    """Caches web_research answers and runs identical concurrent requests once
+
+    Answers are keyed on the normalized task and the model that produced them. A
+    request for a task that is already running waits for that run (single-flight)
+    instead of starting its own, the run is only cancelled once every request
+    waiting on it is gone. Failed runs and runs without a final answer are not
+    cached, nor results ``cacheable`` rejects. ``refresh`` skips the cache lookup but
+    still joins a running request. A request with a ``task_id`` only joins a run with
+    the same ``task_id``, the run checkpoints under its own id and another id would
+    have nothing to resume from.
+    """
+
+    def __init__(self, cache: TieredCache | None = None, enabled: bool = True):
+        self.cache = cache or TieredCache()
+        self.enabled = enabled
+        self._inflight: dict[str, _Flight] = {}
+        self.runs = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls) -> 'ResearchCache':
+        ttl = float(os.getenv('MCP_BROWSER_USE_RESULT_CACHE_TTL', 3600))
+        return cls(
+            TieredCache(
+                max_items=int(os.getenv('MCP_BROWSER_USE_RESULT_CACHE_SIZE', 128)),
+                db_path=os.getenv('MCP_BROWSER_USE_RESULT_CACHE_DB') or None,
+                ttl=ttl if ttl > 0 else None,
+                max_rows=int(os.getenv('MCP_BROWSER_USE_RESULT_CACHE_MAX_ROWS', 1000)),
+                table='research_cache',
+            ),
+            enabled=os.getenv('MCP_BROWSER_USE_RESULT_CACHE_ENABLED', 'true').lower() == 'true',
+        )
+
+    @staticmethod
+    def key(task: str, model: str) -> str:
+        raw = json.dumps([normalize_task(task), model])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    async def _run(
+        self,
+        key: str,
+        run: Callable[[], Awaitable[str | None]],
+        cacheable: Callable[[str], bool] | None = None,
+    ) -> str | None:
+        self.runs += 1
+        result = await run()
+        if result is not None and self.enabled and (cacheable is None or cacheable(result)):
+            await self.cache.aput(key, result)
+        return result
+
+    async def get_or_run(
+        self,
+        task: str,
+        model: str,
+        run: Callable[[], Awaitable[str | None]],
+        refresh: bool = False,
+        cacheable: Callable[[str], bool] | None = None,
+        task_id: str | None = None,
+    ) -> tuple[str | None, str]:
+        """The answer and where it came from: 'cache', 'shared' (joined a running request) or 'run'"""
+        key = self.key(task, model)
+        flight_key = f'{key}:{task_id}' if task_id else key
+        if self.enabled and not refresh:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                logger.info(f'♻️  web_research answered from cache: {task[:80]!r}')
+                return cached, 'cache'
+
+        flight = self._inflight.get(flight_key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(self._run(key, run, cacheable)))
+            self._inflight[flight_key] = flight
+            # a done callback also runs for a task cancelled before it started
+            flight.task.add_done_callback(lambda _, key=flight_key, flight=flight: self._land(key, flight))
+            source = 'run'
+        else:
+            self.coalesced += 1
+            logger.info(f'🔗 web_research joined a running request: {task[:80]!r}')
+            source = 'shared'
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), source
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()  # nobody is left to read the answer
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+        if not flight.task.cancelled():
+            flight.task.exception()  # retrieved here, waiters got it through shield()
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            'enabled': self.enabled,
+            'runs': self.runs,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight),
+        }
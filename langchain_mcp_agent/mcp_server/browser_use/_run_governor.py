@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from langchain_core.messages import HumanMessage
+
+from browser_use import Agent
+from browser_use.agent.views import ActionResult, AgentHistory, AgentHistoryList
+from browser_use.browser.views import BrowserStateHistory
+from langchain_mcp_agent.mcp_server.browser_use.controller._multi_search import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+SEARCH_ACTIONS = ('search_google', 'search_bing', 'search_duckduckgo', 'search_web')
+EXTRACTION_ACTIONS = ('extract_content', 'fetch_page_content', 'extract_search_page_result', 'search_web')
+_WORDS = re.compile(r'\w+')
+# left out when comparing search queries, "bones in the human body" is "human body bones"
+_STOPWORDS = frozenset('a an and are as at by for from how in is it of on or the to what when where which who why with'.split())
+# scroll position included, scrolling on through a long page is progress
+_PAGE_TEXT = '() => `${window.scrollY}|${document.body ? document.body.innerText.slice(0, 20000) : ""}`'
+
+HINTS = {
+    'cycle': (
+        'You are repeating yourself: {detail}. Doing it again will not give a different result. '
+        'Take a different approach: another source, another query wording, or answer with what you already found.'
+    ),
+    'stalled': (
+        'The last {steps} steps found no new page, content or extracted information. '
+        'Change your approach, or use the done action with the information you already have.'
+    ),
+}
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()[:16]
+
+
+def _query_words(query: str) -> frozenset[str]:
+    return frozenset(word for word in _WORDS.findall(query.casefold()) if word not in _STOPWORDS)
+
+
+def _similar(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 1.0 if a == b else 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class StepFingerprint:
+    url: str
+    actions: tuple[str, ...]  # 'name {params}' per action
+    content: str  # hash of the page text and scroll position after the step
+    extracted: tuple[str, ...]  # hashes of the extracted content
+    searches: tuple[str, ...]
+
+
+class RunGovernor:
+    """Watches an agent run step by step and ends it when it stops getting anywhere
+
+    Every step is fingerprinted by url, actions with their parameters, a hash of the
+    page text and of what the step extracted. A step makes progress when any of the
+    url, page content or extraction is new. Two problems are detected:
+
+    - cycle: the same actions ending in the same page state ``repeat_limit`` times
+      (revisiting a url, clicking something that changes nothing), or a search
+      whose words overlap an earlier one by ``search_similarity`` (Jaccard) for the
+      ``repeat_limit``-th time
+    - stalled: ``stall_steps`` steps in a row without progress
+
+    Each detection escalates: first a corrective hint is put into the agent's
+    messages, then the planner is forced to run on the next step, then the run is
+    stopped. Wall-clock, token and step budgets stop the run directly. A stopped run
+    ends with the extracted content so far as its answer, ``reason`` says why the run
+    ended either way.
+    """
+
+    _totals: Counter = Counter()
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        stall_steps: int = 4,
+        repeat_limit: int = 3,
+        search_similarity: float = 0.7,
+        max_seconds: float = 0,
+        max_tokens: int = 0,
+        max_steps: int = 0,
+    ):
+        self.enabled = enabled
+        self.stall_steps = stall_steps
+        self.repeat_limit = repeat_limit
+        self.search_similarity = search_similarity
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.max_steps = max_steps
+        self.reason: str | None = None
+        self.detail: str | None = None
+        self.interventions: list[str] = []
+        self._started = time.monotonic()
+        self._steps = 0
+        self._seen_urls: set[str] = set()
+        self._seen_content: set[str] = set()
+        self._seen_extracted: set[str] = set()
+        self._signatures: Counter = Counter()
+        self._searches: list[frozenset[str]] = []
+        self._without_progress = 0
+        self._escalation = 0
+        self._force_plan = False
+        self._planner_interval: int | None = None
+
+    @classmethod
+    def from_env(cls) -> 'RunGovernor':
+        return cls(
+            enabled=os.getenv('MCP_BROWSER_USE_GOVERNOR', 'true').lower() == 'true',
+            stall_steps=int(os.getenv('MCP_BROWSER_USE_GOVERNOR_STALL_STEPS', 4)),
+            repeat_limit=int(os.getenv('MCP_BROWSER_USE_GOVERNOR_REPEAT_LIMIT', 3)),
+            search_similarity=float(os.getenv('MCP_BROWSER_USE_GOVERNOR_SEARCH_SIMILARITY', 0.7)),
+            max_seconds=float(os.getenv('MCP_BROWSER_USE_GOVERNOR_MAX_SECONDS', 0)),
+            max_tokens=int(os.getenv('MCP_BROWSER_USE_GOVERNOR_MAX_TOKENS', 0)),
+            max_steps=int(os.getenv('MCP_BROWSER_USE_GOVERNOR_MAX_STEPS', 0)),
+        )
+
+    @classmethod
+    def total_stats(cls) -> dict:
+        """How the runs of this process ended, by reason"""
+        return dict(cls._totals)
+
+    async def _page_digest(self, agent: Agent, item: AgentHistory) -> str:
+        try:
+            page = await agent.browser_session.get_current_page()
+            text = await asyncio.wait_for(page.evaluate(_PAGE_TEXT), timeout=2)
+        except Exception:
+            text = f'{item.state.url}\n{item.state.title}'
+        return _digest(text or '')
+
+    async def fingerprint(self, agent: Agent, item: AgentHistory) -> StepFingerprint:
+        actions, searches = [], []
+        for action in item.model_output.action if item.model_output else []:
+            for name, params in action.model_dump(exclude_none=True, exclude_unset=True).items():
+                actions.append(f'{name} {json.dumps(params, sort_keys=True, default=str)}')
+                if name in SEARCH_ACTIONS and isinstance(params, dict) and params.get('query'):
+                    searches.append(params['query'])
+        return StepFingerprint(
+            url=canonicalize_url(item.state.url) if item.state.url else '',
+            actions=tuple(actions),
+            content=await self._page_digest(agent, item),
+            extracted=tuple(_digest(r.extracted_content) for r in item.result if r.extracted_content and not r.error),
+            searches=tuple(searches),
+        )
+
+    def _progress(self, step: StepFingerprint) -> bool:
+        new_url = step.url and step.url not in self._seen_urls
+        new_content = step.content not in self._seen_content
+        new_extracted = any(e not in self._seen_extracted for e in step.extracted)
+        self._seen_urls.add(step.url)
+        self._seen_content.add(step.content)
+        self._seen_extracted.update(step.extracted)
+        return bool(new_url or new_content or new_extracted)
+
+    def _cycle(self, step: StepFingerprint) -> str | None:
+        detail = None
+        if step.actions:
+            signature = (step.url, step.actions, step.content)
+            self._signatures[signature] += 1
+            if self._signatures[signature] >= self.repeat_limit:
+                detail = f'{self._signatures[signature]}x {"; ".join(step.actions)[:200]} on {step.url or "the same page"}'
+        for query in step.searches:
+            words = _query_words(query)
+            similar = sum(1 for earlier in self._searches if _similar(words, earlier) >= self.search_similarity)
+            self._searches.append(words)
+            if similar + 1 >= self.repeat_limit:
+                detail = f'{similar + 1} searches like "{query[:100]}"'
+        return detail
+
+    def _budget(self, agent: Agent) -> str | None:
+        if self.max_seconds and time.monotonic() - self._started >= self.max_seconds:
+            return 'wall_clock'
+        if self.max_tokens and agent.state.history.total_input_tokens() >= self.max_tokens:
+            return 'tokens'
+        if self.max_steps and self._steps >= self.max_steps:
+            return 'steps'
+        return None
+
+    def _stop(self, agent: Agent, reason: str, detail: str | None = None) -> str:
+        self.reason, self.detail = reason, detail
+        self.interventions.append('stop')
+        logger.info(f'🛑 Stopping the run early: {reason}{f" ({detail})" if detail else ""}')
+        agent.stop()
+        return 'stop'
+
+    def _escalate(self, agent: Agent, problem: str, detail: str) -> str:
+        self._escalation += 1
+        self._without_progress = 0
+        if self._escalation >= 3:
+            return self._stop(agent, problem, detail)
+        if self._escalation == 2 and agent.settings.planner_llm is not None:
+            self._force_plan = True
+            self.interventions.append('plan')
+            logger.info(f'🧭 {problem}: {detail}, forcing the planner on the next step')
+            return 'plan'
+        hint = HINTS[problem].format(detail=detail, steps=self.stall_steps)
+        agent._message_manager._add_message_with_tokens(HumanMessage(content=hint))
+        self.interventions.append('hint')
+        logger.info(f'💡 {problem}: {detail}, added a hint')
+        return 'hint'
+
+    def before_step(self, agent: Agent) -> None:
+        if self._force_plan and agent.settings.planner_llm is not None:
+            # the planner runs on steps where n_steps % planner_interval == 0
+            self._planner_interval = agent.settings.planner_interval
+            agent.settings.planner_interval = 1
+        self._force_plan = False
+
+    async def after_step(self, agent: Agent) -> str | None:
+        """Check the step that just ended, returns the intervention: 'hint', 'plan', 'stop' or None"""
+        if self._planner_interval is not None:
+            agent.settings.planner_interval = self._planner_interval
+            self._planner_interval = None
+        if not self.enabled or not agent.state.history.history:
+            return None
+        self._steps += 1
+        item = agent.state.history.history[-1]
+        if agent.state.history.is_done():
+            return None
+
+        step = await self.fingerprint(agent, item)
+        cycle = self._cycle(step)
+        if self._progress(step):
+            self._without_progress = 0
+        else:
+            self._without_progress += 1
+
+        budget = self._budget(agent)
+        if budget:
+            return self._stop(agent, budget)
+        if cycle:
+            return self._escalate(agent, 'cycle', cycle)
+        if self._without_progress >= self.stall_steps:
+            return self._escalate(agent, 'stalled', f'{self._without_progress} steps without progress')
+        return None
+
+    def partial_result(self, history: AgentHistoryList) -> str:
+        """What the run extracted so far, newest first, or the agent's own notes if nothing"""
+        parts = []
+        for item in reversed(history.history):
+            if item.model_output is None:
+                continue
+            for action, result in zip(item.model_output.action, item.result):
+                name = next(iter(action.model_dump(exclude_none=True, exclude_unset=True)), None)
+                if name in EXTRACTION_ACTIONS and result.extracted_content and not result.error:
+                    parts.append(result.extracted_content.strip()[:2000])
+            if len(parts) >= 3:
+                break
+        if not parts:
+            notes = next((i.model_output.current_state.memory for i in reversed(history.history) if i.model_output), '')
+            parts = [notes] if notes else []
+        found = '\n\n'.join(parts) if parts else 'nothing'
+        why = f'{self.reason}: {self.detail}' if self.detail else self.reason
+        return f'Stopped early ({why}) after {self._steps} steps without a final answer. Found so far:\n{found}'
+
+    def abort(self, error: BaseException) -> str:
+        """Record a run that raised or was cancelled"""
+        self.reason = 'cancelled' if isinstance(error, asyncio.CancelledError) else 'error'
+        RunGovernor._totals[self.reason] += 1
+        return self.reason
+
+    def finish(self, agent: Agent, history: AgentHistoryList) -> str:
+        """Why the run ended; a run this governor stopped gets its partial result as answer"""
+        if self.reason is not None:
+            history.history.append(
+                AgentHistory(
+                    model_output=None,
+                    result=[ActionResult(is_done=True, success=False, extracted_content=self.partial_result(history), include_in_memory=True)],
+                    state=BrowserStateHistory(url='', title='', tabs=[], interacted_element=[], screenshot=None),
+                    metadata=None,
+                )
+            )
+            reason = self.reason
+        elif history.is_done():
+            reason = 'done'
+        elif agent.state.consecutive_failures >= agent.settings.max_failures:
+            reason = 'max_failures'
+        elif agent.state.stopped:
+            reason = 'stopped'
+        else:
+            reason = 'max_steps'
+        self.reason = reason
+        RunGovernor._totals[reason] += 1
+        logger.info(f'🏁 Run ended: {reason} after {self._steps} steps, interventions: {self.interventions or "none"}')
+        return reason
@@ -0,0 +1,134 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import statistics
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from langchain_mcp_agent.tools._tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class SchedulerBusy(Exception):
+    pass
+
+
+class TaskScheduler:
+    """Admission control for long running tool calls
+
+    At most ``max_concurrency`` tasks run at once, up to ``max_queue`` more wait in a
+    priority queue (higher priority first, FIFO within a priority) and anything
+    beyond that is rejected immediately with SchedulerBusy. Each task runs under a
+    deadline; on timeout or caller cancellation the task is cancelled.
+    """
+
+    def __init__(self, max_concurrency: int = 2, max_queue: int = 8, timeout: float = 600, max_steps: int = 50):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_steps = max_steps
+        self._running = 0
+        self._waiting: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wait_times: deque[float] = deque(maxlen=500)
+        self.submitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.cancelled = 0
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> 'TaskScheduler':
+        return cls(
+            max_concurrency=int(os.getenv('MCP_BROWSER_USE_RESEARCH_MAX_CONCURRENCY', os.getenv('MCP_BROWSER_USE_BROWSER_POOL_SIZE', 2))),
+            max_queue=int(os.getenv('MCP_BROWSER_USE_RESEARCH_MAX_QUEUE', 8)),
+            timeout=float(os.getenv('MCP_BROWSER_USE_RESEARCH_TIMEOUT', 600)),
+            max_steps=int(os.getenv('MCP_BROWSER_USE_RESEARCH_MAX_STEPS', 50)),
+        )
+
+    def budget(self, timeout: float | None = None, max_steps: int | None = None) -> tuple[float, int]:
+        """Clamp caller supplied limits to the configured maxima"""
+        timeout = self.timeout if not timeout or timeout <= 0 else min(timeout, self.timeout)
+        max_steps = self.max_steps if not max_steps or max_steps <= 0 else min(max_steps, self.max_steps)
+        return timeout, max_steps
+
+    async def _admit(self, priority: int) -> None:
+        if self._running < self.max_concurrency and not self._waiting:
+            self._running += 1
+            return
+        if len(self._waiting) >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerBusy(
+                f'busy: {self._running} tasks running and {len(self._waiting)} queued, try again later'
+            )
+        slot = asyncio.get_running_loop().create_future()
+        entry = (-priority, next(self._seq), slot)
+        heapq.heappush(self._waiting, entry)
+        try:
+            await slot
+        except asyncio.CancelledError:
+            if entry in self._waiting:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+            elif slot.done() and not slot.cancelled():
+                # slot was handed over just before the cancel landed, pass it on
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiting:
+            _, _, slot = heapq.heappop(self._waiting)
+            if not slot.done():
+                slot.set_result(None)  # the slot moves to the waiter, _running stays the same
+                return
+        self._running -= 1
+
+    async def run(self, factory: Callable[[], Awaitable[T]], priority: int = 0, timeout: float | None = None) -> T:
+        self.submitted += 1
+        queued_at = time.monotonic()
+        with span('scheduler.wait', priority=priority, running=self._running, queued=len(self._waiting)):
+            await self._admit(priority)
+        self._wait_times.append(time.monotonic() - queued_at)
+        timeout = timeout or self.timeout
+        try:
+            result = await asyncio.wait_for(factory(), timeout=timeout)
+            self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.warning(f'⏱️ Task cancelled after exceeding its {timeout}s deadline')
+            raise
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self._release()
+
+    def stats(self) -> dict:
+        waits = sorted(self._wait_times)
+        return {
+            'running': self._running,
+            'queued': len(self._waiting),
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'cancelled': self.cancelled,
+            'wait_seconds_avg': round(statistics.fmean(waits), 3) if waits else 0.0,
+            'wait_seconds_p95': round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+            'wait_seconds_max': round(waits[-1], 3) if waits else 0.0,
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _import_agent():
+    # browser_use, playwright and the model stack, the bulk of the server's start time
+    from langchain_mcp_agent.mcp_server.browser_use.bu_easy_agent import BUEasyAgent
+    return BUEasyAgent
+
+
+class ServerWarmup:
+    """Gets the server ready for its first web_research call in the background
+
+    Imports the agent stack off the event loop, then launches the pooled browsers and
+    loads the chat models the agent uses (main, planner, extract) into Ollama at the
+    same time. With ``warm_embedder`` the embedding model is built too, which for a
+    HuggingFace model loads its weights into this process. The MCP handshake does not wait for any of it, tools get the
+    agent class through ``agent_class()``, which waits for the import only.
+    """
+
+    def __init__(self, warm_models: bool = True, warm_embedder: bool = True, timeout: float = 600):
+        self.warm_models = warm_models
+        self.warm_embedder = warm_embedder
+        self.timeout = timeout
+        self.phase = 'idle'  # importing, warming, ready, degraded (a model failed) or failed
+        self.seconds: float | None = None
+        self.models: dict = {}
+        self.error: str | None = None
+        self._import: asyncio.Future | None = None
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls) -> 'ServerWarmup':
+        return cls(
+            warm_models=os.getenv('MCP_BROWSER_USE_WARMUP_MODELS', 'true').lower() == 'true',
+            warm_embedder=os.getenv('MCP_BROWSER_USE_WARMUP_EMBEDDER', 'true').lower() == 'true',
+            timeout=float(os.getenv('MCP_BROWSER_USE_WARMUP_TIMEOUT', 600)),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.phase == 'ready'
+
+    async def agent_class(self):
+        """BUEasyAgent, imported in a thread the first time"""
+        if self._import is None:
+            self._import = asyncio.ensure_future(asyncio.to_thread(_import_agent))
+        return await asyncio.shield(self._import)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def _warm_models(self, agent_class) -> None:
+        from langchain_mcp_agent.mcp_server.browser_use._agent_master import ModelServant
+        names = []
+        if self.warm_models:
+            names += [agent_class.main_model_name, agent_class.planner_model_model_name, agent_class.extract_model_model_name]
+        if self.warm_embedder:
+            names.append(agent_class.embedder_model_name)
+        self.models = await ModelServant().warmModels(names)
+
+    async def _run(self) -> None:
+        started = time.monotonic()
+        self.phase = 'importing'
+        try:
+            agent_class = await self.agent_class()
+            self.phase = 'warming'
+            jobs = [agent_class.getBrowserPool().prewarm()]
+            if self.warm_models or self.warm_embedder:
+                jobs.append(self._warm_models(agent_class))
+            await asyncio.wait_for(asyncio.gather(*jobs), timeout=self.timeout)
+            failed = [name for name, result in self.models.items() if 'error' in result]
+            self.phase = 'degraded' if failed else 'ready'
+        except Exception as e:
+            self.phase = 'failed'
+            self.error = f'{type(e).__name__}: {e}'
+            logger.warning(f'Warm-up failed: {self.error}')
+        finally:
+            self.seconds = round(time.monotonic() - started, 1)
+        logger.info(f'🚦 Warm-up finished in {self.seconds}s: {self.phase}')
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._import is not None and self._import.done() and not self._import.cancelled() and self._import.exception() is None:
+            agent_class = self._import.result()
+            await agent_class.getBrowserPool().close()
+            await agent_class.controller.http_fetcher.aclose()
+
+    def status(self) -> dict:
+        return {
+            'ready': self.ready,
+            'phase': self.phase,
+            'seconds': self.seconds,
+            'models': self.models,
+            'error': self.error,
+        }
@@ -25,8 +25,9 @@ Answere the following question with a quick research.
         prompt = self.task_template.format(task=task)
         result: AgentHistoryList = None
         if task.strip():
-            agent1 = self.getAgent(task=prompt.strip())
-            result = await agent1.run(max_steps=self._max_steps)
+            async with self.getBrowserPool().lease() as browser_session, self.getResourceFilter().applied(browser_session):
+                agent1 = self.getAgent(task=prompt.strip(), _browser_session=browser_session)
+                result = await self.runAgent(agent1)
         return result.final_result()
 
 async def main():
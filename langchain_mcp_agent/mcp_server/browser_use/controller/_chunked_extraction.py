@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+import os
+import re
+from collections.abc import Awaitable, Callable
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.prompts import PromptTemplate
+
+from langchain_mcp_agent.tools._context_budget import ContextBudget, get_context_budget, model_key
+
+logger = logging.getLogger(__name__)
+
+_HEADING = re.compile(r'#{1,6} ')
+CHUNK_PROMPT = 'Your task is to extract the content of one part of a page. You will be given a part of a page and a goal and you should extract all relevant information around this goal from this part. This is part {part} of {parts}. If this part contains nothing relevant respond with {{}}. Respond in json format. Extraction goal: {goal}, Page part: {page}'
+
+
+def split_markdown(markdown: str, max_chars: int) -> list[str]:
+    """Split on paragraph, then line boundaries; hard-cut anything still too long
+
+    A heading that would end a chunk moves to the next one, with the text under it.
+    """
+    chunks: list[str] = []
+    current = ''
+    for block in markdown.split('\n\n'):
+        pieces = [block] if len(block) <= max_chars else block.split('\n')
+        for piece in pieces:
+            while len(piece) > max_chars:
+                if current:
+                    chunks.append(current)
+                    current = ''
+                chunks.append(piece[:max_chars])
+                piece = piece[max_chars:]
+            sep = '\n\n' if current else ''
+            if len(current) + len(sep) + len(piece) > max_chars:
+                head, _, last = current.rpartition('\n\n')
+                if head and _HEADING.match(last) and len(last) + len(sep) + len(piece) <= max_chars:
+                    chunks.append(head)
+                    current = last
+                else:
+                    chunks.append(current)
+                    current, sep = '', ''
+            current += sep + piece
+    if current.strip():
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+def _parse_json(text: str):
+    text = text.strip()
+    if text.startswith('```'):
+        text = text.strip('`')
+        text = text[text.find('\n') + 1:] if '\n' in text else text
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    start = min((i for i in (text.find('{'), text.find('[')) if i != -1), default=-1)
+    end = max(text.rfind('}'), text.rfind(']'))
+    if start == -1 or end <= start:
+        return None
+    try:
+        return json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+
+
+def _merge(a, b):
+    if a is None or a == {} or a == []:
+        return b
+    if b is None or b == {} or b == []:
+        return a
+    if isinstance(a, dict) and isinstance(b, dict):
+        merged = dict(a)
+        for key, value in b.items():
+            merged[key] = _merge(merged.get(key), value)
+        return merged
+    a_list = a if isinstance(a, list) else [a]
+    b_list = b if isinstance(b, list) else [b]
+    merged = list(a_list)
+    seen = {json.dumps(item, sort_keys=True, default=str) for item in merged}
+    for item in b_list:
+        marker = json.dumps(item, sort_keys=True, default=str)
+        if marker not in seen:
+            seen.add(marker)
+            merged.append(item)
+    return merged[0] if len(merged) == 1 and not isinstance(a, list) and not isinstance(b, list) else merged
+
+
+def merge_json_outputs(outputs: list[str]) -> str:
+    """Merge per-chunk JSON answers into one JSON document"""
+    merged = None
+    unstructured = []
+    for output in outputs:
+        parsed = _parse_json(output)
+        if parsed is None:
+            if output.strip():
+                unstructured.append(output.strip())
+            continue
+        merged = _merge(merged, parsed)
+    if unstructured:
+        if merged is None:
+            merged = {}
+        if not isinstance(merged, dict):
+            merged = {'results': merged}
+        merged['unstructured'] = unstructured
+    return json.dumps(merged if merged is not None else {}, ensure_ascii=False)
+
+
+class ChunkedExtractor:
+    """Map-reduce extraction for pages that do not fit the extraction model's context"""
+
+    def __init__(self, max_concurrency: int = 2, enabled: bool = True, budget: ContextBudget | None = None):
+        self.max_concurrency = max_concurrency
+        self.enabled = enabled
+        self.budget = budget or get_context_budget()
+
+    @classmethod
+    def from_env(cls) -> 'ChunkedExtractor':
+        return cls(
+            max_concurrency=int(os.getenv('MCP_BROWSER_USE_CHUNK_CONCURRENCY', 2)),
+            enabled=os.getenv('MCP_BROWSER_USE_CHUNKED_EXTRACTION', 'true').lower() == 'true',
+        )
+
+    def page_budget(self, llm: BaseChatModel, prompt: str) -> int:
+        """Tokens left for page content once prompt and answer are accounted for"""
+        return self.budget.room(llm, prompt)
+
+    def fits(self, llm: BaseChatModel, prompt: str, content: str) -> bool:
+        return self.budget.fits(llm, prompt, content)
+
+    async def extract(
+        self,
+        llm: BaseChatModel,
+        goal: str,
+        content: str,
+        complete: Callable[[BaseChatModel, str], Awaitable[str]],
+    ) -> str:
+        """``complete`` sends one prompt and returns the cleaned answer"""
+        template = PromptTemplate(input_variables=['goal', 'page', 'part', 'parts'], template=CHUNK_PROMPT)
+        budget = self.page_budget(llm, CHUNK_PROMPT + goal)
+        chunks = split_markdown(content, self.budget.estimator.chars(budget, model_key(llm)))
+        logger.info(f'📚  Page too large for one extraction call, splitting into {len(chunks)} chunks of ~{budget} tokens')
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract_chunk(index: int, chunk: str) -> str:
+            async with semaphore:
+                return await complete(
+                    llm, template.format(goal=goal, page=chunk, part=index + 1, parts=len(chunks))
+                )
+
+        results = await asyncio.gather(
+            *(extract_chunk(i, chunk) for i, chunk in enumerate(chunks)), return_exceptions=True
+        )
+        outputs = []
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.debug(f'Error extracting chunk {i + 1}/{len(chunks)}: {result}')
+                continue
+            outputs.append(result)
+        if not outputs:
+            raise RuntimeError(f'All {len(chunks)} chunk extractions failed')
+        return merge_json_outputs(outputs)
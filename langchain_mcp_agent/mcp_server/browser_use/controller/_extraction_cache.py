@@ -0,0 +1,69 @@
+import hashlib
+import json
+import logging
+import os
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from langchain_mcp_agent.tools._tiered_cache import TieredCache
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAMS = ('utm_', 'gclid', 'fbclid', 'msclkid', 'mc_cid', 'mc_eid', '_ga')
+
+
+def normalize_url(url: str) -> str:
+    """Lowercase scheme and host, drop fragment and tracking params, sort the query"""
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ''))
+
+
+def model_name_of(llm: BaseChatModel) -> str:
+    return getattr(llm, 'model', None) or getattr(llm, 'model_name', None) or type(llm).__name__
+
+
+class ExtractionCache:
+    """Caches extraction LLM output by (action, url, markdown hash, goal, model)"""
+
+    def __init__(self, cache: TieredCache | None = None):
+        self.cache = cache or TieredCache()
+
+    @classmethod
+    def from_env(cls) -> 'ExtractionCache | None':
+        if os.getenv('MCP_BROWSER_USE_EXTRACTION_CACHE_ENABLED', 'true').lower() != 'true':
+            return None
+        ttl = float(os.getenv('MCP_BROWSER_USE_EXTRACTION_CACHE_TTL', 24 * 3600))
+        return cls(TieredCache(
+            max_items=int(os.getenv('MCP_BROWSER_USE_EXTRACTION_CACHE_SIZE', 256)),
+            db_path=os.getenv('MCP_BROWSER_USE_EXTRACTION_CACHE_DB') or None,
+            ttl=ttl if ttl > 0 else None,
+            max_rows=int(os.getenv('MCP_BROWSER_USE_EXTRACTION_CACHE_MAX_ROWS', 5000)),
+            table='extraction_cache',
+        ))
+
+    def key(self, action: str, url: str, markdown: str, goal: str, llm: BaseChatModel) -> str:
+        content_hash = hashlib.sha256(markdown.encode('utf-8')).hexdigest()
+        raw = json.dumps([action, normalize_url(url), content_hash, goal.strip(), model_name_of(llm)])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        value = await self.cache.aget(key)
+        # the in-memory counters, stats() would count the SQLite rows on the event loop
+        counts = f'hits={self.cache.hits}, misses={self.cache.misses}'
+        if value is None:
+            logger.debug(f'Extraction cache miss ({counts})')
+        else:
+            logger.info(f'♻️  Extraction cache hit ({counts})')
+        return value
+
+    async def put(self, key: str, value: str) -> None:
+        await self.cache.aput(key, value)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
@@ -0,0 +1,273 @@
+import asyncio
+import ipaddress
+import logging
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = (
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) '
+    'Chrome/124.0.0.0 Safari/537.36'
+)
+HTML_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+_INVISIBLE = re.compile(r'<(script|style|noscript|template|svg)\b[^>]*>.*?</\1\s*>', re.DOTALL | re.IGNORECASE)
+_NOSCRIPT = re.compile(r'<noscript\b[^>]*>(.*?)</noscript\s*>', re.DOTALL | re.IGNORECASE)
+_TAGS = re.compile(r'<[^>]+>')
+_SPACES = re.compile(r'\s+')
+_SPA_ROOT = re.compile(
+    r'<(div|main|app-root)\b[^>]*\bid=["\']?(root|app|__next|__nuxt|svelte|main-app)["\']?[^>]*>\s*</\1>'
+    r'|<app-root\b|\bng-app\b|data-reactroot',
+    re.IGNORECASE,
+)
+_JS_REQUIRED = re.compile(
+    r'(enable|turn on|activate)\s+javascript|javascript\s+(is\s+)?(required|disabled|must be enabled)'
+    r'|requires\s+javascript|browser\s+(is\s+)?not\s+supported',
+    re.IGNORECASE,
+)
+_CHALLENGE = re.compile(r'cf-browser-verification|challenge-platform|<title>\s*just a moment', re.IGNORECASE)
+
+
+def visible_text(html: str) -> str:
+    """Text a reader would see without running scripts, roughly"""
+    return _SPACES.sub(' ', _TAGS.sub(' ', _INVISIBLE.sub(' ', html))).strip()
+
+
+def needs_browser(html: str, min_text_chars: int = 250) -> str | None:
+    """Why ``html`` has to be rendered by the browser, None if the fetched markup can be read as is
+
+    Catches bot challenges, noscript walls ("please enable JavaScript"), single page
+    app shells (an empty root element the scripts fill in) and bodies with next to no
+    text. The checks are cheap regular expressions, a page they miss still converts,
+    it just reads short.
+    """
+    if _CHALLENGE.search(html):
+        return 'bot challenge'
+    text = visible_text(html)
+    noscript = ' '.join(_NOSCRIPT.findall(html))
+    if len(text) < min_text_chars * 4 and (_JS_REQUIRED.search(noscript) or _JS_REQUIRED.search(text[:2000])):
+        return 'noscript wall'
+    if len(text) < min_text_chars * 4 and _SPA_ROOT.search(html):
+        return 'spa shell'
+    if len(text) < min_text_chars:
+        return 'empty body'
+    return None
+
+
+async def is_public_host(host: str) -> bool:
+    """Whether every address ``host`` resolves to is a global one, not loopback or a private network"""
+    try:
+        addresses = [ipaddress.ip_address(host.strip('[]').split('%')[0])]
+    except ValueError:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(host, None)
+        except OSError:
+            return True  # unresolvable, the request fails on its own
+        addresses = [ipaddress.ip_address(info[4][0].split('%')[0]) for info in infos]
+    return all(address.is_global for address in addresses)
+
+
+class _PrivateAddress(Exception):
+    pass
+
+
+class _NotAllowed(Exception):
+    pass
+
+
+@dataclass
+class FetchResult:
+    url: str  # after redirects
+    status: int
+    html: str
+    revalidated: bool = False  # 304, body from the validator cache
+    fallback: str | None = None  # why the browser has to load the page instead
+
+
+@dataclass
+class _Validated:
+    etag: str | None
+    last_modified: str | None
+    url: str
+    html: str
+
+
+class HttpFetcher:
+    """Fetches pages over plain HTTP for extraction, so static pages skip Chromium
+
+    One pooled ``httpx.AsyncClient`` keeps connections alive across calls and
+    decodes gzip/deflate (and br/zstd when brotli/zstandard are installed). Responses
+    with an ETag or Last-Modified are kept in an LRU of ``cache_size`` pages and
+    revalidated with If-None-Match/If-Modified-Since, a 304 reuses the stored body.
+    At most ``per_host`` requests run against one host at a time. Unless
+    ``allow_private``, requests (redirects included) to loopback and private
+    network addresses are not sent, the browser opens those under its own rules.
+    ``fetch`` checks the url of every hop against its ``allowed`` predicate, a
+    redirect out of the agent's allowed domains is not followed. It sets ``fallback`` whenever the browser has to load the page: errors,
+    non html responses, bodies over ``max_bytes`` and pages that need JavaScript
+    (``needs_browser``).
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        timeout: float = 15,
+        max_connections: int = 20,
+        per_host: int = 4,
+        cache_size: int = 256,
+        max_bytes: int = 5 * 1024 * 1024,
+        min_text_chars: int = 250,
+        allow_private: bool = False,
+    ):
+        self.enabled = enabled
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.per_host = per_host
+        self.cache_size = cache_size
+        self.max_bytes = max_bytes
+        self.min_text_chars = min_text_chars
+        self.allow_private = allow_private
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._hosts: dict[str, asyncio.Semaphore] = {}
+        self._validated: OrderedDict[str, _Validated] = OrderedDict()
+        self.fetches = 0
+        self.revalidated = 0
+        self.fallbacks: dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> 'HttpFetcher':
+        return cls(
+            enabled=os.getenv('MCP_BROWSER_USE_HTTP_FETCH', 'true').lower() == 'true',
+            timeout=float(os.getenv('MCP_BROWSER_USE_HTTP_FETCH_TIMEOUT', 15)),
+            max_connections=int(os.getenv('MCP_BROWSER_USE_HTTP_FETCH_MAX_CONNECTIONS', 20)),
+            per_host=int(os.getenv('MCP_BROWSER_USE_HTTP_FETCH_PER_HOST', 4)),
+            cache_size=int(os.getenv('MCP_BROWSER_USE_HTTP_FETCH_CACHE_SIZE', 256)),
+            max_bytes=int(float(os.getenv('MCP_BROWSER_USE_HTTP_FETCH_MAX_MB', 5)) * 1024 * 1024),
+            min_text_chars=int(os.getenv('MCP_BROWSER_USE_HTTP_FETCH_MIN_TEXT', 250)),
+            allow_private=os.getenv('MCP_BROWSER_USE_HTTP_FETCH_ALLOW_PRIVATE', 'false').lower() == 'true',
+        )
+
+    async def _check_host(self, request: httpx.Request) -> None:
+        # redirects copy the extensions of the first request, so every hop is checked
+        allowed = request.extensions.get('allowed_url')
+        if allowed is not None and not allowed(str(request.url)):
+            raise _NotAllowed(str(request.url))
+        if not self.allow_private and not await is_public_host(request.url.host):
+            raise _PrivateAddress(request.url.host)
+
+    def _session(self) -> httpx.AsyncClient:
+        # the client and the semaphores belong to one event loop, e.g. one asyncio.run() of a benchmark
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                headers={
+                    'User-Agent': USER_AGENT,
+                    'Accept': 'text/html,application/xhtml+xml;q=0.9,text/plain;q=0.8,*/*;q=0.5',
+                    'Accept-Language': 'en-US,en;q=0.9',
+                },
+                event_hooks={'request': [self._check_host]},
+            )
+            self._loop = loop
+            self._hosts = {}
+        return self._client
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host.lower()  # InvalidURL for urls httpx cannot send
+        slot = self._hosts.get(host)
+        if slot is None:
+            slot = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return slot
+
+    def _fallback(self, result: FetchResult, reason: str) -> FetchResult:
+        result.fallback = reason
+        self.fallbacks[reason] = self.fallbacks.get(reason, 0) + 1
+        logger.debug(f'HTTP fetch of {result.url} falls back to the browser: {reason}')
+        return result
+
+    def _remember(self, url: str, response: httpx.Response, html: str) -> None:
+        etag, last_modified = response.headers.get('etag'), response.headers.get('last-modified')
+        if not (etag or last_modified) or self.cache_size <= 0:
+            return
+        self._validated[url] = _Validated(etag, last_modified, str(response.url), html)
+        self._validated.move_to_end(url)
+        while len(self._validated) > self.cache_size:
+            self._validated.popitem(last=False)
+
+    async def fetch(self, url: str, allowed: Callable[[str], bool] | None = None) -> FetchResult:
+        """``url`` over HTTP, ``allowed`` tells which urls it and its redirects may go to"""
+        self.fetches += 1
+        client = self._session()
+        headers = {}
+        validated = self._validated.get(url)
+        if validated is not None:
+            if validated.etag:
+                headers['If-None-Match'] = validated.etag
+            if validated.last_modified:
+                headers['If-Modified-Since'] = validated.last_modified
+
+        result = FetchResult(url=url, status=0, html='')
+        try:
+            async with self._host_slot(url):
+                extensions = {'allowed_url': allowed} if allowed is not None else None
+                async with client.stream('GET', url, headers=headers, extensions=extensions) as response:
+                    result.url, result.status = str(response.url), response.status_code
+                    if response.status_code == 304 and validated is not None:
+                        self.revalidated += 1
+                        self._validated.move_to_end(url)
+                        result.url, result.html, result.revalidated = validated.url, validated.html, True
+                        if allowed is not None and not allowed(result.url):
+                            return self._fallback(result, 'not allowed')
+                        return result
+                    if response.status_code >= 400:
+                        return self._fallback(result, f'http {response.status_code}')
+                    content_type = response.headers.get('content-type', 'text/html').split(';')[0].strip().lower()
+                    if content_type not in HTML_TYPES:
+                        return self._fallback(result, f'content type {content_type}')
+                    if int(response.headers.get('content-length') or 0) > self.max_bytes:
+                        return self._fallback(result, 'too large')
+                    body = bytearray()
+                    async for part in response.aiter_bytes():
+                        body += part
+                        if len(body) > self.max_bytes:
+                            return self._fallback(result, 'too large')
+                    result.html = body.decode(response.encoding or 'utf-8', errors='replace')
+        except _PrivateAddress:
+            return self._fallback(result, 'private address')
+        except _NotAllowed as e:
+            result.url = str(e)
+            return self._fallback(result, 'not allowed')
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
+            return self._fallback(result, type(e).__name__)
+
+        reason = needs_browser(result.html, self.min_text_chars)
+        if reason:
+            return self._fallback(result, reason)
+        self._remember(url, response, result.html)
+        return result
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            try:
+                await client.aclose()
+            except RuntimeError:
+                pass  # its event loop is already gone
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'fetches': self.fetches,
+            'revalidated': self.revalidated,
+            'fallbacks': dict(self.fallbacks),
+            'cached_validators': len(self._validated),
+        }
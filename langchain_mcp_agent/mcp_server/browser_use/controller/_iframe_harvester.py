@@ -0,0 +1,145 @@
+import asyncio
+import fnmatch
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from playwright.async_api import Frame, Page
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IFRAME_DENY_LIST = [
+    'about:*',
+    'data:*',
+    'javascript:*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*googleadservices.com*',
+    '*googletagmanager.com*',
+    '*google-analytics.com*',
+    '*adservice.google.*',
+    '*amazon-adsystem.com*',
+    '*facebook.com/tr*',
+    '*connect.facebook.net*',
+    '*scorecardresearch.com*',
+    '*criteo.*',
+    '*taboola.com*',
+    '*outbrain.com*',
+    '*adnxs.com*',
+    '*rubiconproject.com*',
+    '*pubmatic.com*',
+    '*hotjar.com*',
+    '*recaptcha*',
+]
+
+
+@dataclass
+class IframeHarvest:
+    sections: list[str] = field(default_factory=list)
+    dropped: list[tuple[str, str]] = field(default_factory=list)
+
+    def dropped_note(self) -> str:
+        if not self.dropped:
+            return ''
+        return 'Skipped iframes: ' + ', '.join(f'{url} ({reason})' for url, reason in self.dropped)
+
+
+class IframeHarvester:
+    """Collects iframe markdown concurrently under one deadline per page
+
+    Each frame waits at most ``load_wait`` seconds for its load event and is then
+    harvested as far as it has loaded, so a frame that never fires the event still
+    leaves time to read and convert it before the page deadline.
+    """
+
+    def __init__(
+        self,
+        deadline: float = 5.0,
+        load_wait: float = 2.0,
+        frame_max_chars: int = 20000,
+        total_max_chars: int = 60000,
+        deny_list: list[str] | None = None,
+    ):
+        self.deadline = deadline
+        self.load_wait = load_wait
+        self.frame_max_chars = frame_max_chars
+        self.total_max_chars = total_max_chars
+        self.deny_list = DEFAULT_IFRAME_DENY_LIST if deny_list is None else deny_list
+
+    @classmethod
+    def from_env(cls) -> 'IframeHarvester':
+        extra = [p.strip() for p in os.getenv('MCP_BROWSER_USE_IFRAME_DENY_LIST', '').split(',') if p.strip()]
+        return cls(
+            deadline=float(os.getenv('MCP_BROWSER_USE_IFRAME_DEADLINE', 5)),
+            load_wait=float(os.getenv('MCP_BROWSER_USE_IFRAME_LOAD_WAIT', 2)),
+            frame_max_chars=int(os.getenv('MCP_BROWSER_USE_IFRAME_MAX_CHARS', 20000)),
+            total_max_chars=int(os.getenv('MCP_BROWSER_USE_IFRAME_TOTAL_MAX_CHARS', 60000)),
+            deny_list=DEFAULT_IFRAME_DENY_LIST + extra,
+        )
+
+    def is_denied(self, url: str) -> bool:
+        return any(fnmatch.fnmatch(url, pattern) for pattern in self.deny_list)
+
+    async def _frame_markdown(self, frame: Frame, convert: Callable[[str], Awaitable[str]], until: float) -> str:
+        try:
+            # extra on top of already loaded page, bounded by load_wait and what is left of the page deadline
+            # (playwright treats timeout=0 as no timeout, so never go below 1ms)
+            wait = min(until - time.monotonic(), self.load_wait)
+            await frame.wait_for_load_state(timeout=max(1.0, wait * 1000))
+        except Exception:
+            pass
+        html = await frame.content()
+        return await convert(html)
+
+    async def harvest(self, page: Page, convert: Callable[[str], Awaitable[str]]) -> IframeHarvest:
+        result = IframeHarvest()
+        frames: list[Frame] = []
+        seen: set[str] = set()
+        for frame in page.frames:
+            url = frame.url
+            if frame == page.main_frame or url == page.url:
+                continue
+            if url in seen or self.is_denied(url):
+                continue
+            seen.add(url)
+            frames.append(frame)
+
+        if not frames:
+            return result
+
+        until = time.monotonic() + self.deadline
+        tasks = {
+            asyncio.ensure_future(self._frame_markdown(frame, convert, until)): frame
+            for frame in frames
+        }
+        _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        for task in pending:
+            task.cancel()
+
+        remaining = self.total_max_chars
+        for task, frame in tasks.items():
+            if task in pending:
+                result.dropped.append((frame.url, 'timeout'))
+                continue
+            if task.exception() is not None:
+                e = task.exception()
+                logger.debug(f'Error extracting iframe content from within page {page.url}: {type(e).__name__}: {e}')
+                result.dropped.append((frame.url, 'error'))
+                continue
+
+            markdown = task.result()
+            limit = min(self.frame_max_chars, remaining)
+            if limit <= 0:
+                result.dropped.append((frame.url, 'size'))
+                continue
+            if len(markdown) > limit:
+                markdown = markdown[:limit]
+                result.dropped.append((frame.url, f'size, truncated to {limit} chars'))
+            remaining -= len(markdown)
+            result.sections.append(f'\n\nIFRAME {frame.url}:\n{markdown}')
+
+        if result.dropped:
+            logger.debug(f'Iframes dropped on {page.url}: {result.dropped}')
+        return result
@@ -0,0 +1,263 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+from collections.abc import Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor
+from html.parser import HTMLParser
+
+logger = logging.getLogger(__name__)
+
+# Keep this module free of heavy imports: it is re-imported by every worker process.
+
+PRUNED_TAGS = {
+    'head', 'script', 'style', 'noscript', 'template', 'svg', 'canvas', 'iframe', 'object', 'embed',
+    'nav', 'footer', 'aside', 'form', 'button', 'select', 'textarea', 'dialog', 'video', 'audio',
+}
+PRUNED_ROLES = {'navigation', 'banner', 'contentinfo', 'complementary', 'dialog', 'alertdialog', 'search'}
+BOILERPLATE_NAMES = re.compile(
+    r'(^|[\s_-])(cookie|cookies|consent|gdpr|newsletter|advert|ads|ad-slot|sponsored|popup|modal|'
+    r'share-buttons|social-share|breadcrumbs?|skip-link|sidebar)([\s_-]|$)',
+    re.IGNORECASE,
+)
+# page and content containers are never pruned by their id or class, e.g. <html class="sidebar-visible">
+CONTENT_TAGS = {'html', 'body', 'main', 'article'}
+HIDDEN_STYLE = re.compile(r'display\s*:\s*none|visibility\s*:\s*hidden', re.IGNORECASE)
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+BLOCK_TAGS = {
+    'p', 'div', 'section', 'article', 'main', 'header', 'blockquote', 'figure', 'figcaption',
+    'ul', 'ol', 'dl', 'dt', 'dd', 'table', 'address', 'details', 'summary',
+}
+HEADINGS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+WHITESPACE = re.compile(r'\s+')
+
+
+class _PrunedMarkdownParser(HTMLParser):
+    """Single pass html -> markdown that drops boilerplate and invisible subtrees"""
+
+    def __init__(self, strip: Iterable[str]):
+        super().__init__(convert_charrefs=True)
+        self.strip = set(strip)
+        self.out: list[str] = []
+        self.stack: list[tuple[str, bool]] = []
+        self.lists: list[list] = []  # [tag, counter]
+        self.links: list[str | None] = []
+        self.pre = 0
+        self.row_cells = 0
+        self.header_row_done = False
+
+    @property
+    def skipping(self) -> bool:
+        return bool(self.stack) and self.stack[-1][1]
+
+    def _is_pruned(self, tag: str, attrs: dict) -> bool:
+        if tag in PRUNED_TAGS:
+            return True
+        if 'hidden' in attrs or attrs.get('aria-hidden') == 'true' or attrs.get('aria-modal') == 'true':
+            return True
+        if attrs.get('role') in PRUNED_ROLES:
+            return True
+        if HIDDEN_STYLE.search(attrs.get('style') or ''):
+            return True
+        if tag in CONTENT_TAGS:
+            return False
+        names = f'{attrs.get("id") or ""} {attrs.get("class") or ""}'
+        return bool(BOILERPLATE_NAMES.search(names))
+
+    def _block(self) -> None:
+        if self.out and not self.out[-1].endswith('\n\n'):
+            self.out.append('\n\n' if not self.out[-1].endswith('\n') else '\n')
+
+    def _line(self) -> None:
+        if self.out and not self.out[-1].endswith('\n'):
+            self.out.append('\n')
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in VOID_TAGS:
+            if self.skipping:
+                return
+            if tag == 'br':
+                self.out.append('\n')
+            elif tag == 'hr':
+                self._block()
+                self.out.append('---\n\n')
+            elif tag == 'img' and 'img' not in self.strip and attrs.get('src'):
+                self.out.append(f'![{attrs.get("alt") or ""}]({attrs["src"]})')
+            return
+
+        skip = self.skipping or self._is_pruned(tag, attrs)
+        self.stack.append((tag, skip))
+        if skip:
+            return
+
+        if tag in HEADINGS:
+            self._block()
+            self.out.append('#' * HEADINGS[tag] + ' ')
+        elif tag in ('ul', 'ol'):
+            self._line()
+            self.lists.append([tag, 0])
+        elif tag == 'li':
+            self._line()
+            indent = '  ' * max(0, len(self.lists) - 1)
+            if self.lists and self.lists[-1][0] == 'ol':
+                self.lists[-1][1] += 1
+                self.out.append(f'{indent}{self.lists[-1][1]}. ')
+            else:
+                self.out.append(f'{indent}- ')
+        elif tag == 'pre':
+            self._block()
+            self.out.append('```\n')
+            self.pre += 1
+        elif tag == 'code' and not self.pre:
+            self.out.append('`')
+        elif tag in ('strong', 'b'):
+            self.out.append('**')
+        elif tag in ('em', 'i'):
+            self.out.append('*')
+        elif tag == 'a':
+            href = attrs.get('href')
+            keep = 'a' not in self.strip and href and not href.startswith(('javascript:', '#'))
+            self.links.append(href if keep else None)
+            if keep:
+                self.out.append('[')
+        elif tag == 'tr':
+            self._line()
+            self.row_cells = 0
+        elif tag in ('td', 'th'):
+            self.out.append('| ' if self.row_cells == 0 else ' | ')
+            self.row_cells += 1
+        elif tag == 'table':
+            self._block()
+            self.header_row_done = False
+        elif tag in BLOCK_TAGS:
+            self._block()
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        # pop up to the matching open tag, tolerating unclosed children
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == tag:
+                break
+        else:
+            return
+        skipped = self.stack[i][1]
+        del self.stack[i:]
+        if skipped:
+            return
+
+        if tag in HEADINGS:
+            self.out.append('\n\n')
+        elif tag in ('ul', 'ol'):
+            if self.lists:
+                self.lists.pop()
+            self._block()
+        elif tag == 'pre':
+            self._line()
+            self.out.append('```\n\n')
+            self.pre = max(0, self.pre - 1)
+        elif tag == 'code' and not self.pre:
+            self.out.append('`')
+        elif tag in ('strong', 'b'):
+            self.out.append('**')
+        elif tag in ('em', 'i'):
+            self.out.append('*')
+        elif tag == 'a':
+            href = self.links.pop() if self.links else None
+            if href:
+                self.out.append(f']({href})')
+        elif tag == 'tr':
+            self.out.append(' |\n')
+            if not self.header_row_done:
+                self.out.append('|' + ' --- |' * self.row_cells + '\n')
+                self.header_row_done = True
+        elif tag in BLOCK_TAGS:
+            self._block()
+
+    def handle_data(self, data):
+        if self.skipping:
+            return
+        if self.pre:
+            self.out.append(data)
+            return
+        text = WHITESPACE.sub(' ', data)
+        if not text.strip():
+            if self.out and not self.out[-1].endswith((' ', '\n')):
+                self.out.append(' ')
+            return
+        if self.out and self.out[-1].endswith('\n'):
+            text = text.lstrip()
+        self.out.append(text)
+
+    def markdown(self) -> str:
+        text = ''.join(self.out)
+        text = re.sub(r'[ \t]+\n', '\n', text)
+        text = re.sub(r'\n{3,}', '\n\n', text)
+        return text.strip()
+
+
+def pruned_markdown(html: str, strip: Iterable[str] = ()) -> str:
+    parser = _PrunedMarkdownParser(strip)
+    parser.feed(html)
+    parser.close()
+    return parser.markdown()
+
+
+def markdownify_markdown(html: str, strip: Iterable[str] = ()) -> str:
+    import markdownify
+
+    return markdownify.markdownify(html, strip=list(strip))
+
+
+CONVERTERS: dict[str, Callable[[str, Iterable[str]], str]] = {
+    'pruned': pruned_markdown,
+    'markdownify': markdownify_markdown,
+}
+
+
+def _convert(name: str, html: str, strip: tuple[str, ...]) -> str:
+    return CONVERTERS[name](html, strip)
+
+
+class MarkdownConverter:
+    """html -> markdown stage used by the extraction actions
+
+    Conversion runs in a dedicated process pool of ``workers`` processes so that
+    concurrent agents do not serialize on the GIL; ``workers=0`` converts on the
+    default thread pool instead.
+    """
+
+    def __init__(self, name: str = 'pruned', workers: int = 2):
+        if name not in CONVERTERS:
+            raise ValueError(f'Unknown markdown converter {name!r}, expected one of {list(CONVERTERS)}')
+        self.name = name
+        self.workers = workers
+        self._pool: Executor | None = None
+
+    @classmethod
+    def from_env(cls) -> 'MarkdownConverter':
+        return cls(
+            name=os.getenv('MCP_BROWSER_USE_MARKDOWN_CONVERTER', 'pruned'),
+            workers=int(os.getenv('MCP_BROWSER_USE_MARKDOWN_WORKERS', 2)),
+        )
+
+    def _executor(self) -> Executor | None:
+        if self.workers <= 0:
+            return None
+        if self._pool is None:
+            # spawn: forking a process that runs playwright and an event loop is not safe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._pool
+
+    async def convert(self, html: str, strip: Iterable[str] = ()) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), _convert, self.name, html, tuple(strip))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
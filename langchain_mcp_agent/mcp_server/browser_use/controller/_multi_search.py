@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit, urlunsplit
+
+from pydantic import BaseModel, Field
+
+from browser_use.browser import BrowserSession
+from langchain_mcp_agent.mcp_server.browser_use.controller._extraction_cache import TRACKING_PARAMS
+from langchain_mcp_agent.mcp_server.browser_use.controller._serp_parser import SearchResult, SerpExtractor
+
+logger = logging.getLogger(__name__)
+
+# server rendered result pages, so domcontentloaded is enough to parse them
+SEARCH_URLS = {
+    'google': 'https://www.google.com/search?q={query}&udm=14',
+    'bing': 'https://www.bing.com/search?q={query}',
+    'duckduckgo': 'https://html.duckduckgo.com/html/?q={query}',
+}
+
+
+class MultiSearchAction(BaseModel):
+    query: str
+    engines: list[str] = Field(default_factory=lambda: list(SEARCH_URLS))
+    max_results: int = 10
+
+
+def canonicalize_url(url: str) -> str:
+    """Key under which the same page found by different engines collapses into one result"""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower().removeprefix('www.').removeprefix('m.')
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    path = parts.path.rstrip('/')
+    for index in ('/index.html', '/index.htm', '/index.php'):
+        path = path.removesuffix(index)
+    # http and https, www and bare host are the same page for ranking purposes
+    return urlunsplit(('', host, path or '/', urlencode(query), '')).lstrip('/')
+
+
+def fuse_results(ranked: dict[str, list[SearchResult]], k: int = 60) -> list[SearchResult]:
+    """Reciprocal rank fusion of several engines' result lists
+
+    Each result scores sum(1 / (k + rank)) over the engines that returned it, so
+    pages found by several engines rise to the top. Title and url are taken from the
+    best ranked hit, the snippet is the longest one seen.
+    """
+    scores: dict[str, float] = {}
+    best: dict[str, tuple[int, SearchResult]] = {}
+    engines: dict[str, list[str]] = {}
+    snippets: dict[str, str] = {}
+    for engine, results in ranked.items():
+        for result in results:
+            key = canonicalize_url(result.url)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + result.rank)
+            if key not in best or result.rank < best[key][0]:
+                best[key] = (result.rank, result)
+            if engine not in engines.setdefault(key, []):
+                engines[key].append(engine)
+            if len(result.snippet) > len(snippets.get(key, '')):
+                snippets[key] = result.snippet
+
+    order = sorted(scores, key=lambda key: (-scores[key], best[key][0]))
+    return [
+        SearchResult(
+            rank=position,
+            title=best[key][1].title,
+            url=best[key][1].url,
+            snippet=snippets.get(key, ''),
+            engines=engines[key],
+        )
+        for position, key in enumerate(order, start=1)
+    ]
+
+
+class MultiSearch:
+    """Runs one query on several engines in parallel tabs under a single deadline"""
+
+    def __init__(self, deadline: float = 15, rrf_k: int = 60):
+        self.deadline = deadline
+        self.rrf_k = rrf_k
+
+    @classmethod
+    def from_env(cls) -> 'MultiSearch':
+        return cls(
+            deadline=float(os.getenv('MCP_BROWSER_USE_MULTI_SEARCH_DEADLINE', 15)),
+            rrf_k=int(os.getenv('MCP_BROWSER_USE_MULTI_SEARCH_RRF_K', 60)),
+        )
+
+    async def _search_one(self, browser_session: BrowserSession, engine: str, query: str, serp: SerpExtractor):
+        url = SEARCH_URLS[engine].format(query=quote_plus(query))
+        page = await browser_session.browser_context.new_page()
+        try:
+            await page.goto(url, wait_until='domcontentloaded', timeout=self.deadline * 1000)
+            return await serp.parse(await page.content(), page.url)
+        finally:
+            await page.close()
+
+    async def search(
+        self, browser_session: BrowserSession, query: str, engines: list[str], serp: SerpExtractor
+    ) -> tuple[list[SearchResult], dict[str, str]]:
+        """Returns the fused results and a status per engine"""
+        if browser_session.browser_context is None:
+            await browser_session.start()
+        status = {}
+        tasks = {}
+        for engine in dict.fromkeys(e.lower() for e in engines):
+            if engine not in SEARCH_URLS:
+                status[engine] = 'unknown engine'
+            elif not browser_session._is_url_allowed(SEARCH_URLS[engine]):
+                status[engine] = 'not in allowed_domains'
+            else:
+                tasks[asyncio.create_task(self._search_one(browser_session, engine, query, serp))] = engine
+        if not tasks:
+            return [], status
+
+        started = time.monotonic()
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        finally:
+            # also runs when the agent step itself is cancelled, so no tab is left behind
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    status[tasks[task]] = f'no answer within {self.deadline}s'
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        ranked = {}
+        for task in done:
+            engine = tasks[task]
+            if task.exception() is not None:
+                status[engine] = f'failed: {type(task.exception()).__name__}'
+            elif not task.result():
+                status[engine] = 'no results parsed (consent page or captcha?)'
+            else:
+                ranked[engine] = task.result()
+                status[engine] = f'{len(task.result())} results'
+        logger.debug(f'Multi-engine search for {query!r} took {time.monotonic() - started:.1f}s: {status}')
+        # keep the caller's engine order in the merged list for equal scores
+        ranked = {engine: ranked[engine] for engine in tasks.values() if engine in ranked}
+        return fuse_results(ranked, k=self.rrf_k), status
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+
+from browser_use.browser import BrowserSession
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+MODES = ('fetch', 'tab')
+# Chromium only, other browsers report 0 and are measured by their html alone
+_JS_HEAP = 'performance.memory ? performance.memory.usedJSHeapSize : 0'
+
+
+def google_results_url(url: str, start: int) -> str:
+    """The same Google search with the results starting at ``start``"""
+    parsed = urlsplit(url)
+    query_params = parse_qs(parsed.query)
+    query_params['start'] = [str(start)]
+    return urlunsplit(parsed._replace(query=urlencode(query_params, doseq=True)))
+
+
+def _is_google_search(url: str) -> bool:
+    parsed = urlsplit(url)
+    host = (parsed.hostname or '').lower()
+    return (host == 'google.com' or host.endswith('.google.com')) and parsed.path == '/search' and 'q' in parse_qs(parsed.query)
+
+
+def _same_page(a: str, b: str) -> bool:
+    a, b = urlsplit(a), urlsplit(b)
+    return (a.netloc, a.path, parse_qs(a.query)) == (b.netloc, b.path, parse_qs(b.query))
+
+
+@dataclass
+class _Prefetched:
+    url: str
+    task: asyncio.Task | None = None  # resolves to the html (fetch mode) or the loaded Page (tab mode)
+    size: int = 0
+
+
+@dataclass
+class _SessionPrefetch:
+    session: BrowserSession
+    context: object  # browser context the entries belong to, a pooled session gets a new one per lease
+    entries: dict[str, _Prefetched] = field(default_factory=dict)
+
+    @property
+    def stale(self) -> bool:
+        return self.session.browser_context is not self.context or not self.session.is_connected()
+
+
+class GooglePrefetcher:
+    """Loads the next Google result pages in the background while the agent reads the current one
+
+    Off unless ``depth`` > 0. After every action that leaves the agent on a Google
+    results page, the following ``depth`` pages are loaded either with a cookie
+    sharing request of the browser context (mode='fetch', nothing visible to the
+    agent) or in background tabs (mode='tab', fully rendered). next_ten_google_results
+    then swaps the prefetched page in. Prefetched pages are evicted as soon as the
+    agent is anywhere else, and loads stop once ``max_memory_mb`` is used.
+    """
+
+    def __init__(self, depth: int = 0, mode: str = 'fetch', max_memory_mb: float = 64, timeout: float = 20):
+        if mode not in MODES:
+            raise ValueError(f'Unknown prefetch mode {mode!r}, expected one of {MODES}')
+        self.depth = depth
+        self.mode = mode
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.timeout = timeout
+        self._sessions: dict[str, _SessionPrefetch] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_env(cls) -> 'GooglePrefetcher':
+        return cls(
+            depth=int(os.getenv('MCP_BROWSER_USE_GOOGLE_PREFETCH_DEPTH', 0)),
+            mode=os.getenv('MCP_BROWSER_USE_GOOGLE_PREFETCH_MODE', 'fetch'),
+            max_memory_mb=float(os.getenv('MCP_BROWSER_USE_GOOGLE_PREFETCH_MAX_MB', 64)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.depth > 0
+
+    def _used_bytes(self) -> int:
+        return sum(e.size for s in self._sessions.values() for e in s.entries.values())
+
+    async def _load(self, browser_session: BrowserSession, url: str) -> tuple[str | Page, int]:
+        if self.mode == 'fetch':
+            response = await browser_session.browser_context.request.get(url, timeout=self.timeout * 1000)
+            if not response.ok:
+                raise RuntimeError(f'HTTP {response.status}')
+            html = await response.text()
+            return html, len(html.encode('utf-8'))
+        page = await browser_session.browser_context.new_page()
+        try:
+            await page.goto(url, wait_until='domcontentloaded', timeout=self.timeout * 1000)
+            heap = await page.evaluate(_JS_HEAP)
+            return page, int(heap or 0) + len((await page.content()).encode('utf-8'))
+        except BaseException:
+            await page.close()
+            raise
+
+    async def _prefetch(self, browser_session: BrowserSession, entry: _Prefetched):
+        result, entry.size = await self._load(browser_session, entry.url)
+        if self._used_bytes() > self.max_bytes:
+            logger.debug(f'Prefetch of {entry.url} dropped, over the {self.max_bytes // 2**20}MB budget')
+            await self._discard_result(result)
+            raise MemoryError('prefetch budget exceeded')
+        return result
+
+    async def _discard_result(self, result) -> None:
+        if isinstance(result, Page) and not result.is_closed():
+            await result.close()
+
+    async def _drop(self, entry: _Prefetched) -> None:
+        self.evicted += 1
+        if not entry.task.done():
+            entry.task.cancel()
+            await asyncio.gather(entry.task, return_exceptions=True)
+        elif not entry.task.cancelled() and entry.task.exception() is None:
+            await self._discard_result(entry.task.result())
+
+    async def evict(self, browser_session: BrowserSession) -> None:
+        state = self._sessions.pop(browser_session.id, None)
+        if state is not None:
+            for entry in state.entries.values():
+                await self._drop(entry)
+
+    async def after_action(self, browser_session: BrowserSession) -> None:
+        """Keep the prefetched pages in line with where the agent is now"""
+        if not self.enabled:
+            return
+        # sessions whose context went away (pool reset, browser closed) lose their entries
+        for session_id, state in list(self._sessions.items()):
+            if state.stale:
+                self._sessions.pop(session_id)
+                for entry in state.entries.values():
+                    await self._drop(entry)
+
+        page = browser_session.agent_current_page
+        if page is None or page.is_closed() or not _is_google_search(page.url):
+            await self.evict(browser_session)
+            return
+
+        start = int(parse_qs(urlsplit(page.url).query).get('start', [0])[0])
+        wanted = [google_results_url(page.url, start + 10 * i) for i in range(1, self.depth + 1)]
+        state = self._sessions.setdefault(
+            browser_session.id, _SessionPrefetch(browser_session, browser_session.browser_context)
+        )
+        for url in list(state.entries):
+            if url not in wanted:
+                await self._drop(state.entries.pop(url))
+        for url in wanted:
+            if url in state.entries:
+                continue
+            if self._used_bytes() >= self.max_bytes:
+                break
+            entry = _Prefetched(url)
+            entry.task = asyncio.create_task(self._prefetch(browser_session, entry))
+            state.entries[url] = entry
+            logger.debug(f'Prefetching {url} ({self.mode})')
+
+    async def take(self, browser_session: BrowserSession, url: str) -> bool:
+        """Show a prefetched results page in the agent's tab, False if ``url`` was not prefetched"""
+        state = self._sessions.get(browser_session.id)
+        entry = state.entries.pop(url, None) if state is not None else None
+        if entry is None:
+            self.misses += 1
+            return False
+        try:
+            # a load already under way is still ahead of starting over
+            result = await asyncio.wait_for(asyncio.shield(entry.task), timeout=self.timeout)
+        except Exception as e:
+            logger.debug(f'Prefetch of {url} not usable: {type(e).__name__}: {e}')
+            await self._drop(entry)
+            self.misses += 1
+            return False
+
+        page = await browser_session.get_current_page()
+        if isinstance(result, Page):
+            if page is not result:
+                if browser_session.human_current_page is page:
+                    browser_session.human_current_page = result
+                browser_session.agent_current_page = result
+                await result.bring_to_front()
+                await page.close()
+        else:
+            # navigate for real so url and history are right, but answer the document from memory
+            async def fulfill(route):
+                await route.fulfill(status=200, content_type='text/html; charset=utf-8', body=result)
+
+            def matches(request_url: str) -> bool:
+                return _same_page(request_url, url)
+
+            await page.route(matches, fulfill, times=1)
+            try:
+                await page.goto(url)
+                await page.wait_for_load_state()
+            finally:
+                await page.unroute(matches, fulfill)
+        self.hits += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            'depth': self.depth,
+            'mode': self.mode,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evicted': self.evicted,
+            'used_mb': round(self._used_bytes() / 2**20, 2),
+        }
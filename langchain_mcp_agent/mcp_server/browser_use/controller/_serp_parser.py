@@ -0,0 +1,236 @@
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, field
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+from bs4 import BeautifulSoup, Tag
+from langchain_core.language_models.chat_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+# domains extract_search_page_result is allowed on, one per engine the parser knows
+SERP_DOMAINS = {
+    'google': '*.google.com',
+    'bing': '*.bing.com',
+    'duckduckgo': '*.duckduckgo.com',
+}
+
+# hosts of the results pages themselves, links there are tabs, pagination or ad clicks
+_ENGINE_PREFIXES = ('', 'www.', 'html.', 'lite.', 'webcache.', 'translate.')
+# ad click trackers outside SERP_DOMAINS
+_AD_HOSTS = ('googleadservices.com', 'doubleclick.net')
+
+
+@dataclass
+class SearchResult:
+    rank: int
+    title: str
+    url: str
+    snippet: str
+    engines: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _on_domain(host: str, domains) -> bool:
+    return any(host == d or host.endswith(f'.{d}') for d in domains)
+
+
+def detect_engine(url: str) -> str | None:
+    """Engine whose allowed domain the url is on, None for any other page"""
+    host = (urlsplit(url).hostname or '').lower()
+    for engine, pattern in SERP_DOMAINS.items():
+        if _on_domain(host, [pattern.removeprefix('*.')]):
+            return engine
+    return None
+
+
+def _b64(value: str) -> str | None:
+    try:
+        return base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def decode_link(href: str, base_url: str) -> str | None:
+    """Unwrap engine redirect links, returns the target url or None if it is not a result link"""
+    if not href or href.startswith(('#', 'javascript:')):
+        return None
+    url = urljoin(base_url, href)
+    parts = urlsplit(url)
+    host = (parts.hostname or '').lower()
+    query = parse_qs(parts.query)
+
+    if 'google.' in host and parts.path == '/url':
+        url = (query.get('q') or query.get('url') or [None])[0]
+    elif host.endswith('bing.com') and parts.path == '/ck/a':
+        # u=a1<base64url of the target>
+        target = (query.get('u') or [''])[0]
+        url = _b64(target[2:]) if target.startswith('a1') else None
+    elif host.endswith('duckduckgo.com') and parts.path == '/l/':
+        url = (query.get('uddg') or [None])[0]
+
+    if not url or urlsplit(url).scheme not in ('http', 'https'):
+        return None
+    target_host = (urlsplit(url).hostname or '').lower()
+    if _on_domain(target_host, _AD_HOSTS):
+        return None
+    engine_hosts = [p + d.removeprefix('*.') for d in SERP_DOMAINS.values() for p in _ENGINE_PREFIXES]
+    if target_host in engine_hosts:
+        return None
+    return url
+
+
+def _text(node: Tag | None) -> str:
+    return ' '.join(node.get_text(' ', strip=True).split()) if node is not None else ''
+
+
+def _inside(node: Tag, selector_match) -> bool:
+    return any(selector_match(parent) for parent in node.parents if isinstance(parent, Tag))
+
+
+def _is_google_ad(node: Tag) -> bool:
+    return node.get('id') in ('tads', 'tadsb', 'bottomads') or node.has_attr('data-text-ad')
+
+
+def _google(soup: BeautifulSoup, base_url: str) -> list[tuple[str, str, str]]:
+    root = soup.select_one('#rso') or soup.select_one('#search') or soup
+    found = []
+    for h3 in root.find_all('h3'):
+        link = h3.find_parent('a', href=True)
+        if link is None or _inside(h3, _is_google_ad):
+            continue
+        url = decode_link(link['href'], base_url)
+        if url is None:
+            continue
+        # the result block is the closest ancestor that also holds the snippet
+        block = link
+        for parent in link.parents:
+            if not isinstance(parent, Tag) or parent is root:
+                break
+            block = parent
+            if parent.get('data-hveid') or 'g' in (parent.get('class') or []) or 'MjjYud' in (parent.get('class') or []):
+                break
+        snippet_node = block.select_one('[data-sncf], .VwiC3b, [style*="-webkit-line-clamp"]')
+        snippet = _text(snippet_node)
+        if not snippet:
+            snippet = _text(block).replace(_text(link), '', 1).strip()
+        found.append((_text(h3), url, snippet))
+    return found
+
+
+def _bing(soup: BeautifulSoup, base_url: str) -> list[tuple[str, str, str]]:
+    found = []
+    for item in soup.select('#b_results > li.b_algo'):
+        link = item.select_one('h2 a[href]')
+        if link is None:
+            continue
+        url = decode_link(link['href'], base_url)
+        if url is None:
+            continue
+        snippet = _text(item.select_one('.b_caption p, p.b_lineclamp2, p.b_lineclamp3, p.b_lineclamp4, .b_algoSlug, p'))
+        found.append((_text(link), url, snippet))
+    return found
+
+
+def _duckduckgo(soup: BeautifulSoup, base_url: str) -> list[tuple[str, str, str]]:
+    found = []
+    # javascript version of the results page
+    for item in soup.select('article[data-testid="result"]'):
+        if item.find_parent(attrs={'data-layout': 'ad'}):
+            continue
+        link = item.select_one('a[data-testid="result-title-a"][href]')
+        if link is None:
+            continue
+        url = decode_link(link['href'], base_url)
+        if url is None:
+            continue
+        found.append((_text(link), url, _text(item.select_one('[data-result="snippet"]'))))
+    # html.duckduckgo.com / lite version
+    for item in soup.select('div.result'):
+        if 'result--ad' in item.get('class', []):
+            continue
+        link = item.select_one('a.result__a[href]')
+        if link is None:
+            continue
+        url = decode_link(link['href'], base_url)
+        if url is None:
+            continue
+        found.append((_text(link), url, _text(item.select_one('.result__snippet'))))
+    return found
+
+
+_PARSERS = {'google': _google, 'bing': _bing, 'duckduckgo': _duckduckgo}
+
+
+def parse_serp(html: str, page_url: str) -> list[SearchResult]:
+    """Organic results of a Google, Bing or DuckDuckGo results page in rank order
+
+    Returns an empty list for other pages or markup the parser does not recognise,
+    the caller then falls back to LLM extraction.
+    """
+    engine = detect_engine(page_url)
+    if engine is None:
+        return []
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    seen = set()
+    for title, url, snippet in _PARSERS[engine](soup, page_url):
+        key = url.split('#', 1)[0]  # sitelinks often only differ by fragment
+        if not title or key in seen:
+            continue
+        seen.add(key)
+        results.append(SearchResult(rank=len(results) + 1, title=title, url=url, snippet=snippet, engines=[engine]))
+    logger.debug(f'Parsed {len(results)} {engine} results from {page_url}')
+    return results
+
+
+class SerpExtractor:
+    """Fast path of extract_search_page_result, the LLM only filters results by goal if asked to"""
+
+    FILTER_PROMPT = (
+        'You get a goal and numbered search results. Respond with a json list of the numbers of the '
+        'results that are relevant for the goal, most relevant first, e.g. [2, 1, 5]. '
+        'Extraction goal: {goal}\nResults:\n{results}'
+    )
+
+    def __init__(self, enabled: bool = True, goal_filter: bool = False):
+        self.enabled = enabled
+        self.goal_filter = goal_filter
+
+    @classmethod
+    def from_env(cls) -> 'SerpExtractor':
+        return cls(
+            enabled=os.getenv('MCP_BROWSER_USE_SERP_PARSER', 'true').lower() == 'true',
+            goal_filter=os.getenv('MCP_BROWSER_USE_SERP_GOAL_FILTER', 'false').lower() == 'true',
+        )
+
+    async def parse(self, html: str, page_url: str) -> list[SearchResult]:
+        if not self.enabled or detect_engine(page_url) is None:
+            return []
+        try:
+            return await asyncio.to_thread(parse_serp, html, page_url)
+        except Exception as e:
+            logger.debug(f'Search result parser failed on {page_url}: {type(e).__name__}: {e}')
+            return []
+
+    async def filter(self, llm: BaseChatModel, goal: str, results: list[SearchResult], complete) -> list[SearchResult]:
+        """Keep the results the LLM considers relevant, all of them if its answer is unusable
+
+        ``complete(llm, prompt)`` returns the cleaned answer.
+        """
+        listing = '\n'.join(f'{r.rank}. {r.title} - {r.url}\n   {r.snippet}' for r in results)
+        output = await complete(llm, self.FILTER_PROMPT.format(goal=goal, results=listing))
+        by_rank = {r.rank: r for r in results}
+        try:
+            ranks = dict.fromkeys(int(rank) for rank in json.loads(output))
+            kept = [by_rank[rank] for rank in ranks if rank in by_rank]
+        except (json.JSONDecodeError, TypeError, ValueError) as e:
+            logger.debug(f'Unusable goal filter answer, keeping all results: {e}')
+            return results
+        return kept or results
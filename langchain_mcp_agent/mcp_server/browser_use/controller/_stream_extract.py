@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from langchain_mcp_agent.tools._tracing import span
+
+logger = logging.getLogger(__name__)
+
+THINK_OPEN = '<think>'
+THINK_CLOSE = '</think>'
+_FENCE = '```'
+
+
+def _partial_tag(text: str, tag: str) -> int:
+    """Length of the longest end of ``text`` that is the start of ``tag``"""
+    for size in range(min(len(tag) - 1, len(text)), 0, -1):
+        if text.endswith(tag[:size]):
+            return size
+    return 0
+
+
+class ThinkFilter:
+    """Drops <think>...</think> sections from text that arrives in pieces
+
+    Tags may be split across pieces, a possible tag start at the end of a piece is
+    held back until the next one. A closing tag without an opening one (models whose
+    chat template opens the think section in the prompt) means everything before it
+    was reasoning, ``feed`` then reports a reset.
+    """
+
+    def __init__(self):
+        self.thinking = False
+        self._pending = ''
+
+    def feed(self, text: str) -> tuple[str, bool]:
+        """Visible text of ``text`` and whether the visible text so far has to be discarded"""
+        text = self._pending + text
+        self._pending = ''
+        visible, reset = [], False
+        while text:
+            if self.thinking:
+                end = text.find(THINK_CLOSE)
+                if end == -1:
+                    self._pending = text[len(text) - _partial_tag(text, THINK_CLOSE):]
+                    break
+                text = text[end + len(THINK_CLOSE):]
+                self.thinking = False
+                continue
+            start, stray = text.find(THINK_OPEN), text.find(THINK_CLOSE)
+            if stray != -1 and (start == -1 or stray < start):
+                visible, reset = [], True
+                text = text[stray + len(THINK_CLOSE):]
+                continue
+            if start == -1:
+                hold = max(_partial_tag(text, THINK_OPEN), _partial_tag(text, THINK_CLOSE))
+                visible.append(text[:len(text) - hold])
+                self._pending = text[len(text) - hold:]
+                break
+            visible.append(text[:start])
+            text = text[start + len(THINK_OPEN):]
+            self.thinking = True
+        return ''.join(visible), reset
+
+    def flush(self) -> str:
+        """Held back text once the stream is over, nothing if a think section is still open"""
+        pending, self._pending = self._pending, ''
+        return '' if self.thinking else pending
+
+
+class JsonTracker:
+    """Follows bracket depth and string state to find where a JSON answer ends
+
+    Only a ``{`` or ``[`` that opens the visible text, or directly follows a
+    ```json fence, starts a value, so a markdown link in a prose answer is not taken
+    for one. A value counts as complete once its brackets close and ``json.loads``
+    accepts it; otherwise the answer is not JSON and ``failed`` is set. ``start``
+    and ``end`` index the value in the text fed.
+    """
+
+    def __init__(self):
+        self.start: int | None = None
+        self.end: int | None = None
+        self.failed = False
+        self._seen = 0
+        self._prefix = ''
+        self._value: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def complete(self) -> bool:
+        return self.end is not None
+
+    def _opens(self) -> bool:
+        """Whether the text before a bracket allows it to start the value"""
+        return self._prefix.strip().lower() in ('', _FENCE, _FENCE + 'json')
+
+    def _may_open(self) -> bool:
+        """Whether the text so far can still become a fence"""
+        prefix = self._prefix.strip().lower()
+        return (_FENCE + 'json').startswith(prefix)
+
+    def feed(self, text: str) -> bool:
+        """True once the value is complete"""
+        for offset, char in enumerate(text):
+            if self.end is not None or self.failed:
+                break
+            if self.start is None:
+                if char in '{[' and self._opens():
+                    self.start = self._seen + offset
+                    self._depth = 1
+                    self._value.append(char)
+                    continue
+                self._prefix += char
+                if not self._may_open():
+                    self.failed = True
+                continue
+            self._value.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        json.loads(''.join(self._value))
+                    except ValueError:
+                        self.failed = True
+                    else:
+                        self.end = self._seen + offset + 1
+        self._seen += len(text)
+        return self.end is not None
+
+
+class _Answer:
+    """Think filter and JSON tracker over one model answer"""
+
+    def __init__(self):
+        self.filter = ThinkFilter()
+        self.tracker = JsonTracker()
+        self.visible = ''
+
+    def feed(self, text: str) -> bool:
+        visible, reset = self.filter.feed(text)
+        if reset:
+            self.visible, self.tracker = '', JsonTracker()
+        self.visible += visible
+        return self.tracker.feed(visible)
+
+    def finish(self) -> bool:
+        rest = self.filter.flush()
+        self.visible += rest
+        return self.tracker.feed(rest)
+
+    def text(self, json_only: bool) -> str:
+        if json_only and self.tracker.complete:
+            return self.visible[self.tracker.start:self.tracker.end]
+        return self.visible.strip()
+
+
+def clean_answer(text: str) -> str:
+    """A complete answer without think sections, cut to its JSON value if it is one"""
+    answer = _Answer()
+    answer.feed(text)
+    answer.finish()
+    return answer.text(json_only=True)
+
+
+class StreamingExtractor:
+    """Extraction calls that stream the answer and stop once it is complete
+
+    Tokens go through a ThinkFilter as they arrive and the visible text through a
+    JsonTracker. With ``early_stop`` the stream is closed as soon as the JSON
+    answer is complete and parses, which closes the connection and makes Ollama
+    stop generating, so trailing prose or a repeated answer is never produced.
+    With ``enabled`` false the answer is awaited whole and cleaned afterwards.
+    """
+
+    def __init__(self, enabled: bool = True, early_stop: bool = True):
+        self.enabled = enabled
+        self.early_stop = early_stop
+        self.calls = 0
+        self.early_stops = 0
+
+    @classmethod
+    def from_env(cls) -> 'StreamingExtractor':
+        return cls(
+            enabled=os.getenv('MCP_BROWSER_USE_STREAM_EXTRACTION', 'true').lower() == 'true',
+            early_stop=os.getenv('MCP_BROWSER_USE_STREAM_EARLY_STOP', 'true').lower() == 'true',
+        )
+
+    async def complete(self, llm: BaseChatModel, prompt: str) -> str:
+        """The cleaned answer of ``llm`` to ``prompt``"""
+        self.calls += 1
+        if not self.enabled:
+            output = await llm.ainvoke(prompt)
+            return clean_answer(output.content)
+
+        answer = _Answer()
+        stopped = False
+        with span('stream_extract') as stream_span:
+            stream = llm.astream(prompt)
+            try:
+                async for chunk in stream:
+                    if answer.feed(chunk.content if isinstance(chunk.content, str) else str(chunk.content)) and self.early_stop:
+                        stopped = True
+                        break
+            finally:
+                # closing the stream ends the request, the model stops generating
+                await stream.aclose()
+            if not stopped:
+                answer.finish()
+            stream_span.set(early_stop=stopped, chars=len(answer.visible))
+        if stopped:
+            self.early_stops += 1
+            logger.debug(f'Extraction answer complete after {len(answer.visible)} chars, stopped generation')
+        return answer.text(json_only=True)
+
+    def stats(self) -> dict:
+        return {
+            'enabled': self.enabled,
+            'early_stop': self.early_stop,
+            'calls': self.calls,
+            'early_stops': self.early_stops,
+        }
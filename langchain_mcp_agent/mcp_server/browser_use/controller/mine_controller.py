@@ -1,4 +1,3 @@
-import asyncio
 import os
 import sys
 # Optional: Set the OLLAMA host to a remote server
@@ -7,11 +6,9 @@ sys.path.append(base_path)
 from dotenv import load_dotenv
 load_dotenv()
 
-import asyncio
 import enum
 import json
 import logging
-import re
 from typing import Generic, TypeVar, cast
 
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -40,6 +37,17 @@ from browser_use.controller.views import (
 )
 from browser_use.controller.service import Controller
 from browser_use.utils import time_execution_sync
+from langchain_mcp_agent.mcp_server.browser_use.controller._chunked_extraction import ChunkedExtractor
+from langchain_mcp_agent.mcp_server.browser_use.controller._extraction_cache import ExtractionCache
+from langchain_mcp_agent.mcp_server.browser_use.controller._http_fetcher import HttpFetcher
+from langchain_mcp_agent.mcp_server.browser_use.controller._iframe_harvester import IframeHarvester
+from langchain_mcp_agent.mcp_server.browser_use.controller._markdown_converter import MarkdownConverter
+from langchain_mcp_agent.mcp_server.browser_use.controller._multi_search import MultiSearch, MultiSearchAction
+from langchain_mcp_agent.mcp_server.browser_use.controller._prefetcher import GooglePrefetcher, google_results_url
+from langchain_mcp_agent.mcp_server.browser_use.controller._serp_parser import SERP_DOMAINS, SerpExtractor
+from langchain_mcp_agent.mcp_server.browser_use.controller._stream_extract import StreamingExtractor
+from langchain_mcp_agent.tools._context_budget import get_context_budget
+from langchain_mcp_agent.tools._tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -54,117 +62,192 @@ class MineController(Controller):
                                       'update_cell_contents', 'clear_cell_contents', 
                                       'select_cell_or_range', 'fallback_input_into_single_selected_cell'],
         output_model: type[BaseModel] | None = None,
+        extraction_cache: ExtractionCache | None = None,
+        iframe_harvester: IframeHarvester | None = None,
+        chunked_extractor: ChunkedExtractor | None = None,
+        markdown_converter: MarkdownConverter | None = None,
+        serp_extractor: SerpExtractor | None = None,
+        multi_search: MultiSearch | None = None,
+        prefetcher: GooglePrefetcher | None = None,
+        stream_extractor: StreamingExtractor | None = None,
+        http_fetcher: HttpFetcher | None = None,
     ):
         super().__init__(exclude_actions=exclude_actions, output_model=output_model)
-        THINK_TAGS = re.compile(r'<think>.*?</think>', re.DOTALL)
-        STRAY_CLOSE_TAG = re.compile(r'.*?</think>', re.DOTALL)
-        def _remove_last_closing_if_unbalanced(text):
-            count_open = sum(1 for char in text if char == '{')
-            count_close = sum(1 for char in text if char == '}')
-            
-            if count_open < count_close:
-                # Remove the last occurrence of '}'
-                last_index = text.rfind('}')
-                if last_index != -1:
-                    text = text[:last_index] + text[last_index + 1:]
-            
-            return text
-        def _remove_think_tags(text: str) -> str:
-            # Step 1: Remove well-formed <think>...</think>
-            text = re.sub(THINK_TAGS, '', text)
-            # Step 2: If there's an unmatched closing tag </think>,
-            #         remove everything up to and including that.
-            text = re.sub(STRAY_CLOSE_TAG, '', text)
-            text = _remove_last_closing_if_unbalanced(text)
-            return text.strip()
+        self.extraction_cache = extraction_cache if extraction_cache is not None else ExtractionCache.from_env()
+        cache = self.extraction_cache
+        self.iframe_harvester = iframe_harvester or IframeHarvester.from_env()
+        harvester = self.iframe_harvester
+        self.chunked_extractor = chunked_extractor or ChunkedExtractor.from_env()
+        chunker = self.chunked_extractor
+        self.markdown_converter = markdown_converter or MarkdownConverter.from_env()
+        converter = self.markdown_converter
+        self.serp_extractor = serp_extractor or SerpExtractor.from_env()
+        serp = self.serp_extractor
+        self.multi_search = multi_search or MultiSearch.from_env()
+        fanout = self.multi_search
+        self.prefetcher = prefetcher or GooglePrefetcher.from_env()
+        prefetcher = self.prefetcher
+        budget = get_context_budget()
+        self.stream_extractor = stream_extractor or StreamingExtractor.from_env()
+        extractor = self.stream_extractor
+        self.http_fetcher = http_fetcher or HttpFetcher.from_env()
+        fetcher = self.http_fetcher
             # Content Actions
-        @self.registry.action(
-            'Extract page content to retrieve specific information from the page, e.g. all company names, a specific description, all information about xyc, 4 links with companies in structured format. Use include_links true if the goal requires links. Use include_img true if the goal requires images',
-        )
-        async def extract_content(
-            goal: str,
-            page: Page,
-            page_extraction_llm: BaseChatModel,
-            include_links: bool = False,
-            include_img: bool = False,
-        ):
-            from functools import partial
-
-            import markdownify
-
+        async def read_page(goal: str, page: Page, page_extraction_llm: BaseChatModel, include_links: bool, include_img: bool):
             strip = []
             if not include_links:
                 strip.append('a')
             if not include_img:
                 strip.append('img')
 
-            # Run markdownify in a thread pool to avoid blocking the event loop
-            loop = asyncio.get_event_loop()
+            # Convert in the converter's process pool to avoid blocking the event loop
             page_html = await page.content()
-            markdownify_func = partial(markdownify.markdownify, strip=strip)
-            content = await loop.run_in_executor(None, markdownify_func, page_html)
+            with span('convert', converter=converter.name, page_bytes=len(page_html)) as convert_span:
+                content = await converter.convert(page_html, strip)
+                convert_span.set(markdown_chars=len(content))
 
             # manually append iframe text into the content so it's readable by the LLM (includes cross-origin iframes)
-            for iframe in page.frames:
-                try:
-                    await iframe.wait_for_load_state(timeout=5000)  # extra on top of already loaded page
-                except Exception as e:
-                    pass
-
-                if iframe.url != page.url and not iframe.url.startswith('data:'):
-                    content += f'\n\nIFRAME {iframe.url}:\n'
-                    # Run markdownify in a thread pool for iframe content as well
-                    try:
-                        iframe_html = await iframe.content()
-                        iframe_markdown = await loop.run_in_executor(None, markdownify_func, iframe_html)
-                    except Exception as e:
-                        logger.debug(f'Error extracting iframe content from within page {page.url}: {type(e).__name__}: {e}')
-                        iframe_markdown = ''
-                    content += iframe_markdown
+            # frames are collected concurrently under one deadline, ads/trackers and duplicates are skipped
+            async def convert_iframe(iframe_html: str) -> str:
+                return await converter.convert(iframe_html, strip)
+
+            with span('iframes') as iframe_span:
+                iframes = await harvester.harvest(page, convert_iframe)
+                iframe_span.set(frames=len(iframes.sections), dropped=len(iframes.dropped))
+            content += ''.join(iframes.sections)
+            dropped_note = iframes.dropped_note()
+            dropped_note = f'{dropped_note}\n' if dropped_note else ''
+            return await extract_markdown(goal, page.url, content, page_extraction_llm, dropped_note)
+
+        async def extract_markdown(goal: str, url: str, content: str, page_extraction_llm: BaseChatModel, dropped_note: str = ''):
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.key('extract_content', url, content, goal, page_extraction_llm)
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    msg = f'📄  Extracted from page\n: {cached}\n{dropped_note}'
+                    logger.info(msg)
+                    return ActionResult(extracted_content=msg, include_in_memory=True)
 
             prompt = 'Your task is to extract the content of the page. You will be given a page and a goal and you should extract all relevant information around this goal from the page. If the goal is vague, summarize the page. Respond in json format. Extraction goal: {goal}, Page: {page}'
             template = PromptTemplate(input_variables=['goal', 'page'], template=prompt)
             try:
-                output = await page_extraction_llm.ainvoke(template.format(goal=goal, page=content))
-                cleaned_content = _remove_think_tags(output.content)
-                output.content = cleaned_content
-                msg = f'📄  Extracted from page\n: {output.content}\n'
+                if chunker.enabled and not chunker.fits(page_extraction_llm, prompt + goal, content):
+                    cleaned_content = await chunker.extract(page_extraction_llm, goal, content, extractor.complete)
+                else:
+                    page_content = budget.trim(page_extraction_llm, prompt + goal, content, 'extract_content page')
+                    cleaned_content = await extractor.complete(page_extraction_llm, template.format(goal=goal, page=page_content))
+                if cache_key is not None:
+                    await cache.put(cache_key, cleaned_content)
+                msg = f'📄  Extracted from page\n: {cleaned_content}\n{dropped_note}'
                 logger.info(msg)
                 return ActionResult(extracted_content=msg, include_in_memory=True)
             except Exception as e:
                 logger.debug(f'Error extracting content: {e}')
-                msg = f'📄  Extracted from page\n: {content}\n'
+                msg = f'📄  Extracted from page\n: {content}\n{dropped_note}'
                 logger.info(msg)
                 return ActionResult(extracted_content=msg)
+
+        @self.registry.action(
+            'Extract page content to retrieve specific information from the page, e.g. all company names, a specific description, all information about xyc, 4 links with companies in structured format. Use include_links true if the goal requires links. Use include_img true if the goal requires images',
+        )
+        async def extract_content(
+            goal: str,
+            page: Page,
+            page_extraction_llm: BaseChatModel,
+            include_links: bool = False,
+            include_img: bool = False,
+        ):
+            return await read_page(goal, page, page_extraction_llm, include_links, include_img)
+
+        @self.registry.action(
+            'Open a url and extract information from it in one step, like go_to_url followed by extract_content. Static pages (articles, docs, listings) are read without rendering them in the browser, which is much faster; pages that need JavaScript are opened in the current tab',
+        )
+        async def fetch_page_content(
+            url: str,
+            goal: str,
+            browser_session: BrowserSession,
+            page_extraction_llm: BaseChatModel,
+            include_links: bool = False,
+            include_img: bool = False,
+        ):
+            if not browser_session._is_url_allowed(url):
+                return ActionResult(error=f'{url} is not in allowed_domains')
+            if fetcher.enabled:
+                with span('http_fetch') as fetch_span:
+                    fetched = await fetcher.fetch(url, allowed=browser_session._is_url_allowed)
+                    fetch_span.set(status=fetched.status, revalidated=fetched.revalidated, fallback=fetched.fallback)
+                if fetched.fallback is None:
+                    strip = [tag for tag, keep in (('a', include_links), ('img', include_img)) if not keep]
+                    with span('convert', converter=converter.name, page_bytes=len(fetched.html)) as convert_span:
+                        content = await converter.convert(fetched.html, strip)
+                        convert_span.set(markdown_chars=len(content))
+                    logger.info(f'⚡  Fetched {fetched.url} without the browser')
+                    return await extract_markdown(goal, fetched.url, content, page_extraction_llm)
+                logger.info(f'🔗  {url} needs the browser ({fetched.fallback}), opening it')
+
+            await browser_session.navigate_to(url)
+            page = await browser_session.get_current_page()
+            return await read_page(goal, page, page_extraction_llm, include_links, include_img)
             # Basic Navigation Actions
         @self.registry.action(
             description='Extract search page results for links or collections of next level pages',
-            allowed_domains=['*.google.com', '*.bing.com','*.duckduckgo.com']
+            allowed_domains=list(SERP_DOMAINS.values())
         )
         async def extract_search_page_result(
             goal: str,
             page: Page,
             page_extraction_llm: BaseChatModel,
         ):
-            from functools import partial
+            strip = ['img']
+            page_html = await page.content()
 
-            import markdownify
+            # Known result pages are parsed directly, the LLM at most filters the parsed results by goal
+            with span('serp.parse', page_bytes=len(page_html)) as parse_span:
+                results = await serp.parse(page_html, page.url)
+                parse_span.set(results=len(results))
+            if results:
+                if serp.goal_filter:
+                    cache_key = cached = None
+                    if cache is not None:
+                        listing = json.dumps([r.to_dict() for r in results], ensure_ascii=False)
+                        cache_key = cache.key('serp_goal_filter', page.url, listing, goal, page_extraction_llm)
+                        cached = await cache.get(cache_key)
+                    if cached is not None:
+                        ranks = set(json.loads(cached))
+                        results = [r for r in results if r.rank in ranks]
+                    else:
+                        try:
+                            results = await serp.filter(page_extraction_llm, goal, results, extractor.complete)
+                            if cache_key is not None:
+                                await cache.put(cache_key, json.dumps([r.rank for r in results]))
+                        except Exception as e:
+                            logger.debug(f'Error filtering search results by goal: {e}')
+                msg = f'🔀  Extracted from search result\n: {json.dumps([r.to_dict() for r in results], ensure_ascii=False)}\n'
+                logger.info(msg)
+                return ActionResult(extracted_content=msg, include_in_memory=True)
 
-            strip = ['img']
+            # Unknown markup: convert in the converter's process pool and let the LLM read the page
+            with span('convert', converter=converter.name, page_bytes=len(page_html)):
+                content = await converter.convert(page_html, strip)
 
-            # Run markdownify in a thread pool to avoid blocking the event loop
-            loop = asyncio.get_event_loop()
-            page_html = await page.content()
-            markdownify_func = partial(markdownify.markdownify, strip=strip)
-            content = await loop.run_in_executor(None, markdownify_func, page_html)
+            cache_key = None
+            if cache is not None:
+                cache_key = cache.key('extract_search_page_result', page.url, content, goal, page_extraction_llm)
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    msg = f'🔀  Extracted from search result\n: {cached}\n'
+                    logger.info(msg)
+                    return ActionResult(extracted_content=msg, include_in_memory=True)
 
             prompt = 'Your task is to extract the content of the page and list all search results with their target urls. You get a goal. Validate the Links against this goal. Respond in json format. Extraction goal: {goal}, Page: {page}'
             template = PromptTemplate(input_variables=['goal', 'page'], template=prompt)
             try:
-                output = await page_extraction_llm.ainvoke(template.format(goal=goal, page=content))
-                cleaned_content = _remove_think_tags(output.content)
-                output.content = cleaned_content
-                msg = f'🔀  Extracted from search result\n: {output.content}\n'
+                page_content = budget.trim(page_extraction_llm, prompt + goal, content, 'search result page')
+                cleaned_content = await extractor.complete(page_extraction_llm, template.format(goal=goal, page=page_content))
+                if cache_key is not None:
+                    await cache.put(cache_key, cleaned_content)
+                msg = f'🔀  Extracted from search result\n: {cleaned_content}\n'
                 logger.info(msg)
                 return ActionResult(extracted_content=msg, include_in_memory=True)
             except Exception as e:
@@ -195,7 +278,7 @@ class MineController(Controller):
             allowed_domains=['*.google.com/search']
         )
         async def next_ten_google_results(browser_session: BrowserSession):
-            from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+            from urllib.parse import urlparse, parse_qs
             page = await browser_session.get_current_page()
             search_url = page.url
 
@@ -206,15 +289,13 @@ class MineController(Controller):
             current_start = int(query_params.get('start', [0])[0])
             next_start = current_start + 10
 
-            # Update the start parameter
-            query_params['start'] = [str(next_start)]
+            # Rebuild the URL with the updated start parameter
+            new_url = google_results_url(search_url, next_start)
 
-            # Rebuild the URL
-            new_query = urlencode(query_params, doseq=True)
-            new_url = urlunparse(parsed._replace(query=new_query))
-        
-            await page.goto(new_url)
-            await page.wait_for_load_state()
+            # Swap in the page prefetched while the agent was reading this one, if any
+            if not await prefetcher.take(browser_session, new_url):
+                await page.goto(new_url)
+                await page.wait_for_load_state()
 
             msg = f'⏭️📄 Next 10 Google search results starting from "{str(next_start)}" loaded'
             logger.info(msg)
@@ -253,5 +334,30 @@ class MineController(Controller):
 
             msg = f'🔍🦆  Searched for "{params.query}" in DuckDuckGo'
             return ActionResult(extracted_content=msg, include_in_memory=True)
+        @self.registry.action(
+            'Search several engines (google, bing, duckduckgo) at once with a query and get one merged, '
+            'deduplicated and ranked list of results. Prefer this over searching the engines one by one',
+            param_model=MultiSearchAction,
+        )
+        async def search_web(params: MultiSearchAction, browser_session: BrowserSession):
+            results, status = await fanout.search(browser_session, params.query, params.engines, serp)
+            engines = ', '.join(f'{engine}: {state}' for engine, state in status.items())
+            if not results:
+                msg = f'🔍🌐  No results for "{params.query}" ({engines}), try a single engine search'
+                logger.info(msg)
+                return ActionResult(extracted_content=msg, include_in_memory=True)
+            listing = json.dumps([r.to_dict() for r in results[:params.max_results]], ensure_ascii=False)
+            msg = f'🔍🌐  Searched for "{params.query}" ({engines})\n: {listing}\n'
+            logger.info(msg)
+            return ActionResult(extracted_content=msg, include_in_memory=True)
 
-
+    async def act(self, action: ActionModel, browser_session: BrowserSession, *args, **kwargs) -> ActionResult:
+        name = next(iter(action.model_dump(exclude_unset=True)), 'unknown')
+        with span('action', action=name) as action_span:
+            result = await super().act(action, browser_session, *args, **kwargs)
+            action_span.set(error=bool(result.error))
+        try:
+            await self.prefetcher.after_action(browser_session)
+        except Exception as e:
+            logger.debug(f'Google prefetch failed: {type(e).__name__}: {e}')
+        return result
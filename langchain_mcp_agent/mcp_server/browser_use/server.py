@@ -7,28 +7,111 @@ sys.path.append(base_path)
 from dotenv import load_dotenv
 load_dotenv()
 
+import json
+from contextlib import asynccontextmanager
+
 from mcp.server.fastmcp import FastMCP
-from langchain_mcp_agent.mcp_server.browser_use.bu_easy_agent import BUEasyAgent
+# the agent stack (browser_use, playwright, model clients) is imported by warmup in the background
+from langchain_mcp_agent.mcp_server.browser_use._result_cache import ResearchCache
+from langchain_mcp_agent.mcp_server.browser_use._scheduler import SchedulerBusy, TaskScheduler
+from langchain_mcp_agent.mcp_server.browser_use._warmup import ServerWarmup
+from langchain_mcp_agent.tools._context_budget import get_context_budget
+from langchain_mcp_agent.tools._tracing import span, start_metrics_server
 
 def serve() -> FastMCP:
-    server = FastMCP("browser-use")
+    warmup = ServerWarmup.from_env()
 
-    @server.tool(description="Search for the boiling point of water at sea level")
-    async def web_research(task: str) -> str:
-        """Research the web for the given task abd get the result of the research"""
-        #print("🔨 mcp server browser-use web_research triggered")
+    @asynccontextmanager
+    async def lifespan(server: FastMCP):
+        # imports, browsers and models are warmed in the background so the handshake is not delayed
+        warmup.start()
+        metrics_server = start_metrics_server()
         try:
-            agent = BUEasyAgent(enable_memory=False)
-            result = await agent.run_search(task)
-            report_content = f"Result of web research is: {result}"
-        except Exception as e:
-            report_content = f"Error: {e}"
+            yield {}
+        finally:
+            await warmup.stop()
+            if metrics_server is not None:
+                metrics_server.shutdown()
+
+    server = FastMCP("browser-use", lifespan=lifespan)
+    scheduler = TaskScheduler.from_env()
+    research_cache = ResearchCache.from_env()
+
+    @server.tool(description=(
+        "Research the web for the given task with a browser agent and get the result of the research. "
+        "task: what to find out, in plain words. "
+        "priority: queued calls with a higher priority start first, default 0. "
+        "timeout_s: seconds the research may take before it is cancelled, 0 or above the server's limit uses the limit. "
+        "max_steps: browser steps the agent may take, 0 or above the server's limit uses the limit. "
+        "refresh: true skips a cached answer to the same task and researches again. "
+        "task_id: an id of your choosing; the run is checkpointed after every step and calling again "
+        "with the same task_id after a crash, timeout or cancellation resumes from the last good step."
+    ))
+    async def web_research(task: str, priority: int = 0, timeout_s: float = 0, max_steps: int = 0, refresh: bool = False, task_id: str = '') -> str:
+        """Research the web for the given task and get the result of the research
+
+        FastMCP sends the tool's description to clients, not this docstring, keep both in step.
+        """
+        #print("🔨 mcp server browser-use web_research triggered")
+        timeout, steps = scheduler.budget(timeout_s, max_steps)
+        with span('mcp.web_research', task_chars=len(task), task_id=task_id or None, priority=priority, timeout=timeout, max_steps=steps) as tool_span:
+            try:
+                BUEasyAgent = await warmup.agent_class()
+
+                stop_reasons = []
+
+                async def research():
+                    # memory only with an embedding model, mem0 on the chat model is too slow here
+                    await BUEasyAgent.loadEmbedder()
+                    agent = BUEasyAgent(enable_memory=bool(BUEasyAgent.embedder_model_name), max_steps=steps, task_id=task_id or None)
+                    try:
+                        return await scheduler.run(lambda: agent.run_search(task), priority=priority, timeout=timeout)
+                    finally:
+                        stop_reasons.append(agent.stop_reason)
+
+                # partial answers of runs stopped early are not cached
+                result, source = await research_cache.get_or_run(
+                    task, BUEasyAgent.main_model_name, research, refresh=refresh,
+                    cacheable=lambda _: stop_reasons[-1:] == ['done'], task_id=task_id or None,
+                )
+                report_content = f"Result of web research is: {result}"
+                tool_span.set(status='ok', cache=source, stop_reason=stop_reasons[-1] if stop_reasons else None)
+            except SchedulerBusy as e:
+                report_content = f"Error: {e}"
+                tool_span.set(status='busy')
+            except asyncio.TimeoutError:
+                report_content = f"Error: web research did not finish within {timeout:.0f}s and was cancelled"
+                tool_span.set(status='timeout')
+            except Exception as e:
+                report_content = f"Error: {e}"
+                tool_span.set(status='error', error=f"{type(e).__name__}: {e}")
         return report_content
+
+    @server.tool(description="Queue depth, running tasks and wait times of the web_research scheduler, browser pool, blocked requests, result cache, context trimming, streamed extraction, HTTP page fetches and why agent runs ended")
+    async def web_research_stats() -> str:
+        BUEasyAgent = await warmup.agent_class()
+        from langchain_mcp_agent.mcp_server.browser_use._resource_filter import ResourceFilter
+        from langchain_mcp_agent.mcp_server.browser_use._run_governor import RunGovernor
+        return json.dumps({
+            'warmup': warmup.status(),
+            'scheduler': scheduler.stats(),
+            'browser_pool': BUEasyAgent.getBrowserPool().stats(),
+            'resource_filter': ResourceFilter.total_stats(),
+            'result_cache': research_cache.stats(),
+            'context_budget': get_context_budget().stats(),
+            'stream_extraction': BUEasyAgent.controller.stream_extractor.stats(),
+            'http_fetch': BUEasyAgent.controller.http_fetcher.stats(),
+            'run_governor': RunGovernor.total_stats(),
+        })
+
+    @server.tool(description="Whether the browser-use server finished warming its browsers and models; ready is false until it did")
+    async def readiness() -> str:
+        return json.dumps(warmup.status())
     
     return server
     
-server_instance = serve() # Renamed from 'server' to avoid conflict with 'settings.server'
-
 if __name__ == "__main__":
+    # built under the guard: the markdown converter's spawned workers import this module as __mp_main__
+    server_instance = serve() # Renamed from 'server' to avoid conflict with 'settings.server'
     #print("🔨 mcp server browser-use started")
     server_instance.run()
\ No newline at end of file
@@ -0,0 +1,201 @@
+import logging
+import os
+import threading
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+OLLAMA_DEFAULT_NUM_CTX = 2048
+# browser-use's MessageManager counts len(text) // 3 as tokens
+BROWSER_USE_CHARS_PER_TOKEN = 3
+TRIM_NOTE = '\n\n[... content trimmed to fit the model context ...]'
+
+
+def model_key(llm: BaseChatModel | None) -> str | None:
+    if llm is None:
+        return None
+    return getattr(llm, 'model', None) or getattr(llm, 'model_name', None)
+
+
+class TokenEstimator:
+    """Counts tokens as characters / chars-per-token, calibrated per model
+
+    No tokenizer of the served models is available locally, so the ratio starts at
+    ``chars_per_token`` and follows the prompt token counts Ollama reports back, as
+    an exponential moving average. Samples with implausible ratios are dropped, e.g.
+    when Ollama reused a cached prompt prefix and only counted the new tokens.
+    """
+
+    MIN_RATIO = 1.0
+    MAX_RATIO = 8.0
+
+    def __init__(self, chars_per_token: float = 4.0, alpha: float = 0.2, min_tokens: int = 64):
+        self.chars_per_token = chars_per_token
+        self.alpha = alpha
+        self.min_tokens = min_tokens
+        self._ratios: dict[str, float] = {}
+        self._samples: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def ratio(self, model: str | None = None) -> float:
+        return self._ratios.get(model, self.chars_per_token) if model else self.chars_per_token
+
+    def count(self, text: str, model: str | None = None) -> int:
+        return int(len(text) / self.ratio(model)) + 1
+
+    def chars(self, tokens: int, model: str | None = None) -> int:
+        return max(0, int(tokens * self.ratio(model)))
+
+    def observe(self, model: str | None, chars: int, tokens: int) -> None:
+        if not model or tokens < self.min_tokens:
+            return
+        ratio = chars / tokens
+        if not self.MIN_RATIO <= ratio <= self.MAX_RATIO:
+            return
+        with self._lock:
+            current = self._ratios.get(model)
+            self._ratios[model] = ratio if current is None else current + self.alpha * (ratio - current)
+            self._samples[model] = self._samples.get(model, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                model: {'chars_per_token': round(ratio, 2), 'samples': self._samples[model]}
+                for model, ratio in self._ratios.items()
+            }
+
+
+class CalibrationCallbackHandler(BaseCallbackHandler):
+    """Feeds prompt size and the reported input tokens of every chat call into a TokenEstimator"""
+
+    run_inline = True
+
+    def __init__(self, estimator: TokenEstimator):
+        self.estimator = estimator
+        self._prompts: dict[Any, tuple[str | None, int]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        model = (kwargs.get('metadata') or {}).get('ls_model_name')
+        self._prompts[run_id] = (model, chars)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        model, chars = self._prompts.pop(run_id, (None, 0))
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+                if usage.get('input_tokens'):
+                    self.estimator.observe(model, chars, usage['input_tokens'])
+                    return
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        self._prompts.pop(run_id, None)
+
+
+class ContextBudget:
+    """Splits a model's num_ctx into room for the prompt and room for the answer
+
+    num_ctx and num_predict come from the model's models.json kwargs. The answer
+    gets num_predict tokens, or ``reserve_tokens`` when num_predict is not positive,
+    and ``safety_margin`` of num_ctx stays free for estimation error. What is left
+    bounds the agent's message history (main and planner model) and the extraction
+    prompts; content that does not fit is trimmed and every trim is logged.
+    """
+
+    def __init__(
+        self,
+        estimator: TokenEstimator | None = None,
+        reserve_tokens: int = 2048,
+        safety_margin: float = 0.05,
+    ):
+        self.estimator = estimator or TokenEstimator()
+        self.reserve_tokens = reserve_tokens
+        self.safety_margin = safety_margin
+        self.handler = CalibrationCallbackHandler(self.estimator)
+        self.trims = 0
+        self.trimmed_tokens = 0
+
+    @classmethod
+    def from_env(cls) -> 'ContextBudget':
+        reserve = os.getenv('MCP_BROWSER_USE_CONTEXT_RESERVE_TOKENS') or os.getenv('MCP_BROWSER_USE_CHUNK_RESERVE_TOKENS')
+        return cls(
+            estimator=TokenEstimator(chars_per_token=float(os.getenv('MCP_BROWSER_USE_CHARS_PER_TOKEN', 4))),
+            reserve_tokens=int(reserve or 2048),
+            safety_margin=float(os.getenv('MCP_BROWSER_USE_CONTEXT_SAFETY_MARGIN', 0.05)),
+        )
+
+    def count(self, text: str, llm: BaseChatModel | None = None) -> int:
+        return self.estimator.count(text, model_key(llm))
+
+    def input_tokens(self, llm: BaseChatModel) -> int:
+        """Tokens a whole prompt to ``llm`` may take"""
+        num_ctx = getattr(llm, 'num_ctx', None) or OLLAMA_DEFAULT_NUM_CTX
+        num_predict = getattr(llm, 'num_predict', None)
+        # the default reserve never takes more than half of a small context
+        reserve = num_predict if num_predict and num_predict > 0 else min(self.reserve_tokens, num_ctx // 2)
+        return max(256, int(num_ctx * (1 - self.safety_margin)) - reserve)
+
+    def room(self, llm: BaseChatModel, prompt: str) -> int:
+        """Tokens left for content once ``prompt`` is in"""
+        return max(256, self.input_tokens(llm) - self.count(prompt, llm))
+
+    def fits(self, llm: BaseChatModel, prompt: str, content: str) -> bool:
+        return self.count(content, llm) <= self.room(llm, prompt)
+
+    def history_tokens(self, *llms: BaseChatModel | None) -> int | None:
+        """max_input_tokens for browser-use's message history, None if no model sets num_ctx
+
+        The planner is sent the same history, so the smallest model bounds it.
+        browser-use counts 3 chars per token, the limit is converted to its count.
+        """
+        sized = [llm for llm in llms if llm is not None and getattr(llm, 'num_ctx', None)]
+        if not sized:
+            return None
+        return min(
+            int(self.input_tokens(llm) * self.estimator.ratio(model_key(llm)) / BROWSER_USE_CHARS_PER_TOKEN)
+            for llm in sized
+        )
+
+    def trim(self, llm: BaseChatModel, prompt: str, content: str, what: str = 'content') -> str:
+        """``content`` cut at a paragraph, line or word boundary so that prompt and content fit"""
+        tokens = self.count(content, llm)
+        room = self.room(llm, prompt)
+        if tokens <= room:
+            return content
+        max_chars = self.estimator.chars(room, model_key(llm)) - len(TRIM_NOTE)
+        cut = content[:max(0, max_chars)]
+        for separator in ('\n\n', '\n', ' '):
+            boundary = cut.rfind(separator)
+            if boundary > len(cut) * 0.5:
+                cut = cut[:boundary]
+                break
+        self.trims += 1
+        self.trimmed_tokens += tokens - self.count(cut, llm)
+        logger.info(
+            f'✂️  Trimmed {what} from ~{tokens} to ~{self.count(cut, llm)} tokens to fit '
+            f'{model_key(llm)} (num_ctx {getattr(llm, "num_ctx", None) or OLLAMA_DEFAULT_NUM_CTX})'
+        )
+        return cut + TRIM_NOTE
+
+    def stats(self) -> dict:
+        return {
+            'reserve_tokens': self.reserve_tokens,
+            'safety_margin': self.safety_margin,
+            'trims': self.trims,
+            'trimmed_tokens': self.trimmed_tokens,
+            'calibration': self.estimator.stats(),
+        }
+
+
+_budget: ContextBudget | None = None
+
+
+def get_context_budget() -> ContextBudget:
+    """Process wide budget, so every model call calibrates the same estimator"""
+    global _budget
+    if _budget is None:
+        _budget = ContextBudget.from_env()
+    return _budget
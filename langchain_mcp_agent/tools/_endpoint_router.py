@@ -0,0 +1,330 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Mapping
+from typing import Any, Optional, Union
+
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_ollama import ChatOllama
+from ollama import AsyncClient, Client, ResponseError
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ('least_outstanding', 'latency')
+
+
+def _retryable(e: BaseException) -> bool:
+    if isinstance(e, (httpx.TransportError, ConnectionError)):
+        return True
+    return isinstance(e, ResponseError) and e.status_code >= 500
+
+
+class Endpoint:
+    def __init__(self, url: str, sync_client_kwargs: dict | None = None, async_client_kwargs: dict | None = None):
+        self.url = url
+        self.async_client_kwargs = async_client_kwargs or {}
+        self.outstanding = 0
+        self.latency: float | None = None  # EWMA of request seconds
+        self.failures = 0
+        self.ejected = False
+        self.requests = 0
+        self.client = Client(host=url, **(sync_client_kwargs or {}))
+        self.async_client = AsyncClient(host=url, **self.async_client_kwargs)
+
+    def score(self, strategy: str) -> float:
+        if strategy == 'latency':
+            # unknown latency sorts first so new endpoints get measured
+            return (self.latency or 0.0) * (self.outstanding + 1)
+        return self.outstanding
+
+
+class EndpointRouter:
+    """Spreads requests for one model over several Ollama hosts
+
+    Endpoints are picked by least outstanding requests or by EWMA latency times
+    load. An endpoint is ejected after ``max_failures`` consecutive failed requests
+    or a failed health check and re-admitted once a background health check
+    (GET ``health_path``) succeeds again. ``sync_client_kwargs`` and
+    ``async_client_kwargs`` (headers, timeout, auth) go to every endpoint's ollama
+    clients, the health check sends them as well.
+    """
+
+    _shared: dict = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        urls: list[str],
+        strategy: str = 'least_outstanding',
+        max_failures: int = 3,
+        health_interval: float = 15,
+        health_path: str = '/api/version',
+        alpha: float = 0.3,
+        sync_client_kwargs: dict | None = None,
+        async_client_kwargs: dict | None = None,
+    ):
+        if not urls:
+            raise ValueError('EndpointRouter needs at least one endpoint')
+        if strategy not in STRATEGIES:
+            raise ValueError(f'Unknown routing strategy {strategy!r}, expected one of {STRATEGIES}')
+        self.endpoints = [Endpoint(url.rstrip('/'), sync_client_kwargs, async_client_kwargs) for url in urls]
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.health_interval = health_interval
+        self.health_path = health_path
+        self.alpha = alpha
+        self._rr = itertools.count()
+        self._lock = threading.Lock()
+        self._health_task: asyncio.Task | None = None
+
+    @classmethod
+    def shared(cls, urls: list[str], strategy: str = 'least_outstanding', **kwargs) -> 'EndpointRouter':
+        key = (tuple(urls), strategy, json.dumps(kwargs, sort_keys=True, default=str))
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(urls, strategy=strategy, **kwargs)
+            return cls._shared[key]
+
+    def pick(self, exclude: set[str] = frozenset()) -> Endpoint | None:
+        with self._lock:
+            candidates = [e for e in self.endpoints if e.url not in exclude and not e.ejected]
+            if not candidates:
+                # everything is ejected: try the least bad one rather than failing outright
+                candidates = [e for e in self.endpoints if e.url not in exclude]
+            if not candidates:
+                return None
+            offset = next(self._rr)
+            rotated = candidates[offset % len(candidates):] + candidates[:offset % len(candidates)]
+            endpoint = min(rotated, key=lambda e: e.score(self.strategy))
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+            return endpoint
+
+    def done(self, endpoint: Endpoint, started: float, ok: bool | None) -> None:
+        """Book a finished request, ok=None for requests abandoned by hedging"""
+        with self._lock:
+            endpoint.outstanding -= 1
+            if ok is None:
+                return
+            if ok:
+                elapsed = time.monotonic() - started
+                endpoint.latency = elapsed if endpoint.latency is None else (
+                    self.alpha * elapsed + (1 - self.alpha) * endpoint.latency
+                )
+                endpoint.failures = 0
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.max_failures and not endpoint.ejected:
+                endpoint.ejected = True
+                logger.warning(f'🚫 Ejecting Ollama endpoint {endpoint.url} after {endpoint.failures} failures')
+
+    async def check_health(self) -> None:
+        async def check(endpoint: Endpoint):
+            try:
+                async with httpx.AsyncClient(**{'timeout': 5, **endpoint.async_client_kwargs}) as client:
+                    response = await client.get(endpoint.url + self.health_path)
+                healthy = response.status_code < 500
+            except httpx.HTTPError:
+                healthy = False
+            with self._lock:
+                if healthy and endpoint.ejected:
+                    logger.info(f'✅ Re-admitting Ollama endpoint {endpoint.url}')
+                    endpoint.ejected = False
+                    endpoint.failures = 0
+                elif not healthy and not endpoint.ejected:
+                    logger.warning(f'🚫 Ejecting Ollama endpoint {endpoint.url}, health check failed')
+                    endpoint.ejected = True
+
+        await asyncio.gather(*(check(e) for e in self.endpoints))
+
+    def ensure_health_checks(self) -> None:
+        """Start the background health check loop on the running event loop"""
+        if self.health_interval <= 0 or len(self.endpoints) < 2:
+            return
+        if self._health_task is not None and not self._health_task.done():
+            return
+
+        async def loop():
+            while True:
+                await asyncio.sleep(self.health_interval)
+                try:
+                    await self.check_health()
+                except Exception as e:
+                    logger.debug(f'Health check round failed: {type(e).__name__}: {e}')
+
+        self._health_task = asyncio.get_running_loop().create_task(loop())
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                'url': e.url,
+                'outstanding': e.outstanding,
+                'latency_s': round(e.latency, 3) if e.latency is not None else None,
+                'failures': e.failures,
+                'ejected': e.ejected,
+                'requests': e.requests,
+            }
+            for e in self.endpoints
+        ]
+
+
+async def _open_chat(endpoint: Endpoint, chat_params: dict):
+    """Send the request and wait for the first part, returns (first_part, rest_of_stream)"""
+    if not chat_params['stream']:
+        return await endpoint.async_client.chat(**chat_params), None
+    stream = await endpoint.async_client.chat(**chat_params)
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        return None, None
+    return first, stream
+
+
+class RoutedChatOllama(ChatOllama):
+    """ChatOllama that routes each call to one of several Ollama endpoints
+
+    With ``hedge_after`` set, a second endpoint is asked as well if the first has
+    not produced its first token after that many seconds; the slower one is cancelled.
+    """
+
+    endpoints: list[str]
+    routing: str = 'least_outstanding'
+    hedge_after: Optional[float] = None
+    _router: EndpointRouter = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        super().model_post_init(__context)
+        # the same client kwargs ChatOllama._set_clients gives its own clients
+        client_kwargs = self.client_kwargs or {}
+        self._router = EndpointRouter.shared(
+            self.endpoints,
+            strategy=self.routing,
+            sync_client_kwargs={**client_kwargs, **(self.sync_client_kwargs or {})},
+            async_client_kwargs={**client_kwargs, **(self.async_client_kwargs or {})},
+        )
+
+    @property
+    def router(self) -> EndpointRouter:
+        return self._router
+
+    async def _hedged_open(self, chat_params: dict, tried: set[str]):
+        primary = self._router.pick(tried)
+        if primary is None:
+            raise RuntimeError('No Ollama endpoint left to try')
+        started = {primary: time.monotonic()}
+        tasks = {asyncio.ensure_future(_open_chat(primary, chat_params)): primary}
+        done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+        if not done:
+            secondary = self._router.pick(tried | {primary.url})
+            if secondary is not None:
+                logger.debug(f'Hedging request to {secondary.url}, {primary.url} slower than {self.hedge_after}s')
+                started[secondary] = time.monotonic()
+                tasks[asyncio.ensure_future(_open_chat(secondary, chat_params))] = secondary
+
+        winner = None
+        error = None
+        pending = set(tasks)
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                endpoint = tasks[task]
+                if task.exception() is None and winner is None:
+                    winner = task
+                elif task.exception() is not None:
+                    error = task.exception()
+                    tried.add(endpoint.url)
+                    self._router.done(endpoint, started[endpoint], ok=False)
+                else:
+                    # lost the race in the same round
+                    self._router.done(endpoint, started[endpoint], ok=None)
+                    if task.result()[1] is not None:
+                        await task.result()[1].aclose()
+        for task in pending:
+            task.cancel()
+            self._router.done(tasks[task], started[tasks[task]], ok=None)
+        if winner is None:
+            raise error
+        endpoint = tasks[winner]
+        first, stream = winner.result()
+        return endpoint, started[endpoint], first, stream
+
+    async def _acreate_chat_stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[Union[Mapping[str, Any], str]]:
+        chat_params = self._chat_params(messages, stop, **kwargs)
+        self._router.ensure_health_checks()
+        tried: set[str] = set()
+        while True:
+            if self.hedge_after is not None:
+                try:
+                    endpoint, started, first, stream = await self._hedged_open(chat_params, tried)
+                except Exception as e:
+                    if _retryable(e) and len(tried) < len(self.endpoints):
+                        continue
+                    raise
+            else:
+                endpoint = self._router.pick(tried)
+                started = time.monotonic()
+                try:
+                    first, stream = await _open_chat(endpoint, chat_params)
+                except Exception as e:
+                    self._router.done(endpoint, started, ok=False)
+                    tried.add(endpoint.url)
+                    if _retryable(e) and len(tried) < len(self.endpoints):
+                        logger.info(f'Ollama endpoint {endpoint.url} failed ({type(e).__name__}), retrying elsewhere')
+                        continue
+                    raise
+
+            # once the first part is out we are committed to this endpoint
+            ok = False
+            try:
+                if first is not None:
+                    yield first
+                if stream is not None:
+                    async for part in stream:
+                        yield part
+                ok = True
+            finally:
+                self._router.done(endpoint, started, ok=ok)
+            return
+
+    def _create_chat_stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> Iterator[Union[Mapping[str, Any], str]]:
+        chat_params = self._chat_params(messages, stop, **kwargs)
+        tried: set[str] = set()
+        while True:
+            endpoint = self._router.pick(tried)
+            started = time.monotonic()
+            yielded = False
+            ok = False
+            try:
+                if chat_params['stream']:
+                    for part in endpoint.client.chat(**chat_params):
+                        yielded = True
+                        yield part
+                else:
+                    response = endpoint.client.chat(**chat_params)
+                    yielded = True
+                    yield response
+                ok = True
+                return
+            except Exception as e:
+                tried.add(endpoint.url)
+                if not yielded and _retryable(e) and len(tried) < len(self.endpoints):
+                    logger.info(f'Ollama endpoint {endpoint.url} failed ({type(e).__name__}), retrying elsewhere')
+                    continue
+                raise
+            finally:
+                self._router.done(endpoint, started, ok=ok)
@@ -8,32 +8,180 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import json
+import logging
+import threading
+import time
+from pathlib import Path
 from langchain_ollama import ChatOllama
 from langchain.callbacks.base import BaseCallbackHandler
+from langchain_mcp_agent.tools._context_budget import get_context_budget
+from langchain_mcp_agent.tools._tracing import TracingCallbackHandler, get_tracer
 
+logger = logging.getLogger(__name__)
 
 
 class ModelServant:
+    """Process-wide registry of the models configured in models.json
+
+    models.json is parsed once and re-read only when its mtime changes. Model
+    instances are shared per (name, kwargs); entries whose config changed are
+    dropped from the registry on reload, instances already handed out keep
+    working so in-flight requests are not interrupted. All ChatOllama instances
+    pointing at the same base_url share one pooled HTTP client. Ollama models
+    without their own keep_alive get MCP_BROWSER_USE_MODEL_KEEP_ALIVE, so a model
+    stays loaded between calls for that long.
+    """
+    models_file = Path(f"{base_path}/models.json")
+    models: dict = {}
+    _mtime: float | None = None
+    _instances: dict = {}
+    _clients: dict = {}
+    _loading: dict = {}  # one lock per embedder being built, outside _lock
+    _lock = threading.RLock()
+    _tracing_handler: BaseCallbackHandler | None = None
+
     def __init__(self):
         """Load model configuration from models.json file"""
-        models_file = f"{base_path}/models.json"
-        
-        if models_file.exists():
+        self.reload()
+
+    @classmethod
+    def reload(cls, force: bool = False) -> bool:
+        """Re-read models.json if it changed on disk, returns True if it was (re)loaded"""
+        with cls._lock:
+            try:
+                mtime = cls.models_file.stat().st_mtime
+            except FileNotFoundError:
+                if cls._mtime is None:
+                    raise FileNotFoundError(f"models.json not found at {cls.models_file}")
+                return False  # keep serving the last good config
+            if not force and mtime == cls._mtime:
+                return False
             try:
-                with open(models_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError) as e:
-                raise(f"Error loading models.json: {e}")
-        else:
-            raise("models.json not found, using empty config")
-    
-    def getModel(self, modelName):
-        class_name = self.models.get(modelName)['class_name']
-        kwargs = self.models.get(modelName)['kwargs']
-        
-        # Convert string to actual class
-        if class_name == 'ChatOllama':
-            from langchain_ollama import ChatOllama
-            model_class = ChatOllama
-        
-        return model_class(**kwargs)
\ No newline at end of file
+                with open(cls.models_file, 'r') as f:
+                    models = json.load(f)
+            except json.JSONDecodeError as e:
+                if cls._mtime is None:
+                    raise ValueError(f"Error loading models.json: {e}") from e
+                logger.error(f"Error reloading models.json, keeping previous config: {e}")
+                return False
+
+            changed = {name for name in set(models) | set(cls.models) if models.get(name) != cls.models.get(name)}
+            if cls._mtime is not None and changed:
+                logger.info(f"🔁 models.json changed, reloading {sorted(changed)}")
+            for key in [key for key in cls._instances if key[0] in changed]:
+                del cls._instances[key]
+            cls.models = models
+            cls._mtime = mtime
+            return True
+
+    def _share_clients(self, model):
+        """Swap the per-instance ollama clients for one pooled client per base_url"""
+        if not isinstance(model, ChatOllama):
+            return
+        client_kwargs = json.dumps(
+            [model.client_kwargs, model.sync_client_kwargs, model.async_client_kwargs], sort_keys=True, default=str
+        )
+        sync_key = ('sync', model.base_url, client_kwargs)
+        async_key = ('async', model.base_url, client_kwargs)
+        model._client = self._clients.setdefault(sync_key, model._client)
+        model._async_client = self._clients.setdefault(async_key, model._async_client)
+
+    @staticmethod
+    def _keep_alive() -> int | str | None:
+        value = os.getenv('MCP_BROWSER_USE_MODEL_KEEP_ALIVE', '').strip()
+        if not value:
+            return None
+        # Ollama reads plain numbers as seconds and -1 as forever, anything else as a duration like 30m
+        return int(value) if value.lstrip('-').isdigit() else value
+
+    def getModelConfig(self, modelName) -> dict:
+        self.reload()
+        config = self.models.get(modelName)
+        if config is None:
+            raise KeyError(f"Model '{modelName}' not found in models.json, expected one of {list(self.models)}")
+        return config
+
+    def getModel(self, modelName, **kwargs):
+        with self._lock:
+            config = self.getModelConfig(modelName)
+            class_name = config['class_name']
+            kwargs = {**config['kwargs'], **kwargs}
+            if class_name == 'ChatOllama' and 'keep_alive' not in kwargs and self._keep_alive() is not None:
+                kwargs['keep_alive'] = self._keep_alive()
+            key = (modelName, json.dumps(kwargs, sort_keys=True, default=str))
+            model = self._instances.get(key)
+            if model is not None:
+                return model
+
+            # Convert string to actual class
+            if class_name == 'HuggingFaceEmbeddings':
+                loading = self._loading.setdefault(key, threading.Lock())
+            elif class_name == 'ChatOllama' and isinstance(kwargs.get('base_url'), list):
+                # several Ollama hosts serve this model, route between them
+                from langchain_mcp_agent.tools._endpoint_router import RoutedChatOllama
+                kwargs['endpoints'] = kwargs['base_url']
+                kwargs['base_url'] = kwargs['base_url'][0]
+                model_class = RoutedChatOllama
+            elif class_name == 'ChatOllama':
+                model_class = ChatOllama
+            else:
+                raise ValueError(f"Unsupported class_name '{class_name}' for model '{modelName}'")
+
+            if class_name != 'HuggingFaceEmbeddings':
+                model = model_class(**kwargs)
+                self._share_clients(model)
+                # prompt token counts reported by Ollama calibrate the context budget's estimator
+                model.callbacks = [*(model.callbacks or []), get_context_budget().handler]
+                if get_tracer().enabled:
+                    if ModelServant._tracing_handler is None:
+                        ModelServant._tracing_handler = TracingCallbackHandler()
+                    model.callbacks = [*(model.callbacks or []), ModelServant._tracing_handler]
+                self._instances[key] = model
+                return model
+
+        # loading the embedder's weights takes seconds, other models are handed out meanwhile
+        with loading:
+            model = self._instances.get(key)
+            if model is None:
+                # local sentence embedder, imported here since it pulls in torch
+                from langchain_huggingface import HuggingFaceEmbeddings
+                model = HuggingFaceEmbeddings(**kwargs)
+                with self._lock:
+                    self._instances[key] = model
+                    self._loading.pop(key, None)
+            return model
+
+    async def warmModels(self, modelNames) -> dict:
+        """Load the named models into Ollama's memory concurrently, returns seconds or error per model
+
+        Embedding models are loaded by constructing them. For Ollama models, an empty
+        generate request loads a model without generating anything. It is
+        sent with the model's num_ctx and keep_alive, since Ollama reloads a model
+        whose context size changes, and to every host a routed model uses.
+        """
+        async def warm(name) -> dict:
+            started = time.monotonic()
+            # constructing an embedding model loads its weights, keep that off the event loop
+            model = await asyncio.to_thread(self.getModel, name)
+            if not isinstance(model, ChatOllama):
+                return {'seconds': round(time.monotonic() - started, 1)}
+            router = getattr(model, 'router', None)
+            clients = [e.async_client for e in router.endpoints] if router is not None else [model._async_client]
+            options = {k: getattr(model, k) for k in ('num_ctx', 'num_gpu', 'num_thread') if getattr(model, k, None) is not None}
+            await asyncio.gather(*(
+                client.generate(model=model.model, prompt='', options=options, keep_alive=model.keep_alive)
+                for client in clients
+            ))
+            seconds = time.monotonic() - started
+            logger.info(f"🔥 Model {name} loaded in {seconds:.1f}s on {len(clients)} host(s)")
+            return {'seconds': round(seconds, 1)}
+
+        names = list(dict.fromkeys(name for name in modelNames if name))
+        results = await asyncio.gather(*(warm(name) for name in names), return_exceptions=True)
+        report = {}
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Could not warm up model {name}: {type(result).__name__}: {result}")
+                result = {'error': f"{type(result).__name__}: {result}"}
+            report[name] = result
+        return report
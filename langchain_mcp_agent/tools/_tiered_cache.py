@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache:
+    """String cache with an in-memory LRU tier in front of an optional SQLite tier.
+
+    Entries older than ``ttl`` seconds are treated as missing in both tiers. The
+    SQLite tier is trimmed to ``max_rows`` entries by least recent access. Each tier
+    has its own lock; ``aget``/``aput`` answer from memory on the event loop and run
+    the SQLite work in a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_items: int = 256,
+        db_path: str | None = None,
+        ttl: float | None = 24 * 3600,
+        max_rows: int = 5000,
+        table: str = 'cache',
+    ):
+        self.max_items = max_items
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.table = table
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._lock = threading.Lock()  # memory tier and counters
+        self._db_lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if db_path:
+            path = Path(db_path).expanduser()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {self.table} '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+            )
+            self._db.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table} (accessed_at)')
+            self._db.commit()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def _from_memory(self, key: str, now: float) -> str | None:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry[0], now):
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+            return entry[1]
+
+    def _from_disk(self, key: str, now: float) -> str | None:
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    f'SELECT value, created_at FROM {self.table} WHERE key = ?', (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if self._expired(created_at, now):
+                        self._db.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                        row = None
+                    else:
+                        self._db.execute(f'UPDATE {self.table} SET accessed_at = ? WHERE key = ?', (now, key))
+                    self._db.commit()
+            if row is not None:
+                with self._lock:
+                    self._remember(key, created_at, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        value = self._from_memory(key, now)
+        return value if value is not None else self._from_disk(key, now)
+
+    async def aget(self, key: str) -> str | None:
+        now = time.time()
+        value = self._from_memory(key, now)
+        if value is not None:
+            return value
+        if self._db is None:
+            return self._from_disk(key, now)  # only counts the miss
+        return await asyncio.to_thread(self._from_disk, key, now)
+
+    def _to_disk(self, key: str, value: str, now: float) -> None:
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                (key, value, now, now),
+            )
+            self._evict_disk(now)
+            self._db.commit()
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+        self._to_disk(key, value, now)
+
+    async def aput(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+        if self._db is not None:
+            await asyncio.to_thread(self._to_disk, key, value, now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+                self._db.commit()
+
+    def _remember(self, key: str, created_at: float, value: str) -> None:
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        if self.ttl is not None:
+            self._db.execute(f'DELETE FROM {self.table} WHERE created_at < ?', (now - self.ttl,))
+        (count,) = self._db.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()
+        overflow = count - self.max_rows
+        if overflow > 0:
+            self._db.execute(
+                f'DELETE FROM {self.table} WHERE key IN '
+                f'(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)',
+                (overflow,),
+            )
+            logger.debug(f'Evicted {overflow} entries from {self.table}')
+
+    def stats(self) -> dict:
+        disk_size = None
+        if self._db is not None:
+            with self._db_lock:
+                (disk_size,) = self._db.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_size': len(self._memory),
+                'disk_size': disk_size,
+            }
@@ -0,0 +1,274 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar['Span | None'] = contextvars.ContextVar('current_span', default=None)
+
+# span attributes that are summed into counters, e.g. agent_input_tokens_total{span="llm",model="..."}
+COUNTED_ATTRS = ('input_tokens', 'output_tokens', 'prompt_chars', 'page_bytes')
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, float('inf'))
+
+
+class Span:
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attrs', 'start', '_t0', '_token', 'error')
+
+    def __init__(self, tracer: 'Tracer', name: str, parent: 'Span | None', attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attrs = attrs
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = None
+        self.error = None
+
+    def set(self, **attrs: Any) -> 'Span':
+        self.attrs.update(attrs)
+        return self
+
+    def activate(self) -> 'Span':
+        """Make this the parent of spans started in the current context until end()"""
+        self._token = _current.set(self)
+        return self
+
+    def end(self, error: BaseException | None = None) -> None:
+        if error is not None:
+            self.error = f'{type(error).__name__}: {error}'
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:
+                pass  # ended from another context, e.g. a callback thread
+            self._token = None
+        self.tracer._finish(self, time.perf_counter() - self._t0)
+
+    def __enter__(self) -> 'Span':
+        return self.activate()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end(exc)
+
+
+class _NoopSpan:
+    """Returned by a disabled tracer, every method is a no-op"""
+    __slots__ = ()
+
+    def set(self, **attrs: Any) -> '_NoopSpan':
+        return self
+
+    def activate(self) -> '_NoopSpan':
+        return self
+
+    def end(self, error: BaseException | None = None) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Metrics:
+    """Span durations as histograms and COUNTED_ATTRS as counters, in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: dict[tuple, list[int]] = defaultdict(lambda: [0] * len(BUCKETS))
+        self._sums: dict[tuple, float] = defaultdict(float)
+        self._counts: dict[tuple, int] = defaultdict(int)
+        self._errors: dict[tuple, int] = defaultdict(int)
+        self._counters: dict[tuple, float] = defaultdict(float)
+
+    def observe(self, span: Span, seconds: float) -> None:
+        labels = (('span', span.name),)
+        with self._lock:
+            buckets = self._buckets[labels]
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            self._sums[labels] += seconds
+            self._counts[labels] += 1
+            if span.error is not None:
+                self._errors[labels] += 1
+            model = span.attrs.get('model')
+            for attr in COUNTED_ATTRS:
+                value = span.attrs.get(attr)
+                if isinstance(value, (int, float)):
+                    key = (attr, labels + ((('model', str(model)),) if model else ()))
+                    self._counters[key] += value
+
+    @staticmethod
+    def _labels(labels: tuple, extra: tuple = ()) -> str:
+        def escape(value) -> str:
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels + extra) + '}'
+
+    def render(self) -> str:
+        lines = [
+            '# HELP agent_span_seconds Duration of traced spans',
+            '# TYPE agent_span_seconds histogram',
+        ]
+        with self._lock:
+            for labels, buckets in sorted(self._buckets.items()):
+                for bound, count in zip(BUCKETS, buckets):
+                    le = '+Inf' if bound == float('inf') else str(bound)
+                    lines.append(f'agent_span_seconds_bucket{self._labels(labels, (("le", le),))} {count}')
+                lines.append(f'agent_span_seconds_sum{self._labels(labels)} {self._sums[labels]:.6f}')
+                lines.append(f'agent_span_seconds_count{self._labels(labels)} {self._counts[labels]}')
+            lines += ['# HELP agent_span_errors_total Spans that ended with an exception', '# TYPE agent_span_errors_total counter']
+            for labels, count in sorted(self._errors.items()):
+                lines.append(f'agent_span_errors_total{self._labels(labels)} {count}')
+            for attr in COUNTED_ATTRS:
+                rows = sorted((labels, v) for (a, labels), v in self._counters.items() if a == attr)
+                if rows:
+                    lines += [f'# TYPE agent_{attr}_total counter']
+                    lines += [f'agent_{attr}_total{self._labels(labels)} {value:g}' for labels, value in rows]
+        return '\n'.join(lines) + '\n'
+
+
+class Tracer:
+    """Spans with parent/child links through contextvars, exported as JSONL and as metrics
+
+    A disabled tracer hands out NOOP_SPAN, so instrumented code costs one attribute
+    check per span when tracing is off.
+    """
+
+    def __init__(self, path: str | None = None, metrics: bool = False):
+        self.path = Path(path).expanduser() if path else None
+        self.metrics = Metrics() if metrics or self.path else None
+        self.enabled = self.metrics is not None
+        self._lock = threading.Lock()
+        self._file = None
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def span(self, name: str, **attrs: Any) -> Span | _NoopSpan:
+        """Start a span, use as context manager or call end() on it"""
+        if not self.enabled:
+            return NOOP_SPAN
+        return Span(self, name, _current.get(), attrs)
+
+    @staticmethod
+    def current() -> Span | None:
+        return _current.get()
+
+    def _finish(self, span: Span, seconds: float) -> None:
+        self.metrics.observe(span, seconds)
+        if self._file is None:
+            return
+        record = {
+            'trace_id': span.trace_id,
+            'span_id': span.span_id,
+            'parent_id': span.parent_id,
+            'name': span.name,
+            'start': round(span.start, 6),
+            'duration_ms': round(seconds * 1000, 3),
+            'pid': os.getpid(),
+            'attrs': span.attrs,
+        }
+        if span.error is not None:
+            record['error'] = span.error
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        with self._lock:
+            self._file.write(line)
+
+
+_tracer: Tracer | None = None
+
+
+def get_tracer() -> Tracer:
+    """Process wide tracer, configured by AGENT_TRACE_FILE and AGENT_METRICS_PORT"""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(
+            path=os.getenv('AGENT_TRACE_FILE') or None,
+            metrics=int(os.getenv('AGENT_METRICS_PORT', 0)) > 0,
+        )
+    return _tracer
+
+
+def span(name: str, **attrs: Any) -> Span | _NoopSpan:
+    return get_tracer().span(name, **attrs)
+
+
+def start_metrics_server(port: int | None = None, host: str = '127.0.0.1') -> ThreadingHTTPServer | None:
+    """Serve GET /metrics in a daemon thread, returns None when metrics are off"""
+    port = int(os.getenv('AGENT_METRICS_PORT', 0)) if port is None else port
+    tracer = get_tracer()
+    if port <= 0 or tracer.metrics is None:
+        return None
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip('/') != '/metrics':
+                self.send_error(404)
+                return
+            body = tracer.metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # stdout belongs to the MCP stdio transport
+
+    server = ThreadingHTTPServer((os.getenv('AGENT_METRICS_HOST', host), port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    logger.info(f'📈 Metrics on http://{server.server_address[0]}:{port}/metrics')
+    return server
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """One 'llm' span per chat model call with prompt size, token counts and model name"""
+
+    run_inline = True  # run in the caller's context so spans nest under the active one
+
+    def __init__(self):
+        self._spans: dict[Any, Span] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs) -> None:
+        prompt_chars = sum(len(str(m.content)) for batch in messages for m in batch)
+        model = (kwargs.get('metadata') or {}).get('ls_model_name') or (serialized or {}).get('name')
+        self._spans[run_id] = span('llm', model=model, prompt_chars=prompt_chars)
+
+    def on_llm_end(self, response, *, run_id, **kwargs) -> None:
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, 'message', None), 'usage_metadata', None) or {}
+                input_tokens += usage.get('input_tokens', 0)
+                output_tokens += usage.get('output_tokens', 0)
+        current.set(input_tokens=input_tokens, output_tokens=output_tokens).end()
+
+    def on_llm_error(self, error, *, run_id, **kwargs) -> None:
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        if isinstance(error, GeneratorExit):
+            # the caller closed a stream it had read enough of, not a failure
+            current.set(stopped_early=True).end()
+        else:
+            current.end(error)
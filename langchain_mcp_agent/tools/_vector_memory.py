@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class VectorIndex:
+    """Normalized float32 vectors in one NumPy matrix with the texts next to them
+
+    Search is a single matrix-vector product (cosine similarity). Beyond
+    ``max_items`` the least recently used items are evicted, an item counts as used
+    when it is added or returned by a search. ``save()`` writes ``<path>.npy`` and
+    ``<path>.json`` through temporary files, so a crash never leaves half an index,
+    and one save at a time.
+    """
+
+    def __init__(self, dims: int, max_items: int = 5000, path: str | Path | None = None):
+        self.dims = dims
+        self.max_items = max_items
+        self.path = Path(path).expanduser() if path else None
+        self.vectors = np.zeros((0, dims), dtype=np.float32)
+        self.items: list[dict] = []  # {'text', 'meta', 'created', 'used'} per row
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def add(self, vectors, texts: list[str], metas: list[dict] | None = None) -> int:
+        """Add rows, returns how many were evicted to stay within max_items"""
+        vectors = self._normalize(vectors)
+        if vectors.shape[1] != self.dims:
+            raise ValueError(f'Expected {self.dims} dimensional vectors, got {vectors.shape[1]}')
+        now = time.time()
+        metas = metas or [{} for _ in texts]
+        with self._lock:
+            self.vectors = np.vstack([self.vectors, vectors])
+            self.items += [{'text': t, 'meta': m, 'created': now, 'used': now} for t, m in zip(texts, metas)]
+            return self._evict()
+
+    def _evict(self) -> int:
+        overflow = len(self.items) - self.max_items
+        if overflow <= 0:
+            return 0
+        used = np.array([item['used'] for item in self.items])
+        keep = np.sort(np.argsort(used, kind='stable')[overflow:])
+        self.vectors = self.vectors[keep]
+        self.items = [self.items[i] for i in keep]
+        return overflow
+
+    def search(self, vector, k: int = 5, min_score: float = 0.0) -> list[tuple[float, dict]]:
+        with self._lock:
+            if not self.items or k <= 0:
+                return []
+            scores = self.vectors @ self._normalize(vector)[0]
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            now = time.time()
+            hits = []
+            for i in top:
+                if scores[i] < min_score:
+                    break
+                self.items[i]['used'] = now
+                hits.append((float(scores[i]), self.items[i]))
+            return hits
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._save_lock:
+            with self._lock:
+                vectors, items = self.vectors.copy(), list(self.items)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            npy, meta = Path(f'{self.path}.npy'), Path(f'{self.path}.json')
+            # unique temporary names, another process may save the same index
+            with tempfile.NamedTemporaryFile(dir=npy.parent, prefix=npy.name, suffix='.tmp', delete=False) as f:
+                np.save(f, vectors)
+            with tempfile.NamedTemporaryFile('w', dir=meta.parent, prefix=meta.name, suffix='.tmp', delete=False, encoding='utf-8') as g:
+                json.dump({'dims': self.dims, 'items': items}, g, ensure_ascii=False)
+            os.replace(f.name, npy)
+            os.replace(g.name, meta)
+
+    def load(self) -> bool:
+        """Read a saved index, False if there is none or it does not match ``dims``"""
+        if self.path is None:
+            return False
+        npy, meta = Path(f'{self.path}.npy'), Path(f'{self.path}.json')
+        if not npy.exists() or not meta.exists():
+            return False
+        try:
+            data = json.loads(meta.read_text(encoding='utf-8'))
+            vectors = np.load(npy)
+        except (OSError, ValueError) as e:
+            logger.warning(f'Could not read memory index {self.path}: {type(e).__name__}: {e}')
+            return False
+        if data.get('dims') != self.dims or len(data.get('items', [])) != len(vectors):
+            logger.warning(f'Memory index {self.path} does not match the embedding model, starting a new one')
+            return False
+        with self._lock:
+            self.vectors = vectors.astype(np.float32, copy=False)
+            self.items = data['items']
+            self._evict()
+        return True
+
+
+class VectorMemory:
+    """Agent memory across runs on an Embeddings model and a VectorIndex
+
+    Items are embedded in batches of ``batch_size`` off the event loop, so neither
+    recording a run nor recalling for a new task goes through a chat model. Items
+    nearly identical to one already stored (cosine >= ``duplicate_score``) only
+    refresh that item.
+    """
+
+    _shared: dict = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        index: VectorIndex | None = None,
+        batch_size: int = 32,
+        top_k: int = 5,
+        min_score: float = 0.35,
+        duplicate_score: float = 0.97,
+        max_items: int = 5000,
+        path: str | Path | None = None,
+    ):
+        self.embeddings = embeddings
+        self.index = index
+        self.batch_size = batch_size
+        self.top_k = top_k
+        self.min_score = min_score
+        self.duplicate_score = duplicate_score
+        self.max_items = max_items
+        self.path = path
+        self._index_lock = asyncio.Lock()
+
+    @classmethod
+    def shared(cls, name: str, embeddings: Embeddings) -> 'VectorMemory':
+        """One memory per embedding model and process, configured by MCP_BROWSER_USE_MEMORY_*"""
+        with cls._shared_lock:
+            memory = cls._shared.get(name)
+            if memory is None or memory.embeddings is not embeddings:
+                directory = os.getenv('MCP_BROWSER_USE_MEMORY_DIR', '~/.cache/langchain_mcp_agent/memory')
+                memory = cls._shared[name] = cls(
+                    embeddings,
+                    batch_size=int(os.getenv('MCP_BROWSER_USE_MEMORY_BATCH_SIZE', 32)),
+                    top_k=int(os.getenv('MCP_BROWSER_USE_MEMORY_TOP_K', 5)),
+                    min_score=float(os.getenv('MCP_BROWSER_USE_MEMORY_MIN_SCORE', 0.35)),
+                    max_items=int(os.getenv('MCP_BROWSER_USE_MEMORY_MAX_ITEMS', 5000)),
+                    path=Path(directory) / re.sub(r'[^\w.-]+', '_', name) if directory else None,
+                )
+            return memory
+
+    async def _embed(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors += await asyncio.to_thread(self.embeddings.embed_documents, texts[start:start + self.batch_size])
+        return vectors
+
+    async def _ensure_index(self, dims: int) -> VectorIndex:
+        """The index is created on first use, when the embedding size is known"""
+        async with self._index_lock:
+            if self.index is None:
+                index = VectorIndex(dims, max_items=self.max_items, path=self.path)
+                if await asyncio.to_thread(index.load):
+                    logger.info(f'🧠 Loaded {len(index)} memory items from {index.path}')
+                self.index = index
+            return self.index
+
+    async def add(self, texts: list[str], metas: list[dict] | None = None) -> int:
+        """Embed and store ``texts``, returns how many were new"""
+        texts = [text for text in texts if text.strip()]
+        if not texts:
+            return 0
+        metas = metas or [{} for _ in texts]
+        vectors = await self._embed(texts)
+        index = await self._ensure_index(len(vectors[0]))
+        new_vectors, new_texts, new_metas = [], [], []
+        for vector, text, meta in zip(vectors, texts, metas):
+            if index.search(vector, k=1, min_score=self.duplicate_score):
+                continue  # search() marked the near duplicate as used
+            new_vectors.append(vector)
+            new_texts.append(text)
+            new_metas.append(meta)
+        evicted = index.add(new_vectors, new_texts, new_metas) if new_vectors else 0
+        if evicted:
+            logger.debug(f'Evicted {evicted} least recently used memory items')
+        await asyncio.to_thread(index.save)
+        return len(new_texts)
+
+    async def search(self, query: str, k: int | None = None) -> list[tuple[float, dict]]:
+        vector = await asyncio.to_thread(self.embeddings.embed_query, query)
+        index = await self._ensure_index(len(vector))
+        # the recency marked by search() is written with the next add()
+        return index.search(vector, k=self.top_k if k is None else k, min_score=self.min_score)
+
+    def stats(self) -> dict:
+        return {
+            'items': len(self.index) if self.index is not None else None,
+            'max_items': self.max_items,
+            'path': str(self.path) if self.path else None,
+        }
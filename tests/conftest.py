@@ -0,0 +1,5 @@
+import os
+import sys
+
+base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(base_path)
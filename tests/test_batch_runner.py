@@ -0,0 +1,95 @@
+import asyncio
+import io
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from langchain_mcp_agent._batch_runner import BatchRunner, previous_results, read_queries, run_batch, usage_of
+
+
+class FakeExecutor:
+    """Answers like a tool calling agent, queries listed in ``fail`` raise"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.queries = []
+
+    async def ainvoke(self, payload):
+        query = payload['messages'][-1].content
+        self.queries.append(query)
+        await asyncio.sleep(0)
+        if query in self.fail:
+            raise RuntimeError(f'cannot answer {query}')
+        return {'messages': payload['messages'] + [
+            AIMessage(content='', tool_calls=[{'name': 'web_research', 'args': {'task': query}, 'id': '1'}],
+                      usage_metadata={'input_tokens': 100, 'output_tokens': 10, 'total_tokens': 110}),
+            ToolMessage(content='found it', tool_call_id='1'),
+            AIMessage(content=f'answer to {query}',
+                      usage_metadata={'input_tokens': 150, 'output_tokens': 20, 'total_tokens': 170}),
+        ]}
+
+
+def test_read_queries():
+    lines = ['# comment', '', '{"id": "a", "query": "first"}', '"second"', '{"query": "third", "lang": "de"}']
+    assert read_queries(lines) == [
+        {'id': 'a', 'query': 'first'},
+        {'id': '4', 'query': 'second'},
+        {'id': '5', 'query': 'third', 'lang': 'de'},
+    ]
+
+
+@pytest.mark.parametrize('lines, error', [
+    (['"ok"', '{"query": "x"'], 'line 2: invalid JSON'),
+    (['{"id": 1}'], 'line 1: missing "query"'),
+    (['42'], 'line 1: missing "query"'),
+    (['{"id": "a", "query": "x"}', '{"id": "a", "query": "y"}'], "line 2: duplicate id 'a'"),
+])
+def test_read_queries_errors_name_the_line(lines, error):
+    with pytest.raises(ValueError, match=error):
+        read_queries(lines)
+
+
+def test_usage_counts_tokens_calls_and_tools():
+    messages = asyncio.run(FakeExecutor().ainvoke({'messages': [AIMessage(content='q')]}))['messages'][1:]
+    assert usage_of(messages) == {
+        'input_tokens': 250, 'output_tokens': 30, 'llm_calls': 2, 'tool_calls': 1, 'tools': {'web_research': 1},
+    }
+
+
+def test_failed_query_is_recorded_and_counted():
+    out = io.StringIO()
+    runner = BatchRunner(FakeExecutor(fail={'bad'}), 'system', concurrency=2)
+    summary = asyncio.run(runner.run([{'id': '1', 'query': 'good'}, {'id': '2', 'query': 'bad'}], out))
+    by_id = {r['id']: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert by_id['1']['answer'] == 'answer to good' and by_id['1']['error'] is None
+    assert by_id['2']['answer'] is None and by_id['2']['error'] == 'RuntimeError: cannot answer bad'
+    assert by_id['2']['tool_calls'] == 0
+    assert summary['queries'] == 2 and summary['failed'] == 1
+    assert (summary['input_tokens'], summary['output_tokens'], summary['tool_calls']) == (250, 30, 1)
+
+
+def test_resume_skips_finished_ids_and_retries_failed_ones(tmp_path):
+    batch = tmp_path / 'queries.jsonl'
+    batch.write_text('\n'.join(json.dumps({'id': i, 'query': q}) for i, q in [('1', 'one'), ('2', 'two'), ('3', 'three')]))
+    output = tmp_path / 'results.jsonl'
+
+    first = asyncio.run(run_batch(FakeExecutor(fail={'two'}), 'system', str(batch), str(output), 2))
+    assert (first['failed'], first['skipped'], first['retried']) == (1, 0, 0)
+    assert previous_results(output) == {'1': True, '2': False, '3': True}
+
+    # a crash cut the last record in half
+    with open(output, 'a', encoding='utf-8') as f:
+        f.write('{"id": "3", "answ')
+    executor = FakeExecutor()
+    second = asyncio.run(run_batch(executor, 'system', str(batch), str(output), 2))
+    assert executor.queries == ['two']
+    assert (second['failed'], second['skipped'], second['retried']) == (0, 2, 1)
+    assert previous_results(output) == {'1': True, '2': True, '3': True}
+    # the new record starts on a line of its own
+    lines = output.read_text(encoding='utf-8').splitlines()
+    assert lines[-2] == '{"id": "3", "answ'
+    assert json.loads(lines[-1])['id'] == '2'
+
+    third = asyncio.run(run_batch(FakeExecutor(), 'system', str(batch), str(output), 2))
+    assert (third['queries'], third['skipped']) == (0, 3)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('browser_use')
+
+from langchain_mcp_agent.mcp_server.browser_use._checkpoint import CheckpointStore  # noqa: E402
+
+
+class Dumps(SimpleNamespace):
+    def model_dump(self, **kwargs):
+        def dump(value):
+            if isinstance(value, Dumps):
+                return value.model_dump()
+            return [dump(v) for v in value] if isinstance(value, list) else value
+        return {key: dump(value) for key, value in vars(self).items()}
+
+
+def item(url: str, extracted: str | None = None, error: str | None = None) -> Dumps:
+    result = Dumps(error=error, extracted_content=extracted)
+    return Dumps(model_output={'action': [{'go_to_url': {'url': url}}]}, result=[result], state=Dumps(url=url))
+
+
+class FakeHistory:
+    def __init__(self):
+        self.history = []
+
+    def urls(self):
+        return [i.state.url for i in self.history]
+
+    def extracted_content(self):
+        return [r.extracted_content for i in self.history for r in i.result if r.extracted_content]
+
+    def is_done(self):
+        return False
+
+
+def fake_agent() -> SimpleNamespace:
+    return SimpleNamespace(state=SimpleNamespace(
+        history=FakeHistory(), n_steps=1, consecutive_failures=0, last_plan=None, last_result=[],
+        message_manager_state=Dumps(history=['system prompt']),
+    ))
+
+
+def take_step(agent, checkpoint, url, **kwargs) -> bool:
+    agent.state.history.history.append(item(url, **kwargs))
+    agent.state.n_steps += 1
+    return asyncio.run(checkpoint.save(agent))
+
+
+def test_saves_append_history_and_replace_state(tmp_path):
+    checkpoint = CheckpointStore(tmp_path).open('run-1', 'find the answer')
+    agent = fake_agent()
+    assert take_step(agent, checkpoint, 'https://example.org/a', extracted='first')
+    assert take_step(agent, checkpoint, 'https://example.org/b', extracted='second')
+    assert not take_step(agent, checkpoint, 'https://example.org/c', error='timeout')  # failed steps are not saved
+
+    state, items = checkpoint._read()
+    assert [i['state']['url'] for i in items] == ['https://example.org/a', 'https://example.org/b']
+    assert state['history_items'] == 2
+    assert state['n_steps'] == 3
+    assert state['url'] == 'https://example.org/b'
+    assert state['visited_urls'] == ['https://example.org/a', 'https://example.org/b']
+    assert state['extracted'] == ['first', 'second']
+    assert state['messages'] == {'history': ['system prompt']}
+    assert sorted(p.name for p in checkpoint.path.iterdir()) == ['history.jsonl', 'state.json']  # no .tmp left
+    assert checkpoint.saves == 2
+
+
+def test_history_lines_without_their_state_are_dropped(tmp_path):
+    checkpoint = CheckpointStore(tmp_path).open('run-1', 'task')
+    agent = fake_agent()
+    take_step(agent, checkpoint, 'https://example.org/a')
+    # a step that crashed between appending its line and replacing state.json
+    with open(checkpoint.history_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'state': {'url': 'https://example.org/lost'}}) + '\n{"trunc')
+    _, items = checkpoint._read()
+    assert [i['state']['url'] for i in items] == ['https://example.org/a']
+    assert checkpoint.history_path.read_text(encoding='utf-8').count('\n') == 1
+
+
+def test_checkpoint_of_another_task_or_unreadable_starts_over(tmp_path):
+    store = CheckpointStore(tmp_path)
+    take_step(fake_agent(), store.open('run-1', 'first task'), 'https://example.org/a')
+    other = store.open('run-1', 'second task')
+    assert asyncio.run(other.restore(fake_agent())) is False
+    assert not other.path.exists()
+
+    broken = store.open('run-2', 'task')
+    take_step(fake_agent(), broken, 'https://example.org/a')
+    broken.history_path.write_text('', encoding='utf-8')
+    assert asyncio.run(broken.restore(fake_agent())) is False
+    assert not broken.path.exists()
+    assert asyncio.run(store.open('run-3', 'task').restore(fake_agent())) is False  # nothing saved
+
+
+@pytest.mark.parametrize('task_id, name', [
+    ('../../etc/passwd', '_.._etc_passwd'),
+    ('a/b', 'a_b'),
+    ('..', '_'),
+    ('report 2024-05.v1', 'report_2024-05.v1'),
+])
+def test_task_ids_stay_inside_the_store(tmp_path, task_id, name):
+    checkpoint = CheckpointStore(tmp_path).open(task_id, 'task')
+    assert checkpoint.path == tmp_path / name
+    assert checkpoint.path.resolve().parent == tmp_path.resolve()
+
+
+def test_expired_checkpoints_are_pruned_on_open(tmp_path):
+    store = CheckpointStore(tmp_path, ttl=3600)
+    old, fresh = tmp_path / 'old', tmp_path / 'fresh'
+    old.mkdir()
+    fresh.mkdir()
+    past = time.time() - 7200
+    os.utime(old, (past, past))
+    store.open('new', 'task')
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['fresh']
+    assert CheckpointStore(None).open('new', 'task') is None
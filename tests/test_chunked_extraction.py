@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._chunked_extraction import merge_json_outputs, split_markdown
+
+PARAGRAPH = 'Sentence about the topic. ' * 4  # 104 chars
+
+
+@pytest.mark.parametrize('max_chars', [50, 120, 300, 1000])
+def test_chunks_stay_within_the_limit_and_keep_all_text(max_chars):
+    markdown = '\n\n'.join(f'## Section {i}\n\n{PARAGRAPH}\n{PARAGRAPH}' for i in range(5))
+    chunks = split_markdown(markdown, max_chars)
+    assert all(0 < len(chunk) <= max_chars for chunk in chunks)
+    assert ''.join(''.join(chunks).split()) == ''.join(markdown.split())
+
+
+def test_paragraphs_are_not_cut_when_they_fit():
+    markdown = '\n\n'.join(f'{i} {PARAGRAPH}' for i in range(6))
+    chunks = split_markdown(markdown, 250)
+    assert chunks == ['\n\n'.join(f'{i} {PARAGRAPH}' for i in pair) for pair in ((0, 1), (2, 3), (4, 5))]
+
+
+def test_long_paragraph_splits_on_lines_then_hard_cuts():
+    lines = [f'line {i} ' + 'x' * 40 for i in range(6)]
+    assert split_markdown('\n'.join(lines), 100) == [lines[0] + '\n\n' + lines[1], lines[2] + '\n\n' + lines[3], lines[4] + '\n\n' + lines[5]]
+    assert split_markdown('y' * 250, 100) == ['y' * 100, 'y' * 100, 'y' * 50]
+
+
+def test_heading_moves_to_the_chunk_with_its_text():
+    markdown = f'{PARAGRAPH}\n\n## Results\n\n{PARAGRAPH}'
+    chunks = split_markdown(markdown, 140)
+    assert chunks == [PARAGRAPH, f'## Results\n\n{PARAGRAPH}']
+    # not a heading, stays where it is
+    assert split_markdown(f'{PARAGRAPH}\n\nResults\n\n{PARAGRAPH}', 140) == [f'{PARAGRAPH}\n\nResults', PARAGRAPH]
+
+
+def test_lists_and_dicts_merge_without_duplicates():
+    outputs = [
+        '{"companies": [{"name": "A"}, {"name": "B"}], "source": "page"}',
+        '```json\n{"companies": [{"name": "B"}, {"name": "C"}], "count": 3}\n```',
+        '{}',
+        '[]',
+    ]
+    assert json.loads(merge_json_outputs(outputs)) == {
+        'companies': [{'name': 'A'}, {'name': 'B'}, {'name': 'C'}],
+        'source': 'page',
+        'count': 3,
+    }
+    assert json.loads(merge_json_outputs(['[1, 2]', 'Here you go: [2, 3]'])) == [1, 2, 3]
+    assert json.loads(merge_json_outputs(['{"price": "10"}', '{"price": "12"}'])) == {'price': ['10', '12']}
+    assert json.loads(merge_json_outputs(['{"price": "10"}', '{"price": "10"}'])) == {'price': '10'}
+
+
+def test_answers_that_are_not_json_are_kept_apart():
+    assert json.loads(merge_json_outputs(['[1]', 'nothing relevant here', ''])) == {
+        'results': [1], 'unstructured': ['nothing relevant here'],
+    }
+    assert json.loads(merge_json_outputs(['no json'])) == {'unstructured': ['no json']}
+    assert json.loads(merge_json_outputs([])) == {}
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from langchain_mcp_agent.tools._endpoint_router import EndpointRouter, RoutedChatOllama
+
+
+class StubOllama:
+    """Answers /api/chat like Ollama after ``delay`` seconds, or with ``status`` if it is not 200"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.delay = 0.0
+        self.status = 200
+        self.chats = 0
+        self.authorization = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                self._reply(200, b'{"version": "0.9.0"}', 'application/json')
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.chats += 1
+                stub.authorization.append(self.headers.get('Authorization'))
+                time.sleep(stub.delay)
+                if stub.status != 200:
+                    self._reply(stub.status, b'{"error": "stub failure"}', 'application/json')
+                    return
+                message = {'model': request['model'], 'created_at': '2025-01-01T00:00:00Z',
+                           'message': {'role': 'assistant', 'content': stub.name}, 'done': False}
+                final = {'model': request['model'], 'created_at': '2025-01-01T00:00:00Z',
+                         'message': {'role': 'assistant', 'content': ''}, 'done': True, 'done_reason': 'stop',
+                         'prompt_eval_count': 1, 'eval_count': 1}
+                body = (json.dumps(message) + '\n' + json.dumps(final) + '\n').encode()
+                self._reply(200, body, 'application/x-ndjson')
+
+            def _reply(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except BrokenPipeError:
+                    pass  # a hedged request the client gave up on
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stubs():
+    servers = [StubOllama('a'), StubOllama('b')]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+def routed(stubs, **kwargs) -> RoutedChatOllama:
+    urls = [stub.url for stub in stubs]
+    return RoutedChatOllama(model='stub', base_url=urls[0], endpoints=urls, **kwargs)
+
+
+def test_least_outstanding_spreads_concurrent_requests(stubs):
+    for stub in stubs:
+        stub.delay = 0.2
+    llm = routed(stubs)
+
+    async def run():
+        return await asyncio.gather(*(llm.ainvoke('hi') for _ in range(4)))
+
+    answers = asyncio.run(run())
+    assert sorted(answer.content for answer in answers) == ['a', 'a', 'b', 'b']
+    assert [stub.chats for stub in stubs] == [2, 2]
+    assert all(e['outstanding'] == 0 for e in llm.router.stats())
+
+
+def test_pick_prefers_the_least_loaded_endpoint():
+    router = EndpointRouter(['http://127.0.0.1:1', 'http://127.0.0.1:2'])
+    first = router.pick()
+    second = router.pick()
+    assert first is not second
+    router.done(first, time.monotonic(), ok=True)
+    assert router.pick() is first
+
+
+def test_failing_endpoint_is_retried_elsewhere_ejected_and_readmitted(stubs):
+    stubs[0].status = 500
+    llm = routed(stubs)
+    router = llm.router
+
+    async def run():
+        return [(await llm.ainvoke('hi')).content for _ in range(6)]
+
+    assert asyncio.run(run()) == ['b'] * 6
+    failing = router.endpoints[0]
+    assert failing.ejected
+    assert stubs[0].chats == router.max_failures  # no more requests once ejected
+
+    # its /api/version still answers, the next health check lets it back in
+    asyncio.run(router.check_health())
+    assert not failing.ejected
+    assert failing.failures == 0
+
+
+def test_health_check_ejects_an_unreachable_endpoint(stubs):
+    stubs[1].close()
+    router = EndpointRouter([stubs[0].url, stubs[1].url])
+    asyncio.run(router.check_health())
+    assert [e.ejected for e in router.endpoints] == [False, True]
+
+
+def test_hedged_request_answers_from_the_faster_endpoint(stubs):
+    stubs[0].delay = 1.0
+    # a new router picks the first endpoint first, the slow one
+    llm = routed(stubs, hedge_after=0.1)
+
+    async def run():
+        started = time.monotonic()
+        answer = await llm.ainvoke('hi')
+        return answer.content, time.monotonic() - started
+
+    content, seconds = asyncio.run(run())
+    assert content == 'b'
+    assert seconds < 0.9
+    assert [stub.chats for stub in stubs] == [1, 1]
+
+
+def test_client_kwargs_reach_every_endpoint(stubs):
+    llm = routed(stubs, client_kwargs={'headers': {'Authorization': 'Bearer secret'}})
+
+    async def run():
+        return await asyncio.gather(*(llm.ainvoke('hi') for _ in range(2)))
+
+    asyncio.run(run())
+    assert [value for stub in stubs for value in stub.authorization] == ['Bearer secret', 'Bearer secret']
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._http_fetcher import HttpFetcher, needs_browser
+
+ARTICLE = '<html><body><article>' + '<p>A static article with enough text to read without the browser.</p>' * 10 + '</article></body></html>'
+
+
+@pytest.fixture
+def site():
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            port = self.server.server_address[1]
+            if self.path == '/moved':
+                self.send_response(302)
+                self.send_header('Location', f'http://127.0.0.1:{port}/article')
+            elif self.path == '/away':
+                # another host name for the same server, outside the allowed domains
+                self.send_response(302)
+                self.send_header('Location', f'http://localhost:{port}/article')
+            else:
+                body = ARTICLE.encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}', requested
+    server.shutdown()
+    server.server_close()
+
+
+def only_127(url: str) -> bool:
+    return url.startswith('http://127.0.0.1:')
+
+
+def fetch(fetcher: HttpFetcher, url: str, allowed=None):
+    async def run():
+        try:
+            return await fetcher.fetch(url, allowed=allowed)
+        finally:
+            await fetcher.aclose()
+
+    return asyncio.run(run())
+
+
+def test_allowed_redirect_is_followed(site):
+    base, requested = site
+    result = fetch(HttpFetcher(allow_private=True), f'{base}/moved', allowed=only_127)
+    assert result.fallback is None
+    assert result.url == f'{base}/article'
+    assert requested == ['/moved', '/article']
+
+
+def test_redirect_out_of_allowed_domains_is_not_followed(site):
+    base, requested = site
+    result = fetch(HttpFetcher(allow_private=True), f'{base}/away', allowed=only_127)
+    assert result.fallback == 'not allowed'
+    assert result.url.startswith('http://localhost:')
+    assert requested == ['/away']
+
+
+def test_private_addresses_are_left_to_the_browser(site):
+    base, requested = site
+    result = fetch(HttpFetcher(), f'{base}/article')
+    assert result.fallback == 'private address'
+    assert requested == []
+
+
+def test_needs_browser():
+    assert needs_browser(ARTICLE) is None
+    assert needs_browser('<html><body><div id="root"></div><script src="app.js"></script></body></html>') == 'spa shell'
+    assert needs_browser('<noscript>Please enable JavaScript to continue.</noscript>') == 'noscript wall'
+    assert needs_browser('<title>Just a moment...</title>') == 'bot challenge'
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+from langchain_core.tools import ToolException
+from mcp.types import CallToolResult, ImageContent, ListToolsResult, TextContent, Tool
+
+from langchain_mcp_agent.mcp_clients.client import convert_call_tool_result, list_all_tools, myMCPClient
+
+
+class PagedSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.cursors = []
+
+    async def list_tools(self, cursor=None):
+        self.cursors.append(cursor)
+        index = int(cursor or 0)
+        tools = [Tool(name=name, inputSchema={'type': 'object'}) for name in self.pages[index]]
+        next_cursor = str(index + 1) if index + 1 < len(self.pages) else None
+        return ListToolsResult(tools=tools, nextCursor=next_cursor)
+
+
+def test_list_all_tools_follows_pagination():
+    session = PagedSession([['a', 'b'], ['c'], []])
+    assert [tool.name for tool in asyncio.run(list_all_tools(session))] == ['a', 'b', 'c']
+    assert session.cursors == [None, '1', '2']
+
+
+def test_convert_call_tool_result():
+    text = TextContent(type='text', text='one')
+    image = ImageContent(type='image', data='aGk=', mimeType='image/png')
+    assert convert_call_tool_result(CallToolResult(content=[text])) == ('one', None)
+    assert convert_call_tool_result(CallToolResult(content=[text, text, image])) == (['one', 'one'], [image])
+    assert convert_call_tool_result(CallToolResult(content=[image])) == ('', [image])
+    with pytest.raises(ToolException):
+        convert_call_tool_result(CallToolResult(content=[text], isError=True))
+
+
+def test_close_lets_the_client_start_again(monkeypatch, tmp_path):
+    monkeypatch.setenv('MCP_CLIENT_OUTPUT_STORE', '')
+    monkeypatch.setenv('MCP_CLIENT_TOOL_CACHE', str(tmp_path / 'tools.json'))
+
+    async def run():
+        client = myMCPClient()
+        client._tools = ['stale']
+        stop = client._stop
+        await client.close()
+        return client, stop
+
+    client, stop = asyncio.run(run())
+    assert stop.is_set()
+    assert not client._stop.is_set()
+    assert client._tools is None
@@ -0,0 +1,52 @@
+import pytest
+
+pytest.importorskip('browser_use')
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._multi_search import canonicalize_url, fuse_results  # noqa: E402
+from langchain_mcp_agent.mcp_server.browser_use.controller._serp_parser import SearchResult  # noqa: E402
+
+
+def results(*urls: str, snippet: str = '') -> list[SearchResult]:
+    return [SearchResult(rank=rank, title=f'title {rank}', url=url, snippet=snippet) for rank, url in enumerate(urls, start=1)]
+
+
+@pytest.mark.parametrize('a, b', [
+    ('https://www.example.org/docs/', 'http://example.org/docs'),
+    ('https://example.org/', 'https://example.org/index.html'),
+    ('https://m.example.org/a?b=2&a=1', 'https://example.org/a?a=1&b=2&utm_source=bing'),
+    ('https://EXAMPLE.org:443/a', 'http://example.org:80/a'),
+])
+def test_same_page_collapses(a, b):
+    assert canonicalize_url(a) == canonicalize_url(b)
+
+
+@pytest.mark.parametrize('a, b', [
+    ('https://example.org/a', 'https://example.org/b'),
+    ('https://example.org/a?page=1', 'https://example.org/a?page=2'),
+    ('https://example.org:8080/a', 'https://example.org/a'),
+    ('https://docs.example.org/a', 'https://example.org/a'),
+])
+def test_different_pages_stay_apart(a, b):
+    assert canonicalize_url(a) != canonicalize_url(b)
+
+
+def test_result_found_by_two_engines_outranks_a_single_engine_first_hit():
+    fused = fuse_results({
+        'google': results('https://only-google.example/', 'https://www.shared.example/page'),
+        'bing': results('https://only-bing.example/', 'http://shared.example/page/', snippet='a longer snippet from bing'),
+    })
+    assert [r.url for r in fused] == [
+        'https://www.shared.example/page',
+        'https://only-google.example/',
+        'https://only-bing.example/',
+    ]
+    assert [r.rank for r in fused] == [1, 2, 3]
+    assert fused[0].engines == ['google', 'bing']
+    assert fused[0].snippet == 'a longer snippet from bing'
+    assert fused[1].engines == ['google']
+
+
+def test_single_engine_keeps_its_order():
+    urls = [f'https://example.org/{i}' for i in range(5)]
+    assert [r.url for r in fuse_results({'duckduckgo': results(*urls)})] == urls
+    assert fuse_results({}) == []
@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+from langchain_mcp_agent.mcp_clients._output_compactor import FETCH_TOOL_NAME, OutputCompactor
+from langchain_mcp_agent.tools._tiered_cache import TieredCache
+
+DOCUMENTS = [{'_id': i, 'name': f'user {i}', 'city': 'Berlin' if i % 10 == 0 else 'Paris'} for i in range(200)]
+
+
+def compactor(**kwargs) -> OutputCompactor:
+    return OutputCompactor(TieredCache(max_items=8, table='tool_outputs'), **kwargs)
+
+
+def handle_of(compacted: str) -> str:
+    return compacted.split('stored as handle ')[1].split(',')[0]
+
+
+def test_short_outputs_pass_through():
+    outputs = compactor(max_chars=1000)
+    assert asyncio.run(outputs.compact('find', 'short')) == 'short'
+    assert asyncio.run(outputs.compact('find', ['a', 'b'])) == ['a', 'b']
+    assert outputs.stats()['compacted'] == 0
+    assert asyncio.run(compactor(max_chars=0).compact('find', 'x' * 10000)) == 'x' * 10000
+
+
+def test_json_array_is_stored_under_a_handle_and_paged_by_item():
+    outputs = compactor(max_chars=1000, page_chars=1000)
+    raw = json.dumps(DOCUMENTS)
+    compacted = asyncio.run(outputs.compact('find', raw))
+
+    assert len(compacted) <= 1200
+    assert compacted.startswith(f'[find returned {len(raw):,} chars, JSON array of 200 items with keys _id, name, city.')
+    assert f'{FETCH_TOOL_NAME}(handle="' in compacted
+    handle = handle_of(compacted)
+    assert handle.startswith('out_')
+
+    page = asyncio.run(outputs.fetch(handle, page=2))
+    head, *items = page.splitlines()
+    assert head.startswith(f'[{handle} (find) page 2 of ')
+    first = int(items[0].split(']')[0].lstrip('['))
+    assert items[0] == f'[{first}] {json.dumps(DOCUMENTS[first])}'
+    assert 'there is no page 99' in asyncio.run(outputs.fetch(handle, page=99))
+
+    stats = outputs.stats()
+    assert (stats['compacted'], stats['chars_in'], stats['fetches']) == (1, len(raw), 2)
+
+
+def test_search_returns_the_matching_items_numbered_in_the_whole_output():
+    outputs = compactor(max_chars=1000, page_chars=100000)
+    handle = handle_of(asyncio.run(outputs.compact('find', json.dumps(DOCUMENTS))))
+    found = asyncio.run(outputs.fetch(handle, query='berlin'))
+    head, *items = found.splitlines()
+    assert head == f'[20 of 200 items of {handle} contain "berlin"]'
+    assert [int(item.split(']')[0].lstrip('[')) for item in items] == list(range(0, 200, 10))
+
+
+def test_text_is_paged_by_line():
+    outputs = compactor(max_chars=500, page_chars=500)
+    text = ''.join(f'line {i}: {"word " * 8}\n' for i in range(100))
+    compacted = asyncio.run(outputs.compact('logs', text))
+    assert '100 lines of text' in compacted
+    handle = handle_of(compacted)
+    page = asyncio.run(outputs.fetch(handle, page=1))
+    assert page.splitlines()[1] == text.splitlines()[0]
+    assert '[1 of 100 lines' in asyncio.run(outputs.fetch(handle, query='line 42:'))
+
+
+def test_unknown_handle():
+    assert 'No stored output with handle out_missing' in asyncio.run(compactor().fetch('out_missing'))
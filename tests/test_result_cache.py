@@ -0,0 +1,43 @@
+import asyncio
+
+from langchain_mcp_agent.mcp_server.browser_use._result_cache import ResearchCache
+
+
+def test_identical_requests_share_one_run():
+    cache = ResearchCache()
+    runs = []
+
+    async def research():
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_run('Boiling point?', 'm', research) for _ in range(3)))
+
+    assert [source for _, source in asyncio.run(run())] == ['run', 'shared', 'shared']
+    assert len(runs) == 1
+    assert asyncio.run(cache.get_or_run('boiling  point', 'm', research)) == ('answer', 'cache')
+
+
+def test_checkpointed_requests_only_join_their_own_task_id():
+    cache = ResearchCache(enabled=False)
+    ran_for = []
+
+    def research(task_id):
+        async def run():
+            ran_for.append(task_id)
+            await asyncio.sleep(0.05)
+            return task_id
+        return run
+
+    async def run():
+        return await asyncio.gather(
+            cache.get_or_run('task', 'm', research('a'), task_id='a'),
+            cache.get_or_run('task', 'm', research('a'), task_id='a'),
+            cache.get_or_run('task', 'm', research('b'), task_id='b'),
+            cache.get_or_run('task', 'm', research(None)),
+        )
+
+    assert asyncio.run(run()) == [('a', 'run'), ('a', 'shared'), ('b', 'run'), (None, 'run')]
+    assert ran_for == ['a', 'b', None]
@@ -0,0 +1,146 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('browser_use')
+
+from langchain_mcp_agent.mcp_server.browser_use._run_governor import (  # noqa: E402
+    RunGovernor,
+    StepFingerprint,
+    _query_words,
+    _similar,
+)
+
+
+class FakeAgent:
+    """The parts of browser_use's Agent the governor touches"""
+
+    def __init__(self, planner: bool = True, input_tokens: int = 0):
+        self.history = []
+        self.input_tokens = input_tokens
+        self.messages = []
+        self.stopped = False
+        self.settings = SimpleNamespace(planner_llm=object() if planner else None, planner_interval=4)
+        self.state = SimpleNamespace(history=SimpleNamespace(
+            history=self.history,
+            is_done=lambda: False,
+            total_input_tokens=lambda: self.input_tokens,
+        ))
+        self._message_manager = SimpleNamespace(_add_message_with_tokens=self.messages.append)
+
+    def stop(self):
+        self.stopped = True
+
+
+def step(url='https://example.org/a', actions=('click_element {"index": 3}',), content='same', extracted=(), searches=()):
+    return StepFingerprint(url=url, actions=tuple(actions), content=content, extracted=tuple(extracted), searches=tuple(searches))
+
+
+def run(governor: RunGovernor, agent: FakeAgent, steps: list[StepFingerprint]) -> list:
+    """Feeds the fingerprints through before_step/after_step, returns the intervention of every step"""
+    fingerprints = iter(steps)
+
+    async def fingerprint(agent, item):
+        return next(fingerprints)
+
+    governor.fingerprint = fingerprint
+
+    async def go():
+        interventions = []
+        for _ in steps:
+            governor.before_step(agent)
+            agent.history.append(object())
+            interventions.append(await governor.after_step(agent))
+            if agent.stopped:
+                break
+        return interventions
+
+    return asyncio.run(go())
+
+
+def test_repeated_cycle_escalates_hint_plan_stop():
+    governor = RunGovernor(stall_steps=100, repeat_limit=3)
+    agent = FakeAgent()
+    assert run(governor, agent, [step()] * 6) == [None, None, 'hint', 'plan', 'stop']
+    assert governor.reason == 'cycle'
+    assert governor.interventions == ['hint', 'plan', 'stop']
+    assert agent.stopped
+    assert len(agent.messages) == 1 and 'repeating yourself' in agent.messages[0].content
+
+
+def test_forced_plan_runs_the_planner_for_one_step_only():
+    governor = RunGovernor(stall_steps=100, repeat_limit=3)
+    agent = FakeAgent()
+    run(governor, agent, [step()] * 4)
+    assert governor.interventions == ['hint', 'plan']
+    governor.before_step(agent)
+    assert agent.settings.planner_interval == 1
+    governor.fingerprint = lambda agent, item: asyncio.sleep(0, step(url='https://example.org/new', content='new'))
+    asyncio.run(governor.after_step(agent))
+    assert agent.settings.planner_interval == 4
+
+
+def test_without_a_planner_the_second_escalation_is_another_hint():
+    governor = RunGovernor(stall_steps=100, repeat_limit=3)
+    agent = FakeAgent(planner=False)
+    assert run(governor, agent, [step()] * 5) == [None, None, 'hint', 'hint', 'stop']
+
+
+def test_steps_without_progress_count_as_stalled():
+    governor = RunGovernor(stall_steps=3, repeat_limit=100)
+    agent = FakeAgent()
+    steps = [step(actions=(f'scroll_down {{"amount": {i}}}',)) for i in range(4)]
+    assert run(governor, agent, steps) == [None, None, None, 'hint']
+    assert 'no new page' in agent.messages[0].content
+
+
+def test_progress_is_a_new_url_content_or_extraction():
+    governor = RunGovernor(stall_steps=2, repeat_limit=100)
+    agent = FakeAgent()
+    steps = [
+        step(actions=('a',)),
+        step(actions=('b',), url='https://example.org/b'),
+        step(actions=('c',), url='https://example.org/b', content='scrolled'),
+        step(actions=('d',), url='https://example.org/b', content='scrolled', extracted=('facts',)),
+    ]
+    assert run(governor, agent, steps) == [None, None, None, None]
+
+
+def test_similar_searches_count_as_repeats():
+    assert _similar(_query_words('how many bones are in the human body'), _query_words('human body bones')) >= 0.7
+    assert _similar(_query_words('human body bones'), _query_words('python asyncio tutorial')) == 0
+
+    governor = RunGovernor(stall_steps=100, repeat_limit=3)
+    agent = FakeAgent()
+    queries = ['how many bones are in the human body', 'python asyncio tutorial', 'Human body bones', 'the bones of a human body']
+    steps = [
+        step(url=f'https://example.org/{i}', actions=(f'search_web {{"query": "{q}"}}',), content=q, searches=(q,))
+        for i, q in enumerate(queries)
+    ]
+    assert run(governor, agent, steps) == [None, None, None, 'hint']
+    assert '3 searches like' in agent.messages[0].content
+
+
+@pytest.mark.parametrize('limits, expected', [
+    ({'max_seconds': 1}, 'wall_clock'),
+    ({'max_tokens': 100}, 'tokens'),
+    ({'max_steps': 2}, 'steps'),
+])
+def test_budgets_stop_the_run(limits, expected):
+    governor = RunGovernor(**limits)
+    governor._started = time.monotonic() - 5 if 'max_seconds' in limits else time.monotonic()
+    agent = FakeAgent(input_tokens=150)
+    steps = [step(url=f'https://example.org/{i}', content=str(i)) for i in range(3)]
+    interventions = run(governor, agent, steps)
+    assert interventions[-1] == 'stop'
+    assert len(interventions) == (2 if expected == 'steps' else 1)
+    assert governor.reason == expected
+    assert agent.stopped
+
+
+def test_disabled_governor_never_intervenes():
+    governor = RunGovernor(enabled=False, stall_steps=1, repeat_limit=1, max_steps=1)
+    agent = FakeAgent()
+    assert run(governor, agent, [step()] * 3) == [None, None, None]
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from langchain_mcp_agent.mcp_server.browser_use._scheduler import SchedulerBusy, TaskScheduler
+
+
+def test_budget_clamps_to_the_configured_maxima():
+    scheduler = TaskScheduler(timeout=600, max_steps=50)
+    assert scheduler.budget() == (600, 50)
+    assert scheduler.budget(0, 0) == (600, 50)
+    assert scheduler.budget(-5, -1) == (600, 50)
+    assert scheduler.budget(30, 10) == (30, 10)
+    assert scheduler.budget(3600, 500) == (600, 50)
+
+
+def test_queued_tasks_start_by_priority_then_in_order():
+    scheduler = TaskScheduler(max_concurrency=1, max_queue=8)
+    started = []
+
+    async def task(name, gate=None):
+        started.append(name)
+        if gate is not None:
+            await gate.wait()
+        return name
+
+    async def run():
+        gate = asyncio.Event()
+        first = asyncio.create_task(scheduler.run(lambda: task('first', gate)))
+        await asyncio.sleep(0)
+        queued = []
+        for name, priority in [('low', 0), ('high', 5), ('low2', 0), ('mid', 2)]:
+            queued.append(asyncio.create_task(scheduler.run(lambda name=name: task(name), priority=priority)))
+            await asyncio.sleep(0)
+        assert scheduler.stats()['queued'] == 4
+        gate.set()
+        return await asyncio.gather(first, *queued)
+
+    assert asyncio.run(run()) == ['first', 'low', 'high', 'low2', 'mid']
+    assert started == ['first', 'high', 'mid', 'low', 'low2']
+    stats = scheduler.stats()
+    assert (stats['running'], stats['queued'], stats['completed']) == (0, 0, 5)
+
+
+def test_full_queue_rejects_at_once():
+    scheduler = TaskScheduler(max_concurrency=1, max_queue=1)
+
+    async def run():
+        gate = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(gate.wait))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(scheduler.run(lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerBusy):
+            await scheduler.run(lambda: asyncio.sleep(0))
+        gate.set()
+        await asyncio.gather(running, queued)
+
+    asyncio.run(run())
+    assert scheduler.stats()['rejected'] == 1
+    assert scheduler.stats()['completed'] == 2
+
+
+def test_deadline_cancels_the_task_and_frees_its_slot():
+    scheduler = TaskScheduler(max_concurrency=1, max_queue=1)
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await scheduler.run(slow, timeout=0.05)
+        return await scheduler.run(lambda: asyncio.sleep(0, 'next'))
+
+    assert asyncio.run(run()) == 'next'
+    assert cancelled == [True]
+    stats = scheduler.stats()
+    assert (stats['timed_out'], stats['completed'], stats['running']) == (1, 1, 0)
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = TaskScheduler(max_concurrency=1, max_queue=4)
+
+    async def run():
+        gate = asyncio.Event()
+        running = asyncio.create_task(scheduler.run(gate.wait))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(scheduler.run(lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0)
+        assert scheduler.stats()['queued'] == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()['queued'] == 0
+        gate.set()
+        await running
+
+    asyncio.run(run())
+    assert scheduler.stats()['running'] == 0
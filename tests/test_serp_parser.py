@@ -0,0 +1,89 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from langchain_mcp_agent.mcp_server.browser_use.controller import _serp_parser
+from langchain_mcp_agent.mcp_server.browser_use.controller._serp_parser import (
+    SerpExtractor,
+    decode_link,
+    detect_engine,
+    parse_serp,
+)
+
+FIXTURES = Path(__file__).parent.parent / 'benchmarks' / 'fixtures' / 'serp'
+PAGES = sorted(FIXTURES.glob('*.html'))
+
+
+def load(fixture: Path) -> tuple[str, dict]:
+    return fixture.read_text(encoding='utf-8'), json.loads(fixture.with_suffix('.json').read_text(encoding='utf-8'))
+
+
+@pytest.mark.parametrize('fixture', PAGES, ids=[p.stem for p in PAGES])
+def test_fixture_results_in_rank_order(fixture):
+    html, meta = load(fixture)
+    results = parse_serp(html, meta['url'])
+    assert [r.url for r in results] == meta['expected_urls']
+    assert [r.rank for r in results] == list(range(1, len(results) + 1))
+    assert all(r.title for r in results)
+    assert all(r.engines == [detect_engine(meta['url'])] for r in results)
+
+
+@pytest.mark.parametrize('fixture', PAGES, ids=[p.stem for p in PAGES])
+def test_fixture_ads_are_dropped(fixture):
+    # every fixture has an ad for shop.example.com, bing's behind a base64 redirect
+    html, meta = load(fixture)
+    assert not [r.url for r in parse_serp(html, meta['url']) if 'shop.example.com' in r.url]
+
+
+def test_google_ad_block_is_skipped():
+    html = (
+        '<div id="tads"><a href="https://shop.example.com/x"><h3>Ad</h3></a></div>'
+        '<div id="rso"><div class="g"><a href="/url?q=https://example.org/page&amp;sa=U"><h3>Organic</h3></a>'
+        '<div class="VwiC3b">snippet</div></div></div>'
+    )
+    results = parse_serp(html, 'https://www.google.com/search?q=x')
+    assert [(r.title, r.url, r.snippet) for r in results] == [('Organic', 'https://example.org/page', 'snippet')]
+
+
+@pytest.mark.parametrize('href, base, expected', [
+    ('/url?q=https://realpython.com/async-io-python/&sa=U', 'https://www.google.com/search?q=x',
+     'https://realpython.com/async-io-python/'),
+    ('https://www.bing.com/ck/a?!&&p=1&u=a1aHR0cHM6Ly9kb2NzLnB5dGhvbi5vcmcvMy9saWJyYXJ5L2FzeW5jaW8uaHRtbA&ntb=1',
+     'https://www.bing.com/search?q=x', 'https://docs.python.org/3/library/asyncio.html'),
+    ('//duckduckgo.com/l/?uddg=https%3A%2F%2Fdocs.python.org%2F3%2F&rut=1', 'https://html.duckduckgo.com/html/?q=x',
+     'https://docs.python.org/3/'),
+    ('https://example.org/direct', 'https://www.bing.com/search?q=x', 'https://example.org/direct'),
+])
+def test_decode_redirect_links(href, base, expected):
+    assert decode_link(href, base) == expected
+
+
+@pytest.mark.parametrize('href', [
+    '#top',
+    'javascript:void(0)',
+    '/search?q=python&first=11',  # pagination
+    'https://www.googleadservices.com/pagead/aclk?adurl=https://shop.example.com',
+    'https://www.bing.com/ck/a?u=not-base64',
+    'mailto:someone@example.org',
+])
+def test_links_that_are_not_results(href):
+    assert decode_link(href, 'https://www.bing.com/search?q=x') is None
+
+
+def test_unknown_pages_and_markup_fall_back():
+    assert parse_serp('<a href="https://example.org"><h3>x</h3></a>', 'https://example.org/search?q=x') == []
+    assert parse_serp('<html><body><p>Unusual layout</p></body></html>', 'https://www.bing.com/search?q=x') == []
+
+
+def test_extractor_falls_back_when_the_parser_fails(monkeypatch):
+    def broken(html, page_url):
+        raise ValueError('unexpected markup')
+
+    html, meta = load(FIXTURES / 'google.html')
+    extractor = SerpExtractor()
+    assert asyncio.run(extractor.parse(html, 'https://example.org/')) == []
+    monkeypatch.setattr(_serp_parser, 'parse_serp', broken)
+    assert asyncio.run(extractor.parse(html, meta['url'])) == []
+    assert asyncio.run(SerpExtractor(enabled=False).parse(html, meta['url'])) == []
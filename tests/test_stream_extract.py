@@ -0,0 +1,103 @@
+import asyncio
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._stream_extract import (
+    JsonTracker,
+    StreamingExtractor,
+    ThinkFilter,
+    clean_answer,
+)
+
+
+def feed_all(think: ThinkFilter, pieces: list[str]) -> tuple[str, bool]:
+    visible, reset = '', False
+    for piece in pieces:
+        text, piece_reset = think.feed(piece)
+        if piece_reset:
+            visible, reset = '', True
+        visible += text
+    return visible + think.flush(), reset
+
+
+def test_think_filter_tags_split_across_pieces():
+    visible, reset = feed_all(ThinkFilter(), ['a<th', 'ink>hidden</th', 'ink>b'])
+    assert visible == 'ab'
+    assert not reset
+
+
+def test_think_filter_holds_back_a_possible_tag_start():
+    think = ThinkFilter()
+    assert think.feed('answer <') == ('answer ', False)
+    assert think.flush() == '<'
+
+
+def test_think_filter_stray_close_tag_discards_reasoning():
+    visible, reset = feed_all(ThinkFilter(), ['reasoning without an open tag', '</think>', '{"a": 1}'])
+    assert visible == '{"a": 1}'
+    assert reset
+
+
+def test_think_filter_drops_unclosed_section():
+    visible, _ = feed_all(ThinkFilter(), ['x<think>never closed'])
+    assert visible == 'x'
+
+
+def test_json_tracker_braces_inside_strings():
+    tracker = JsonTracker()
+    text = '{"a": "} ] {", "b": "quote \\" }"} trailing'
+    assert tracker.feed(text)
+    assert text[tracker.start:tracker.end] == '{"a": "} ] {", "b": "quote \\" }"}'
+
+
+def test_json_tracker_after_fence():
+    tracker = JsonTracker()
+    assert tracker.feed('```json\n[1, 2]\n```')
+    assert tracker.start == 8
+
+
+def test_json_tracker_ignores_brackets_in_prose():
+    tracker = JsonTracker()
+    assert not tracker.feed('Here are the results:\n- [Python docs](https://docs.python.org)')
+    assert tracker.failed
+
+
+def test_json_tracker_rejects_invalid_value():
+    tracker = JsonTracker()
+    assert not tracker.feed('[Python docs](https://docs.python.org) is where to start')
+    assert tracker.failed
+
+
+def test_clean_answer_keeps_markdown_answer():
+    text = 'Here are the results:\n- [Python docs](https://docs.python.org) has the tutorial'
+    assert clean_answer(text) == text
+
+
+def test_clean_answer_keeps_answer_opening_with_a_link():
+    text = '[Python docs](https://docs.python.org) has the tutorial'
+    assert clean_answer(text) == text
+
+
+def test_clean_answer_cuts_to_json_value():
+    assert clean_answer('<think>hmm {</think>\n```json\n{"a": [1]}\n```\nDone.') == '{"a": [1]}'
+
+
+def stream_extract(answer: str, early_stop: bool = True) -> tuple[str, StreamingExtractor]:
+    # GenericFakeChatModel streams the answer split on whitespace
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=answer)]))
+    extractor = StreamingExtractor(early_stop=early_stop)
+    return asyncio.run(extractor.complete(llm, 'prompt')), extractor
+
+
+def test_streaming_stops_after_json_answer():
+    result, extractor = stream_extract('{"answer": "yes"} and then some more prose')
+    assert result == '{"answer": "yes"}'
+    assert extractor.early_stops == 1
+
+
+def test_streaming_does_not_stop_on_prose():
+    answer = 'See [the docs](https://example.com) for { details } here'
+    result, extractor = stream_extract(answer)
+    assert result == answer
+    assert extractor.early_stops == 0
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+from langchain_mcp_agent.mcp_server.browser_use.controller._extraction_cache import normalize_url
+from langchain_mcp_agent.tools._tiered_cache import TieredCache
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'cache.sqlite')
+
+
+def test_memory_tier_is_an_lru():
+    cache = TieredCache(max_items=2)
+    cache.put('a', '1')
+    cache.put('b', '2')
+    assert cache.get('a') == '1'  # a is now the most recent
+    cache.put('c', '3')
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == ('1', None, '3')
+    assert cache.stats() == {'hits': 3, 'memory_hits': 3, 'disk_hits': 0, 'misses': 1, 'memory_size': 2, 'disk_size': None}
+
+
+def test_disk_answers_after_a_memory_miss(db_path):
+    TieredCache(db_path=db_path).put('key', 'value')
+    cache = TieredCache(db_path=db_path)  # a new process, nothing in memory
+    assert cache.get('key') == 'value'
+    assert cache.get('key') == 'value'
+    stats = cache.stats()
+    assert (stats['disk_hits'], stats['memory_hits'], stats['disk_size']) == (1, 1, 1)
+
+
+def test_async_access_goes_through_both_tiers(db_path):
+    async def run():
+        await TieredCache(db_path=db_path).aput('key', 'value')
+        cache = TieredCache(db_path=db_path)
+        return cache, [await cache.aget('key'), await cache.aget('key'), await cache.aget('other')]
+
+    cache, values = asyncio.run(run())
+    assert values == ['value', 'value', None]
+    stats = cache.stats()
+    assert (stats['disk_hits'], stats['memory_hits'], stats['misses']) == (1, 1, 1)
+
+
+def test_expired_entries_are_missing_in_both_tiers(db_path, monkeypatch):
+    now = time.time()
+    cache = TieredCache(db_path=db_path, ttl=60)
+    cache.put('key', 'value')
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('key') is None
+    assert TieredCache(db_path=db_path, ttl=60).get('key') is None
+    assert cache.stats()['disk_size'] == 0  # deleted on the expired read
+
+
+def test_disk_tier_keeps_max_rows_by_last_access(db_path, monkeypatch):
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(time, 'time', lambda: next(clock))
+    cache = TieredCache(max_items=1, db_path=db_path, max_rows=2)
+    cache.put('a', '1')
+    cache.put('b', '2')
+    assert cache.get('a') == '1'  # from disk, a was accessed after b
+    cache.put('c', '3')
+    fresh = TieredCache(db_path=db_path)
+    assert (fresh.get('a'), fresh.get('b'), fresh.get('c')) == ('1', None, '3')
+    assert cache.stats()['disk_size'] == 2
+
+
+def test_delete_removes_both_tiers(db_path):
+    cache = TieredCache(db_path=db_path)
+    cache.put('key', 'value')
+    cache.delete('key')
+    assert cache.get('key') is None
+    assert TieredCache(db_path=db_path).get('key') is None
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('HTTPS://Example.ORG/docs/', 'https://example.org/docs'),
+    ('https://example.org', 'https://example.org/'),
+    ('https://example.org/a?utm_source=x&b=2&a=1&gclid=y#section', 'https://example.org/a?a=1&b=2'),
+    ('https://example.org/a?fbclid=1&msclkid=2&mc_cid=3&_ga=4', 'https://example.org/a'),
+    (' https://example.org/a?q=Python+asyncio ', 'https://example.org/a?q=Python+asyncio'),
+])
+def test_normalize_url(url, expected):
+    assert normalize_url(url) == expected
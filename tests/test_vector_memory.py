@@ -0,0 +1,69 @@
+import time
+
+import numpy as np
+import pytest
+
+from langchain_mcp_agent.tools._vector_memory import VectorIndex
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    ticks = iter(range(1000, 100000))
+    monkeypatch.setattr(time, 'time', lambda: next(ticks))
+
+
+def test_search_returns_the_closest_rows_by_cosine():
+    index = VectorIndex(dims=3)
+    index.add([[1, 0, 0], [0, 1, 0], [1, 1, 0], [0, 0, 5]], ['x', 'y', 'xy', 'z'])
+    hits = index.search([2, 0.2, 0], k=3)
+    assert [item['text'] for _, item in hits] == ['x', 'xy', 'y']
+    assert hits[0][0] == pytest.approx(0.995, abs=1e-3)
+    assert [item['text'] for _, item in index.search([2, 0.2, 0], k=3, min_score=0.5)] == ['x', 'xy']
+    assert index.search([0, 0, 1], k=0) == []
+    assert VectorIndex(dims=3).search([1, 0, 0]) == []
+
+
+def test_rows_are_normalized_and_dims_checked():
+    index = VectorIndex(dims=2)
+    index.add([[3, 4]], ['a'], [{'step': 1}])
+    assert np.linalg.norm(index.vectors[0]) == pytest.approx(1.0)
+    assert index.items[0]['meta'] == {'step': 1}
+    with pytest.raises(ValueError, match='Expected 2 dimensional'):
+        index.add([[1, 2, 3]], ['b'])
+
+
+def test_least_recently_used_rows_are_evicted(clock):
+    index = VectorIndex(dims=2, max_items=3)
+    for i, vector in enumerate([[1, 0], [0, 1], [1, 1]]):
+        index.add([vector], [f'item {i}'])
+    index.search([1, 0], k=1)  # item 0 is used again
+    assert index.add([[-1, 0]], ['item 3']) == 1
+    assert [item['text'] for item in index.items] == ['item 0', 'item 2', 'item 3']
+    assert len(index) == len(index.vectors) == 3
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = tmp_path / 'memory' / 'model'
+    index = VectorIndex(dims=2, path=path)
+    index.add([[1, 0], [0, 1]], ['a', 'b'], [{'kind': 'step'}, {'kind': 'result'}])
+    index.save()
+    assert sorted(p.name for p in path.parent.iterdir()) == ['model.json', 'model.npy']  # no temporary files left
+
+    loaded = VectorIndex(dims=2, path=path)
+    assert loaded.load()
+    assert [item['meta'] for item in loaded.items] == [{'kind': 'step'}, {'kind': 'result'}]
+    np.testing.assert_allclose(loaded.vectors, index.vectors)
+    assert loaded.search([0, 1], k=1)[0][1]['text'] == 'b'
+
+    assert not VectorIndex(dims=3, path=path).load()  # another embedding model
+    assert not VectorIndex(dims=2, path=tmp_path / 'missing').load()
+    assert not VectorIndex(dims=2).load()
+
+
+def test_load_keeps_max_items(tmp_path):
+    index = VectorIndex(dims=2, path=tmp_path / 'index')
+    index.add(np.eye(2).tolist() * 3, [str(i) for i in range(6)])
+    index.save()
+    small = VectorIndex(dims=2, max_items=4, path=tmp_path / 'index')
+    assert small.load()
+    assert len(small) == 4